@@ -0,0 +1,255 @@
+"""
+Batch Simulation Runner
+-----------------------
+Headless runs of many worlds for analysis and regression: N worlds x M turns
+from a scenario file, worlds spread over worker processes, one record per turn
+streamed to JSONL (or Parquet when pyarrow is installed) as each world ends.
+
+Scenario file (JSON); world i is seeded with seed + i, and turns without a
+scripted policy are plain iterations:
+
+    {
+      "name": "waste-policies",
+      "seed": 42,
+      "worlds": 100,
+      "turns": 20,
+      "num_blobs": 20,
+      "num_societies": 3,
+      "temperature": 0.7,
+      "policies": [
+        {"turn": 3, "proposal": "Ban factory waste in the river"},
+        {"turn": 8, "proposal": "Introduce a waste tax on factory owners"}
+      ]
+    }
+
+Run from the backend directory:
+
+    python -m app.batch_runner scenario.json --out results.jsonl --jobs 8 --offline
+
+Turn records hold the world, seed, turn, kind (iteration or policy), the
+event headline, world metrics after the turn, the society relations it changed,
+token counts and latency; a failed turn is recorded with ok=false and the error.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional (only needed for Parquet output)
+    pyarrow = None
+
+SCENARIO_DEFAULTS = {
+    "name": "scenario",
+    "seed": 0,
+    "worlds": 1,
+    "turns": 10,
+    "num_blobs": 10,
+    "num_societies": 3,
+    "temperature": 0.7,
+    "policies": [],
+}
+
+
+def load_scenario(path: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Scenario file merged over the defaults (command-line overrides win)"""
+    with open(path) as f:
+        scenario = {**SCENARIO_DEFAULTS, **json.load(f)}
+    scenario.update({key: value for key, value in (overrides or {}).items() if value is not None})
+    unknown = set(scenario) - set(SCENARIO_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown scenario field(s): {', '.join(sorted(unknown))}")
+    for policy in scenario["policies"]:
+        if not isinstance(policy.get("turn"), int) or not policy.get("proposal"):
+            raise ValueError(f"Policies need an integer turn and a proposal: {policy}")
+    return scenario
+
+
+def run_world(scenario: Dict[str, Any], world: int) -> List[Dict[str, Any]]:
+    """Play one world of the scenario and return its turn records"""
+    # Imported here so worker processes pick up the environment set by main_cli
+    from app import telemetry
+    from app.blob_sim import EnhancedGameState
+
+    seed = scenario["seed"] + world
+    random.seed(seed)
+    policies = {policy["turn"]: policy["proposal"] for policy in scenario["policies"]}
+    base = {"scenario": scenario["name"], "world": world, "seed": seed}
+
+    state = EnhancedGameState()
+    try:
+        state.initialize_with_personalities(num_blobs=scenario["num_blobs"], num_societies=scenario["num_societies"])
+    except Exception as e:
+        return [{**base, "turn": 0, "kind": "initialize", "ok": False, "error": str(e)}]
+
+    records = []
+    for turn in range(1, scenario["turns"] + 1):
+        proposal = policies.get(turn)
+        events_before = len(state.world_events)
+        with telemetry.turn("batch_policy" if proposal else "batch_iteration") as trace:
+            try:
+                if proposal:
+                    state.policy_proposition(proposal, temperature=scenario["temperature"], create_image=False)
+                else:
+                    state.run_iteration(temperature=scenario["temperature"], create_image=False)
+                error = None if len(state.world_events) > events_before else "No valid event was generated"
+            except Exception as e:
+                error = str(e)
+        records.append(turn_record(state, base, turn, proposal, trace, error,
+                                   state.world_events[-1] if len(state.world_events) > events_before else None))
+    state.discard_prefetch()
+    return records
+
+
+def turn_record(state: Any, base: Dict[str, Any], turn: int, proposal: Optional[str], trace: Any,
+                error: Optional[str], event: Any) -> Dict[str, Any]:
+    societies = {s.society_id: s for s in state.societies}
+    relations = []
+    for relation_key in (event.society_relations if event is not None else {}):
+        first, _, second = relation_key.partition("-")
+        if first.isdigit() and second.isdigit() and int(first) in societies:
+            score = societies[int(first)].relations.get(int(second))
+            if score is not None:
+                relations.append({"pair": relation_key, "score": round(score, 4)})
+    return {
+        **base,
+        "turn": turn,
+        "kind": "policy" if proposal else "iteration",
+        "proposal": proposal,
+        "ok": error is None,
+        "error": error,
+        "year": state.current_year,
+        "headline": event.headline if event is not None else None,
+        "metrics_headline": event.metrics_headline if event is not None else None,
+        "impacts": len(event.impacts) if event is not None else 0,
+        "metrics": {name: round(value, 4) for name, value in state.world_metrics.metrics.items()},
+        "relations": relations,
+        "prompt_tokens": trace.prompt_tokens,
+        "completion_tokens": trace.completion_tokens,
+        "llm_calls": trace.llm_calls,
+        "duration_s": round(trace.duration, 6),
+    }
+
+
+class JsonlSink:
+    """One JSON object per line, flushed after every world"""
+    def __init__(self, path: str):
+        self.file = open(path, "w")
+
+    def write(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Row groups of batch_size turn records written with pyarrow"""
+    def __init__(self, path: str, batch_size: int = 5000):
+        if pyarrow is None:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow); use a .jsonl file instead")
+        self.path = path
+        self.batch_size = batch_size
+        self.rows: List[Dict[str, Any]] = []
+        self.schema = pyarrow.schema([
+            ("scenario", pyarrow.string()), ("world", pyarrow.int64()), ("seed", pyarrow.int64()),
+            ("turn", pyarrow.int64()), ("kind", pyarrow.string()), ("proposal", pyarrow.string()),
+            ("ok", pyarrow.bool_()), ("error", pyarrow.string()), ("year", pyarrow.int64()),
+            ("headline", pyarrow.string()), ("metrics_headline", pyarrow.string()), ("impacts", pyarrow.int64()),
+            ("metrics", pyarrow.map_(pyarrow.string(), pyarrow.float64())),
+            ("relations", pyarrow.list_(pyarrow.struct([("pair", pyarrow.string()), ("score", pyarrow.float64())]))),
+            ("prompt_tokens", pyarrow.int64()), ("completion_tokens", pyarrow.int64()),
+            ("llm_calls", pyarrow.int64()), ("duration_s", pyarrow.float64()),
+        ])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            row = {name: record.get(name) for name in self.schema.names}
+            row["metrics"] = list((row["metrics"] or {}).items())
+            row["relations"] = row["relations"] or []
+            self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(pyarrow.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def open_sink(path: str, output_format: Optional[str] = None) -> Any:
+    output_format = output_format or ("parquet" if path.endswith(".parquet") else "jsonl")
+    return ParquetSink(path) if output_format == "parquet" else JsonlSink(path)
+
+
+def run_scenario(scenario: Dict[str, Any], sink: Any, jobs: int = 1) -> Dict[str, int]:
+    """Run every world of the scenario, writing each world's records as soon as it finishes"""
+    totals = {"worlds": 0, "turns": 0, "failed_turns": 0}
+
+    def emit(records: List[Dict[str, Any]]):
+        sink.write(records)
+        totals["worlds"] += 1
+        totals["turns"] += len(records)
+        totals["failed_turns"] += sum(1 for record in records if not record["ok"])
+
+    if jobs <= 1:
+        for world in range(scenario["worlds"]):
+            emit(run_world(scenario, world))
+        return totals
+
+    # Separate processes: the simulation seeds and uses the global random module
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_world, scenario, world) for world in range(scenario["worlds"])]
+        for future in as_completed(futures):
+            emit(future.result())
+    return totals
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Run N worlds x M turns of a scenario without the UI")
+    parser.add_argument("scenario", help="Scenario JSON file")
+    parser.add_argument("--out", required=True, help="Output file (.jsonl or .parquet)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], help="Output format (default: from the extension)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worlds run in parallel")
+    parser.add_argument("--worlds", type=int, help="Override the scenario's world count")
+    parser.add_argument("--turns", type=int, help="Override the scenario's turns per world")
+    parser.add_argument("--seed", type=int, help="Override the scenario's base seed")
+    parser.add_argument("--offline", action="store_true", help="Use the offline LLM stand-in (no API calls)")
+    parser.add_argument("--log-level", default="WARNING", help="Simulation log level (logs go to stdout)")
+    args = parser.parse_args()
+
+    # Settings are read at import time, in this process and in the spawned workers
+    if args.offline:
+        os.environ["BLOB_OFFLINE_LLM"] = "1"
+    os.environ["BLOB_LOG_LEVEL"] = args.log_level
+
+    try:
+        scenario = load_scenario(args.scenario, {"worlds": args.worlds, "turns": args.turns, "seed": args.seed})
+        sink = open_sink(args.out, args.format)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+    try:
+        totals = run_scenario(scenario, sink, jobs=min(args.jobs, scenario["worlds"]))
+    finally:
+        sink.close()
+    print(f"{totals['worlds']} worlds, {totals['turns']} turns ({totals['failed_turns']} failed) "
+          f"in {time.perf_counter() - start:.1f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -4,12 +4,17 @@ Blob Image Generator Module
 This module provides consistent blob image generation based on a reference image.
 """
 
-import time
 from typing import Optional, List
 
 # Import the OpenAI client
 import openai
 
+from app.config import settings
+from app import llm_scheduler, offline_llm, resilience
+from app.logger import get_logger
+
+logger = get_logger("images")
+
 
 class BlobImageGenerator:
     """Helper class for consistent blob image generation"""
@@ -48,36 +53,33 @@ class BlobImageGenerator:
         return prompt
     
     def generate_image(self, prompt: str, n: int = 1, size: str = "1024x1024", 
-                      max_retries: int = 3, retry_delay: int = 2) -> List[str]:
+                      max_retries: int = 3, retry_delay: Optional[float] = None) -> List[str]:
         """Generate image using OpenAI API with consistent blob style"""
         
         # Ensure prompt isn't too long for the API
         if len(prompt) > 1000:
             prompt = prompt[:997] + "..."
         
-        # Try to create client with API key
-        client = openai.OpenAI(api_key=self.api_key)
+        # Try to create client with API key (or use the stand-in when running offline)
+        client = offline_llm if settings.offline_llm else openai.OpenAI(api_key=self.api_key)
         
-        attempt = 0
-        while attempt < max_retries:
-            try:
-                # Generate the image
-                resp = client.images.generate(
-                    model="dall-e-3",  # Using the most advanced model
-                    prompt=prompt,
-                    n=n,
-                    size=size,
-                    #quality="hd",  # Higher quality images
-                    style="vivid"  # More colorful and vibrant
-                )
-                return [img.url for img in resp.data]
-                
-            except Exception as e:
-                attempt += 1
-                if attempt >= max_retries:
-                    print(f"Failed to generate image after {max_retries} attempts: {str(e)}")
-                    return []
-                print(f"Image API error: {str(e)}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-        
-        return []
\ No newline at end of file
+        def generate():
+            # Image generation is background work for the rate limiter
+            llm_scheduler.image_scheduler.acquire(priority_name="background")
+            # Generate the image
+            return client.images.generate(
+                model="dall-e-3",  # Using the most advanced model
+                prompt=prompt,
+                n=n,
+                size=size,
+                #quality="hd",  # Higher quality images
+                style="vivid"  # More colorful and vibrant
+            )
+
+        try:
+            # Backoff, Retry-After and the shared circuit breaker are handled by resilience
+            resp = resilience.call_with_retry(generate, max_retries=max_retries - 1, base_delay=retry_delay)
+        except Exception as e:
+            logger.error("Image generation failed", extra={"error": str(e)})
+            return []
+        return [img.url for img in resp.data]
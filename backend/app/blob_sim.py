@@ -1,15 +1,29 @@
 import openai
 import re
+import contextvars
+import copy
 import json
+import logging
 import time
 import random
+import threading
+import uuid
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from app.config import settings
-from app.random_stats import generate_random_blobs
+from app import context_selector, cow, event_bus, event_parser, hedging, llm_scheduler, offline_llm, resilience, search, telemetry
+from app.policy_cache import outcome_cache
+from app.executor import relations_report
+from app.logger import get_logger
+from app.random_stats import CATEGORIES, encode_properties, generate_random_blobs, roster_legend
+from app.timeline import Timeline, TurnDelta
 from app.blob_image_generator import BlobImageGenerator
 
 openai.api_key = settings.openai_api_key
 
+logger = get_logger("sim")
+
 # Define relation change constants
 RELATION_CHANGES = {
     "big_decrease": -0.25,
@@ -29,40 +43,73 @@ class OpenAIClient:
                 presence_penalty: float = 0.0, 
                 frequency_penalty: float = 0.3,
                 max_retries: int = 3,
-                retry_delay: int = 2,
-                return_json: bool = False) -> str:
+                retry_delay: Optional[float] = None,
+                return_json: bool = False,
+                json_schema: Optional[Dict[str, Any]] = None,
+                task: str = "default") -> str:
         """
-        Enhanced version of ask_openai with better parameter control and error handling
+        Enhanced version of ask_openai with better parameter control and error handling.
+        When json_schema is given, the provider's strict structured output is requested.
+        The task kind selects the model, max_tokens and timeout from settings.model_routes.
+        retry_delay overrides the base backoff of every error class (see resilience.ERROR_POLICIES).
         """
-        attempt = 0
-        while attempt < max_retries:
-            try:
-                if return_json:
-                    response = openai.chat.completions.create(
-                        model="gpt-4o",
-                        messages=messages,
-                        temperature=temperature,           # Controls randomness (0-1)
-                        top_p=top_p,                       # Nucleus sampling parameter
-                        presence_penalty=presence_penalty, # Penalize new topics (-2 to 2)
-                        frequency_penalty=frequency_penalty, # Penalize repetition (-2 to 2)
-                        response_format={ "type": "json_object" }
-                    )
-                else:
-                    response = openai.chat.completions.create(
-                        model="gpt-4o",
-                        messages=messages,
-                        temperature=temperature,           # Controls randomness (0-1)
-                        top_p=top_p,                       # Nucleus sampling parameter
-                        presence_penalty=presence_penalty, # Penalize new topics (-2 to 2)
-                        frequency_penalty=frequency_penalty, # Penalize repetition (-2 to 2)
-                    )
-                return response.choices[0].message.content
-            except Exception as e:
-                attempt += 1
-                if attempt >= max_retries:
-                    raise Exception(f"Failed to get response from OpenAI after {max_retries} attempts: {str(e)}")
-                print(f"API error: {str(e)}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
+        # Route to the deterministic stand-in when running offline
+        completions = offline_llm.chat.completions if settings.offline_llm else openai.chat.completions
+
+        route = settings.model_routes.get(task, settings.model_routes["default"])
+        kwargs = dict(
+            model=route["model"],
+            messages=messages,
+            temperature=temperature,           # Controls randomness (0-1)
+            top_p=top_p,                       # Nucleus sampling parameter
+            presence_penalty=presence_penalty, # Penalize new topics (-2 to 2)
+            frequency_penalty=frequency_penalty, # Penalize repetition (-2 to 2)
+            timeout=route.get("timeout"),
+        )
+        if route.get("max_tokens"):
+            kwargs["max_tokens"] = route["max_tokens"]
+        if return_json:
+            kwargs["response_format"] = (
+                {"type": "json_schema", "json_schema": json_schema} if json_schema
+                else { "type": "json_object" }
+            )
+
+        estimated_tokens = llm_scheduler.estimate_tokens(messages)
+        def create():
+            # Wait for rate-limit admission (each request counts against the quota)
+            llm_scheduler.chat_scheduler.acquire(estimated_tokens)
+            return completions.create(**kwargs)
+
+        attempts = 0
+        def send():
+            # Latency is end to end: a hedged call includes the wait before its hedge was sent,
+            # otherwise the p90 that triggers hedging would be biased down by the hedges themselves
+            nonlocal attempts
+            attempts += 1
+            start = time.perf_counter()
+            result = hedging.hedged_call(create, task) if hedging.enabled_for(task) else create()
+            return result, time.perf_counter() - start
+
+        try:
+            # Backoff, Retry-After and the shared circuit breaker are handled by resilience
+            response, latency = resilience.call_with_retry(send, max_retries=max_retries - 1, base_delay=retry_delay)
+        except resilience.CircuitOpenError:
+            telemetry.record_llm_call(None, retries=0, task=task, model=route["model"])
+            raise
+        except Exception as e:
+            telemetry.record_llm_call(None, retries=attempts - 1, task=task, model=route["model"])
+            raise Exception(f"Failed to get response from OpenAI after {attempts} attempts: {str(e)}")
+
+        telemetry.record_llm_call(response.usage, retries=attempts - 1, task=task,
+                                  model=route["model"], latency=latency)
+        llm_scheduler.chat_scheduler.reconcile(estimated_tokens, getattr(response.usage, "total_tokens", 0))
+        return response.choices[0].message.content
+
+
+def _int_keys(mapping: Dict[Any, Any]) -> Dict[Any, Any]:
+    """Restore integer id keys of a mapping that went through JSON (which only has string keys)"""
+    return {int(k) if isinstance(k, str) and k.lstrip("-").isdigit() else k: v for k, v in mapping.items()}
+
 
 class Society:
     """Represents a society/faction that blobs can belong to"""
@@ -76,6 +123,24 @@ class Society:
     
     def __repr__(self):
         return f"Society-{self.society_id}(ideology='{self.ideology}', members={len(self.members)})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"society_id": self.society_id, "ideology": self.ideology, "values": self.values,
+                "members": self.members, "relations": self.relations, "image_url": self.image_url}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Society":
+        society = cls(data["society_id"], data["ideology"], data["values"])
+        society.members = data["members"]
+        society.relations = _int_keys(data["relations"])
+        society.image_url = data["image_url"]
+        return society
+
+    def clone(self) -> "Society":
+        """Copy that can be changed without affecting this society (see app.cow)"""
+        society = copy.copy(self)
+        society.members, society.relations = list(self.members), dict(self.relations)
+        return society
     
     def add_member(self, blob_id: int):
         """Add a blob to this society"""
@@ -85,7 +150,7 @@ class Society:
     def update_relation(self, other_society_id: int, change_type: str):
         """Update relation with another society based on change type"""
         if change_type not in RELATION_CHANGES:
-            print(f"Warning: Invalid relation change type '{change_type}'")
+            logger.warning("Invalid relation change type", extra={"change_type": change_type})
             return
             
         # Initialize relation if it doesn't exist
@@ -100,6 +165,9 @@ class Society:
         self.relations[other_society_id] = max(-1.0, min(1.0, current + delta))
 
 
+# Column header of the compact roster (see Blob.roster_line)
+ROSTER_HEADER = "|".join(["id", "soc"] + [column for column, *_ in CATEGORIES.values()] + ["personality", "traits"])
+
 class Blob:
     """
     Represents an individual blob creature with personality and relationships
@@ -114,18 +182,59 @@ class Blob:
         self.traits: List[str] = []
         self.relationships: Dict[int, float] = {}  # Maps other blob_ids to relationship scores (-1.0 to 1.0)
         self.history: List[Dict[int, str]] = []    # History of impact events for this blob
+        self.version = 0  # Bumped by touch() whenever API-visible fields change
+        self._fragments: Dict[Any, Tuple[int, bytes]] = {}  # Encoded API fragments (see app.listing)
         
     def __repr__(self):
         society_info = f", society={self.society_id}" if self.society_id is not None else ""
         return f"Blob(id={self.blob_id}, name='{self.name}'{society_info})"
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"blob_id": self.blob_id, "properties": self.properties, "name": self.name,
+                "society_id": self.society_id, "image_url": self.image_url, "personality": self.personality,
+                "traits": self.traits, "relationships": self.relationships, "history": self.history,
+                "version": self.version}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Blob":
+        blob = cls(data["blob_id"], data["properties"])
+        blob.name = data["name"]
+        blob.society_id = data["society_id"]
+        blob.image_url = data["image_url"]
+        blob.personality = data["personality"]
+        blob.traits = data["traits"]
+        blob.relationships = _int_keys(data["relationships"])
+        blob.history = data["history"]
+        blob.version = data["version"]
+        return blob
+
+    def clone(self) -> "Blob":
+        """Copy that can be changed without affecting this blob (see app.cow); properties stay shared"""
+        blob = copy.copy(self)
+        blob.traits, blob.relationships, blob.history = list(self.traits), dict(self.relationships), list(self.history)
+        blob._fragments = dict(self._fragments)  # Same version, same content
+        return blob
+
     def prompt_description(self) -> str:
         """
         Create a textual description based on the blob's properties.
         """
         parts = [f"{key}: {value}" for key, value in self.properties.items()]
         return "; ".join(parts)
+
+    def roster_line(self) -> str:
+        """
+        One compact roster line: id, society, demographic short codes, personality and traits
+        (columns as in ROSTER_HEADER).
+        """
+        society = str(self.society_id) if self.society_id is not None else "-"
+        codes = "|".join(encode_properties(self.properties))
+        return f"{self.blob_id}|{society}|{codes}|{self.personality}|{', '.join(self.traits)}"
     
+    def touch(self):
+        """Mark the blob as changed (invalidates its cached API fragments)"""
+        self.version += 1
+
     def add_event(self, year: int, event_type: str, description: str):
         """Record a significant event in this blob's history"""
         self.history.append({
@@ -133,10 +242,12 @@ class Blob:
             "type": event_type,
             "description": description
         })
+        self.touch()
     
     def join_society(self, society_id: int):
         """Join a society"""
         self.society_id = society_id
+        self.touch()
 
 class WorldMetrics:
     """
@@ -158,7 +269,7 @@ class WorldMetrics:
     def update_metric(self, metric_name: str, change_type: str):
         """Update a metric based on change type"""
         if metric_name not in self.metrics:
-            print(f"Warning: Unknown metric '{metric_name}'")
+            logger.warning("Unknown metric", extra={"metric": metric_name})
             return
             
         # Use the same change values as society relations
@@ -175,6 +286,23 @@ class WorldMetrics:
         """Get a copy of the current metrics"""
         return self.metrics.copy()
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"metrics": self.metrics, "history": self.history}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorldMetrics":
+        world_metrics = cls()
+        world_metrics.metrics = data["metrics"]
+        world_metrics.history = data["history"]
+        return world_metrics
+
+    def clone(self) -> "WorldMetrics":
+        """Copy that can be changed without affecting these metrics (see app.cow)"""
+        world_metrics = WorldMetrics()
+        world_metrics.metrics = dict(self.metrics)
+        world_metrics.history = {metric: list(values) for metric, values in self.history.items()}
+        return world_metrics
+
     def get_summary(self) -> str:
         """Format metrics as a readable string"""
         result = "WORLD METRICS:\n"
@@ -226,6 +354,29 @@ class WorldEvent:
         self.image_url: Optional[str] = None
         self.metrics_headline: str = ""  # Internal headline based only on world metrics
         self.subheadlines: List[str] = []  # Fun, quirky subheadlines
+        self.version = 0  # Bumped by touch() whenever API-visible fields change
+        self.replayed = False  # Served from the policy outcome cache (fast mode); not persisted
+        self._fragments: Dict[Any, Tuple[int, bytes]] = {}  # Encoded API fragments (see app.listing)
+
+    def touch(self):
+        """Mark the event as changed (invalidates its cached API fragments)"""
+        self.version += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"year": self.year, "headline": self.headline, "details": self.details, "impacts": self.impacts,
+                "society_relations": self.society_relations, "world_metrics": self.world_metrics,
+                "image_url": self.image_url, "metrics_headline": self.metrics_headline,
+                "subheadlines": self.subheadlines, "version": self.version}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorldEvent":
+        event = cls(data["year"], data["headline"], data["details"], _int_keys(data["impacts"]),
+                    data["society_relations"], data["world_metrics"])
+        event.image_url = data["image_url"]
+        event.metrics_headline = data["metrics_headline"]
+        event.subheadlines = data["subheadlines"]
+        event.version = data["version"]
+        return event
     
     def __repr__(self):
         return f"WorldEvent(year={self.year}, headline='{self.headline}')"
@@ -267,6 +418,23 @@ class WorldEvent:
         
         return f"Year {self.year}: {self.headline}\n{self.details}\n\nImpacts:\n{impact_str}{relations_str}{metrics_str}{subheadlines_str}"
 
+class PrefetchedIteration:
+    """A speculatively generated no-policy iteration, valid only for the state version it was built on"""
+    def __init__(self, version: int, temperature: float, new_messages: List[Dict[str, str]], future: Future):
+        self.version = version
+        self.temperature = temperature
+        self.new_messages = new_messages
+        self.future = future
+
+    def discard(self, outcome: str):
+        self.future.cancel()  # The result is simply dropped if the call already started
+        telemetry.registry.inc("blob_prefetch_total", outcome=outcome)
+
+
+# Single background worker for speculative iterations
+_prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+telemetry.registry.describe("blob_prefetch_total", "counter", "Prefetched iterations by outcome")
+
 class EnhancedGameState:
     """
     Enhanced game state with improved AI capabilities and event tracking
@@ -279,9 +447,27 @@ class EnhancedGameState:
         self.current_blob_id = 0
         self.current_society_id = 0
         self.current_year = 0
+        self.state_version = 0  # Bumped on every committed change
+        self.game_id = uuid.uuid4().hex[:12]  # Changes whenever the history is reset
 
         self.world_metrics = WorldMetrics()
 
+        # Undo records of the turns since initialization (see rewind)
+        self.timeline = Timeline()
+
+        # Live viewers of committed changes (the /ws WebSocket)
+        self.bus = event_bus.EventBus(max_queue=settings.ws_max_queue)
+
+        # Retrieval index over blob profiles, events and blob histories (kept up to date incrementally)
+        self.search_index = search.WorldIndex()
+
+        # Containers and objects this state may change in place; the rest is shared with forks (see fork)
+        self._ownership = cow.Ownership()
+
+        # Speculatively generated next iteration (see start_prefetch)
+        self._prefetch: Optional[PrefetchedIteration] = None
+        self._prefetch_lock = threading.Lock()
+
         self.blob_image_generator = BlobImageGenerator(
             api_key=settings.openai_api_key
         )
@@ -290,6 +476,71 @@ class EnhancedGameState:
         """Get a copy of the current metrics"""
         return self.world_metrics.get_metrics()
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-compatible snapshot of the persistent game state (for session stores).
+        Live-only parts (event bus, search index, prefetched iteration) are not included.
+        """
+        return {
+            "blobs": [b.to_dict() for b in self.blobs],
+            "societies": [s.to_dict() for s in self.societies],
+            "message_history": self.message_history,
+            "world_events": [e.to_dict() for e in self.world_events],
+            "current_blob_id": self.current_blob_id,
+            "current_society_id": self.current_society_id,
+            "current_year": self.current_year,
+            "state_version": self.state_version,
+            "game_id": self.game_id,
+            "world_metrics": self.world_metrics.to_dict(),
+            "timeline": self.timeline.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EnhancedGameState":
+        """Restore a game from to_dict output (the search index is rebuilt)"""
+        state = cls()
+        state.blobs = [Blob.from_dict(b) for b in data["blobs"]]
+        state.societies = [Society.from_dict(s) for s in data["societies"]]
+        state.message_history = data["message_history"]
+        state.world_events = [WorldEvent.from_dict(e) for e in data["world_events"]]
+        state.current_blob_id = data["current_blob_id"]
+        state.current_society_id = data["current_society_id"]
+        state.current_year = data["current_year"]
+        state.state_version = data["state_version"]
+        state.game_id = data["game_id"]
+        state.world_metrics = WorldMetrics.from_dict(data["world_metrics"])
+        # Games saved before timelines existed can be rewound from the point they were loaded
+        state.timeline = (Timeline.from_dict(data["timeline"]) if "timeline" in data
+                          else Timeline(state.current_year, len(state.message_history)))
+        state.search_index.rebuild(state.blobs, state.world_events)
+        return state
+
+    def fork(self) -> "EnhancedGameState":
+        """
+        Independent copy of the world for what-if runs, undo and rollouts (e.g. policy evaluation):
+        changes to the fork never reach this state and vice versa. The fork has no live viewers or
+        prefetched iteration. Forking is O(1): both states share every container and object copy-on-write
+        (see app.cow), so each pays only for the blobs, societies and lists it changes afterwards.
+        Fork only a state no turn is changing (e.g. a committed snapshot, see SessionManager.open).
+        """
+        fork = EnhancedGameState()
+        fork.blobs, fork.societies, fork.world_events = self.blobs, self.societies, self.world_events
+        fork.message_history, fork.world_metrics, fork.timeline = self.message_history, self.world_metrics, self.timeline
+        fork.current_blob_id, fork.current_society_id = self.current_blob_id, self.current_society_id
+        fork.current_year, fork.state_version, fork.game_id = self.current_year, self.state_version, self.game_id
+        fork.search_index = self.search_index.fork()
+        fork.blob_image_generator = self.blob_image_generator
+        fork._ownership = self._ownership.fork()
+        return fork
+
+    def fingerprint(self) -> str:
+        """Identifies the world's history and context (equal in forks and after rewinding to the same point)"""
+        return f"{self.timeline.fingerprint()}:{len(self.message_history)}"
+
+    def _writable(self, name: str, clone: Any = list) -> Any:
+        """The named container (or object, given its clone method), made private first if shared with a fork"""
+        return self._ownership.writable_attr(self, name, clone)
+
     def get_enhanced_system_prompt(self, num_blobs: int) -> Dict[str, str]:
         """
         Create an improved system prompt with clearer instructions
@@ -326,12 +577,11 @@ class EnhancedGameState:
                 f"    \"Fun quirky subheadline 4\",\n"
                 f"    \"Fun quirky subheadline 5\"\n"
                 f"  ],\n"
-                f"  \"impacts\": {{\n"
-                f"    \"blob_1\": \"Impact on Blob-1\",\n"
-                f"    \"blob_2\": \"Impact on Blob-2\",\n"
-                f"    \"blob_3\": \"Impact on Blob-3\",\n"
-                f"    \"etc\": \"Include impacts for ALL significantly affected blobs\"\n"
-                f"  }},\n"
+                f"  \"impacts\": [\n"
+                f"    {{\"blob_id\": 1, \"impact\": \"Impact on Blob-1\"}},\n"
+                f"    {{\"blob_id\": 2, \"impact\": \"Impact on Blob-2\"}},\n"
+                f"    {{\"blob_id\": 3, \"impact\": \"Impact on Blob-3 (include ALL significantly affected blobs)\"}}\n"
+                f"  ],\n"
                 f"  \"society_relations\": [\n"
                 f"    {{\n"
                 f"      \"society1\": 0,\n"
@@ -389,22 +639,27 @@ class EnhancedGameState:
         if not event.world_metrics:
             return
                 
-        print(f"Updating world metrics for event: {event.headline}")
+        debug = logger.isEnabledFor(logging.DEBUG)
         
+        world_metrics = self._writable("world_metrics", WorldMetrics.clone)
         for metric_name, change_type in event.world_metrics.items():
             try:
-                old_value = self.world_metrics.metrics.get(metric_name, 0.5)
-                self.world_metrics.update_metric(metric_name, change_type)
-                new_value = self.world_metrics.metrics.get(metric_name, 0.5)
+                old_value = world_metrics.metrics.get(metric_name, 0.5)
+                world_metrics.update_metric(metric_name, change_type)
                 
                 # Log the changes
-                print(f"  {metric_name.replace('_', ' ').title()}: {old_value:.2f} -> {new_value:.2f} ({change_type})")
+                if debug:
+                    logger.debug("Metric updated", extra={
+                        "metric": metric_name, "old": old_value,
+                        "new": world_metrics.metrics.get(metric_name, 0.5), "change": change_type
+                    })
             except Exception as e:
-                print(f"Error updating metric {metric_name}: {str(e)}")
+                logger.error("Error updating metric", extra={"metric": metric_name, "error": str(e)})
         
         # Generate and set the metrics headline
         event.metrics_headline = self.generate_metrics_headline(event)
-        print(f"Internal metrics headline: {event.metrics_headline}")
+        event.touch()
+        logger.info("World metrics updated", extra={"year": event.year, "metrics_headline": event.metrics_headline})
 
     def generate_societies(self, num_societies: int) -> List[Society]:
         """Generate societies with distinct ideologies and values"""
@@ -421,7 +676,7 @@ class EnhancedGameState:
             {"role": "user", "content": prompt}
         ]
         
-        response = OpenAIClient.ask_gpt(messages, temperature=0.7)
+        response = OpenAIClient.ask_gpt(messages, temperature=0.7, task="societies")
         
         # Extract JSON from response
         json_match = re.search(r'\[\s*{.*}\s*\]', response, re.DOTALL)
@@ -435,7 +690,7 @@ class EnhancedGameState:
             society_data = json.loads(json_text)
         except json.JSONDecodeError:
             # If JSON parsing fails, create default societies
-            print("Failed to parse society JSON. Creating default societies.")
+            logger.warning("Failed to parse society JSON, creating default societies")
             society_data = [
                 {"ideology": "Unknown", "values": ["Survival", "Community", "Progress"]}
                 for i in range(num_societies)
@@ -475,8 +730,17 @@ class EnhancedGameState:
             f"{b.name} (ID: {b.blob_id}): {b.prompt_description()}" for b in self.blobs
         )
     
-    def get_societies_to_string(self) -> str:
-        """Format society information as a string"""
+    def get_roster_to_string(self) -> str:
+        """Compact one-line-per-blob roster with a legend for the demographic short codes"""
+        rows = "\n".join(b.roster_line() for b in self.blobs)
+        return (
+            f"Blob roster, one blob per line. id N is Blob-N; soc is the society id (- if none).\n"
+            f"Legend:\n{roster_legend()}\n\n"
+            f"{ROSTER_HEADER}\n{rows}"
+        )
+
+    def get_societies_to_string(self, include_members: bool = True) -> str:
+        """Format society information as a string (members can be left out when the roster lists them)"""
         if not self.societies:
             return "No societies have formed yet."
             
@@ -507,11 +771,12 @@ class EnhancedGameState:
             
             relations_str = "\n".join(relations_info) if relations_info else "  None"
             
+            members_str = f"Members: {member_names}\n" if include_members else f"Member count: {len(members)}\n"
             result.append(
                 f"Society-{society.society_id}\n"
                 f"Ideology: {society.ideology}\n"
                 f"Values: {', '.join(society.values)}\n"
-                f"Members: {member_names}\n"
+                f"{members_str}"
                 f"Relations:\n{relations_str}\n"
             )
         
@@ -532,7 +797,7 @@ class EnhancedGameState:
             {"role": "user", "content": prompt}
         ]
         
-        response = OpenAIClient.ask_gpt(messages, temperature=0.7)
+        response = OpenAIClient.ask_gpt(messages, temperature=0.7, task="personality")
         
         # Parse the response
         personality = ""
@@ -575,6 +840,10 @@ class EnhancedGameState:
     
     def initialize_with_personalities(self, num_blobs: int, num_societies: int = 3):
         """Initialize game with blobs, personalities, and societies"""
+        self.discard_prefetch()
+        self.mark_changed()
+        self.game_id = uuid.uuid4().hex[:12]
+
         # Generate basic blobs
         self.generate_blobs(num_blobs)
         
@@ -586,19 +855,55 @@ class EnhancedGameState:
         self.world_events = []
         self.current_year = 0
         
-        # Generate personalities for each blob
-        for blob in self.blobs:
-            personality, traits = self.generate_blob_personality(blob)
-            blob.personality = personality
-            blob.traits = traits
+        # Generate personalities for each blob (in parallel, as background-priority calls)
+        def generate(blob: Blob) -> Tuple[str, List[str]]:
+            with llm_scheduler.priority("background"):
+                return self.generate_blob_personality(blob)
+
+        with ThreadPoolExecutor(max_workers=max(1, settings.personality_concurrency)) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, generate, blob) for blob in self.blobs]
+            for blob, future in zip(self.blobs, futures):
+                blob.personality, blob.traits = future.result()
+                blob.touch()
         
         # Assign blobs to societies
         self.assign_blobs_to_societies()
+        self.search_index.rebuild(self.blobs, self.world_events)
         
         # Add system prompt
         self.message_history.append(self.get_enhanced_system_prompt(num_blobs))
         
         # Add blob information to message history
+        self.message_history.append({"role": "user", "content": self.get_roster_message()})
+        self.timeline = Timeline(self.current_year, len(self.message_history))
+
+        self.bus.publish("init", self.state_version, {
+            "game": self.game_id, "year": self.current_year,
+            "blobs": len(self.blobs), "societies": len(self.societies),
+        })
+
+    def get_roster_message(self) -> str:
+        """Initial description of the blobs and societies (compact roster unless disabled)"""
+        if settings.context_mode == "relevant":
+            # Individual blobs are sent per turn, only when relevant (see get_turn_context)
+            return (
+                f"The population in aggregate:\n"
+                f"{context_selector.aggregate_summary(self.blobs, self.societies)}\n\n"
+                f"Individual blobs relevant to each turn are listed as compact roster lines "
+                f"with these columns:\n{ROSTER_HEADER}\n"
+                f"id N is Blob-N; soc is the society id (- if none).\n"
+                f"Legend:\n{roster_legend()}\n\n"
+                f"Societies:\n{self.get_societies_to_string(include_members=False)}\n\n"
+                f"Begin the simulation in year 0 with an initial state of the world."
+            )
+
+        if settings.compact_roster:
+            return (
+                f"Here are the blobs in our simulation:\n{self.get_roster_to_string()}\n\n"
+                f"Societies:\n{self.get_societies_to_string(include_members=False)}\n\n"
+                f"Begin the simulation in year 0 with an initial state of the world."
+            )
+
         blob_info = self.get_blobs_to_string()
         personalities_str = "\n\n".join([
             f"{b.name}: {b.personality} (Traits: {', '.join(b.traits)})" for b in self.blobs
@@ -606,16 +911,46 @@ class EnhancedGameState:
         
         societies_info = self.get_societies_to_string()
         
-        self.message_history.append({
-            "role": "user",
-            "content": (
-                f"Here are the blobs in our simulation:\n{blob_info}\n\n"
-                f"Their personalities:\n{personalities_str}\n\n"
-                f"Societies:\n{societies_info}\n\n"
-                f"Begin the simulation in year 0 with an initial state of the world."
-            )
-        })
+        return (
+            f"Here are the blobs in our simulation:\n{blob_info}\n\n"
+            f"Their personalities:\n{personalities_str}\n\n"
+            f"Societies:\n{societies_info}\n\n"
+            f"Begin the simulation in year 0 with an initial state of the world."
+        )
         
+    def recent_events_text(self, max_events: int = 2) -> str:
+        """Headlines and details of the latest events (the relevance query for a no-policy turn)"""
+        return "\n".join(f"{e.headline}\n{e.details}" for e in self.world_events[-max_events:])
+
+    def get_turn_context(self, query: str) -> List[Dict[str, str]]:
+        """
+        Transient per-turn message with the blobs and societies relevant to the query.
+        Empty unless settings.context_mode is "relevant"; never added to the message history.
+        """
+        if settings.context_mode != "relevant" or not self.blobs:
+            return []
+        similarity = self.search_index.blob_similarity(query)
+        blobs = context_selector.select_blobs(self.blobs, self.societies, query, self.current_year,
+                                              settings.context_max_blobs, similarity=similarity)
+        societies = context_selector.select_societies(self.societies, blobs, query)
+        snippets = context_selector.history_snippets(blobs)
+        # Older events similar to the query (the latest ones are already in the history summary)
+        related = self.search_index.related_events(query, k=3, before_index=len(self.world_events) - 2)
+
+        content = (
+            f"Blobs most relevant to this turn ({len(blobs)} of {len(self.blobs)}; "
+            f"the rest are described in aggregate):\n{ROSTER_HEADER}\n"
+            + "\n".join(b.roster_line() for b in blobs)
+        )
+        if societies:
+            content += "\n\nRelevant societies: " + ", ".join(f"Society-{s.society_id} ({s.ideology})" for s in societies)
+        if snippets:
+            content += "\n\nTheir recent history:\n" + "\n".join(snippets)
+        if related:
+            content += "\n\nRelated earlier events:\n" + "\n".join(
+                f"Year {self.world_events[i].year}: {self.world_events[i].headline}" for i in sorted(related))
+        return [{"role": "system", "content": content}]
+
     def summarize_world_history(self, max_events: int = 3) -> str:
         """Create a summary of key historical events to maintain context"""
         if not self.world_events:
@@ -629,170 +964,121 @@ class EnhancedGameState:
         
         return "\n\n".join([event.to_string() for event in events_to_show])
 
-    def parse_event_from_response(self, response: str) -> Optional[WorldEvent]:
-        """Parse a structured event from the AI response"""
-        try:
-            # Try to find and extract JSON from the response
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # Try to find JSON without code blocks
-                json_match = re.search(r'(\{.*\})', response, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(1)
-                else:
-                    # No JSON found
-                    print("No JSON found in response")
-                    return None
-            
+    def generate_event(self, messages: List[Dict[str, str]], temperature: float = 0.7,
+                       frequency_penalty: float = 0.3) -> Tuple[str, Optional[WorldEvent]]:
+        """
+        Ask the model for the next event given the full prompt messages.
+        Invalid or incomplete events get one targeted repair call for the missing fields
+        instead of a whole new turn. Returns the (possibly repaired) response text and the
+        event; the caller adds the response to the message history.
+        """
+        schema = event_parser.event_schema() if settings.structured_events else None
+        with telemetry.stage("llm"):
+            resp_text = OpenAIClient.ask_gpt(
+                messages,
+                temperature=temperature,
+                frequency_penalty=frequency_penalty,
+                return_json=True,
+                json_schema=schema,
+                task="event"
+            )
+
+        with telemetry.stage("parse"):
             try:
-                # Parse the JSON
-                event_data = json.loads(json_str)
-                
-                # Extract the basic event data
-                year = int(event_data.get('year', self.current_year + 1))
-                headline = event_data.get('headline', 'Unknown Event')
-                details = event_data.get('details', 'No details available')
-                
-                # Extract subheadlines
-                subheadlines = event_data.get('subheadlines', [])
-                if not isinstance(subheadlines, list):
-                    subheadlines = []
-                
-                # Extract impacts
-                impacts = {}
-                impact_data = event_data.get('impacts', {})
-                for key, value in impact_data.items():
-                    # Try to extract blob ID from keys like "blob_1" or "Blob-2"
-                    blob_id_match = re.search(r'blob[_-]?(\d+)', key.lower())
-                    if blob_id_match:
-                        blob_id = int(blob_id_match.group(1))
-                        impacts[blob_id] = value
-                    else:
-                        # Try to find blob by name
-                        blob = next((b for b in self.blobs if b.name.lower() == key.lower()), None)
-                        if blob:
-                            impacts[blob.blob_id] = value
-                        else:
-                            # Just use a placeholder ID for unrecognized names
-                            impacts[hash(key) % 1000 + 100] = f"{key}: {value}"
-                
-                # Extract society relations
-                society_relations = {}
-                relations_data = event_data.get('society_relations', [])
-                for relation in relations_data:
-                    society1 = relation.get('society1')
-                    society2 = relation.get('society2')
-                    change_type = relation.get('change', 'none')
-                    
-                    # Skip invalid entries
-                    if society1 is None or society2 is None:
-                        continue
-                        
-                    # Normalize change type
-                    if "big_decrease" in change_type:
-                        change_type = "big_decrease"
-                    elif "decrease" in change_type:
-                        change_type = "decrease"
-                    elif "none" in change_type or "neutral" in change_type:
-                        change_type = "none"
-                    elif "big_increase" in change_type:
-                        change_type = "big_increase"
-                    elif "increase" in change_type:
-                        change_type = "increase"
-                    else:
-                        # Default to no change if we can't parse
-                        change_type = "none"
-                    
-                    # Store relation change
-                    relation_key = f"{society1}-{society2}"
-                    society_relations[relation_key] = change_type
-                
-                # Extract world metrics
-                world_metrics = {}
-                metrics_data = event_data.get('world_metrics', [])
-                valid_metrics = ["happiness", "safety", "environment_cleanliness", 
-                                "trust_in_government", "health", "education", "poverty"]
-                
-                for metric_data in metrics_data:
-                    metric_name = metric_data.get('metric', '').lower().strip()
-                    change_type = metric_data.get('change', 'none')
-                    
-                    # Normalize metric names
-                    metric_name = metric_name.replace(' ', '_')
-                    
-                    # Skip if not a valid metric
-                    if metric_name not in valid_metrics:
-                        continue
-                    
-                    # Normalize change type
-                    if "big_decrease" in change_type:
-                        change_type = "big_decrease"
-                    elif "decrease" in change_type:
-                        change_type = "decrease"
-                    elif "none" in change_type or "neutral" in change_type:
-                        change_type = "none"
-                    elif "big_increase" in change_type:
-                        change_type = "big_increase"
-                    elif "increase" in change_type:
-                        change_type = "increase"
-                    else:
-                        # Default to no change if we can't parse
-                        change_type = "none"
-                    
-                    # Store metric change
-                    world_metrics[metric_name] = change_type
-                
-                event = WorldEvent(year, headline, details, impacts, society_relations, world_metrics)
-                
-                # Add subheadlines to the event
-                event.subheadlines = subheadlines
-                
-                return event
-            
-            except json.JSONDecodeError as e:
-                print(f"Failed to parse JSON: {str(e)}")
-                return None
-        
+                event_data = event_parser.extract_json(resp_text)
+            except event_parser.EventParseError:
+                event_data = None
+            missing = event_parser.missing_fields(event_data)
+
+        if missing:
+            with telemetry.stage("repair"):
+                event_data = self.repair_event(resp_text, event_data, missing)
+            if event_data is not None:
+                resp_text = json.dumps(event_data)
+            telemetry.record_event_parse("failed" if event_data is None else "repaired")
+        else:
+            telemetry.record_event_parse("valid")
+
+        if event_data is None:
+            return resp_text, None
+        with telemetry.stage("parse"):
+            try:
+                event = event_parser.decode_event(event_data, self.current_year + 1, self.blobs)
+            except Exception as e:
+                logger.error("Error decoding event", extra={"error": str(e)})
+                event = None
+        return resp_text, event
+
+    def repair_event(self, resp_text: str, event_data: Optional[Dict[str, Any]],
+                     missing: List[str]) -> Optional[Dict[str, Any]]:
+        """Re-ask only for the missing event fields and merge them into the partial event"""
+        logger.warning("Incomplete event, requesting repair", extra={"missing": missing})
+        partial = event_data if isinstance(event_data, dict) else {}
+        partial_text = json.dumps(partial) if partial else resp_text[:2000]
+        messages = [
+            {"role": "system", "content": "You complete partially generated world events for a blob simulation in JSON."},
+            {"role": "user", "content": (
+                f"This event for year {self.current_year + 1} is incomplete:\n{partial_text}\n\n"
+                f"Return a JSON object with ONLY these fields, consistent with the event: {', '.join(missing)}."
+            )}
+        ]
+        schema = event_parser.event_schema(missing, name="world_event_repair") if settings.structured_events else None
+        try:
+            repair_text = OpenAIClient.ask_gpt(messages, temperature=0.2, return_json=True,
+                                               json_schema=schema, task="event_repair")
+            repaired = event_parser.extract_json(repair_text)
         except Exception as e:
-            print(f"Error parsing event: {str(e)}")
+            logger.error("Event repair failed", extra={"error": str(e)})
             return None
 
+        merged = dict(partial)
+        if isinstance(repaired, dict):
+            merged.update({field: repaired[field] for field in missing if field in repaired})
+        still_missing = event_parser.missing_fields(merged)
+        if still_missing:
+            logger.error("Event still incomplete after repair", extra={"missing": still_missing})
+            return None
+        return merged
+
     def update_blob_histories(self, event: WorldEvent):
         """Update individual blob histories with impacts from an event"""
         if not event.impacts:
             return
             
-        print(f"Updating blob histories for event: {event.headline}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        blobs = self._writable("blobs")
+        positions = {b.blob_id: i for i, b in enumerate(blobs)}
         
         for blob_id_str, impact in event.impacts.items():
             try:
                 # Convert blob_id to int if it's a string
                 blob_id = int(blob_id_str) if isinstance(blob_id_str, str) else blob_id_str
                 
-                # Find the blob
-                blob = next((b for b in self.blobs if b.blob_id == blob_id), None)
+                # Find the blob (a private copy if it is shared with a fork)
+                position = positions.get(blob_id)
                 
-                if blob:
+                if position is not None:
+                    blob = self._ownership.writable_item(blobs, position, Blob.clone)
                     # Add the event to the blob's history
                     blob.add_event(
                         year=event.year,
                         event_type="world_event",
                         description=impact
                     )
-                    print(f"  Added impact to {blob.name}'s history: {impact}")
+                    self.search_index.add_history(blob, len(blob.history) - 1)
+                    if debug:
+                        logger.debug("Impact added to history", extra={"blob_id": blob.blob_id, "impact": impact})
                 else:
-                    print(f"  Warning: Could not find blob with ID {blob_id}")
+                    logger.warning("Impact for unknown blob", extra={"blob_id": blob_id})
             except Exception as e:
-                print(f"Error updating history for blob {blob_id_str}: {str(e)}")
+                logger.error("Error updating blob history", extra={"blob_id": blob_id_str, "error": str(e)})
 
     def update_society_relations(self, event: WorldEvent):
         """Update society relations based on the event's relationship changes"""
         if not event.society_relations:
             return
             
-        print(f"Updating society relations for event: {event.headline}")
+        debug = logger.isEnabledFor(logging.DEBUG)
         
         for relation_key, change_type in event.society_relations.items():
             try:
@@ -804,9 +1090,9 @@ class EnhancedGameState:
                 society1_id = int(society_ids[0])
                 society2_id = int(society_ids[1])
                 
-                # Get the societies
-                society1 = next((s for s in self.societies if s.society_id == society1_id), None)
-                society2 = next((s for s in self.societies if s.society_id == society2_id), None)
+                # Get the societies (private copies if they are shared with a fork)
+                society1 = self._writable_society(society1_id)
+                society2 = self._writable_society(society2_id)
                 
                 if society1 and society2:
                     # Update relations for both societies
@@ -817,31 +1103,39 @@ class EnhancedGameState:
                     society2.update_relation(society1_id, change_type)
                     
                     # Log the changes
-                    print(f"  Society-{society1_id} and Society-{society2_id} relation: {old_relation1:.2f} -> {society1.relations[society2_id]:.2f} ({change_type})")
+                    if debug:
+                        logger.debug("Society relation updated", extra={
+                            "society1": society1_id, "society2": society2_id, "old": old_relation1,
+                            "new": society1.relations[society2_id], "change": change_type
+                        })
             except Exception as e:
-                print(f"Error updating relation for {relation_key}: {str(e)}")
+                logger.error("Error updating society relation", extra={"relation": relation_key, "error": str(e)})
     
-    def run_iteration(self, temperature: float = 0.7, create_image=True) -> WorldEvent:
-        """
-        Run a game iteration with structured output and event parsing
-        """
+    def _writable_society(self, society_id: int) -> Optional[Society]:
+        societies = self._writable("societies")
+        position = next((i for i, s in enumerate(societies) if s.society_id == society_id), None)
+        return self._ownership.writable_item(societies, position, Society.clone) if position is not None else None
+
+    def build_iteration_messages(self) -> List[Dict[str, str]]:
+        """Prompt messages that advance the simulation by one time period (not yet in the history)"""
+        new_messages = []
         # Add history summary if we have previous events
         if self.world_events:
             history_summary = self.summarize_world_history()
-            self.message_history.append({
+            new_messages.append({
                 "role": "system",
                 "content": f"Recent world history:\n{history_summary}"
             })
             
             # Add current metrics to provide context
             metrics_summary = self.world_metrics.get_summary()
-            self.message_history.append({
+            new_messages.append({
                 "role": "system",
                 "content": f"Current world metrics:\n{metrics_summary}"
             })
         
         # Add format reminder to the prompt
-        format_reminder = {
+        new_messages.append({
             "role": "user", 
             "content": (
                 "Advance the simulation by one time period. Return your response as a JSON object "
@@ -852,49 +1146,216 @@ class EnhancedGameState:
                 "(big_decrease, decrease, none, increase, or big_increase) based on the events."
                 "IMPORTANT: Return your response as a JSON object"
             )
-        }
-        self.message_history.append(format_reminder)
-        
-        # Get response
-        resp_text = OpenAIClient.ask_gpt(
-            self.message_history, 
-            temperature=temperature, 
-            frequency_penalty=0.3,
-            return_json=True
-        )
-        
-        # Add response to message history
-        self.message_history.append({"role": "assistant", "content": resp_text})
+        })
+        return new_messages
+
+    def run_iteration(self, temperature: float = 0.7, create_image=True) -> WorldEvent:
+        """
+        Run a game iteration with structured output and event parsing.
+        A prefetched candidate for the current state version is served without a new LLM call.
+        """
+        prefetched = self.take_prefetched_iteration(temperature)
+        if prefetched is not None:
+            new_messages, resp_text, event = prefetched
+        else:
+            with telemetry.stage("prompt_assembly"):
+                new_messages = self.build_iteration_messages()
+                turn_context = self.get_turn_context(self.recent_events_text())
+            
+            # Get and parse the response
+            resp_text, event = self.generate_event(
+                self.message_history + turn_context + new_messages, temperature=temperature, frequency_penalty=0.3
+            )
         
-        # Parse the event
-        event = self.parse_event_from_response(resp_text)
+        # Add the prompt and response to message history
+        message_history = self._writable("message_history")
+        message_history.extend(new_messages)
+        message_history.append({"role": "assistant", "content": resp_text})
         
         if event:
-            # Update game state
-            self.current_year = event.year
-            self.world_events.append(event)
-            
-            # Update society relations based on the event
+            self.apply_event(event, create_image=create_image)
+            return event
+        else:
+            logger.error("Could not parse a valid event from the response")
+            self.mark_changed()
+            return None
+
+    def mark_changed(self):
+        """Bump the state version (invalidates prefetched iterations)"""
+        self.state_version += 1
+
+    def start_prefetch(self, temperature: float = 0.7):
+        """
+        Speculatively generate the next no-policy iteration in the background.
+        The candidate is only served if the state version is unchanged when it is requested.
+        """
+        if not self.blobs:
+            return
+        new_messages = self.build_iteration_messages()
+        messages = self.message_history + self.get_turn_context(self.recent_events_text()) + new_messages
+
+        def generate() -> Tuple[str, Optional[WorldEvent]]:
+            with llm_scheduler.priority("background"):
+                return self.generate_event(messages, temperature=temperature, frequency_penalty=0.3)
+
+        # Fresh context: the prefetch must not be attributed to the turn that triggered it
+        future = _prefetch_executor.submit(contextvars.Context().run, generate)
+        candidate = PrefetchedIteration(self.state_version, temperature, new_messages, future)
+        with self._prefetch_lock:
+            previous, self._prefetch = self._prefetch, candidate
+        if previous is not None:
+            previous.discard("replaced")
+
+    def discard_prefetch(self):
+        """Drop any pending prefetched iteration (e.g. a policy is being proposed instead)"""
+        with self._prefetch_lock:
+            candidate, self._prefetch = self._prefetch, None
+        if candidate is not None:
+            candidate.discard("discarded")
+
+    def take_prefetched_iteration(self, temperature: float) -> Optional[Tuple[List[Dict[str, str]], str, WorldEvent]]:
+        """Claim the prefetched iteration if it was generated for this state version and temperature"""
+        with self._prefetch_lock:
+            candidate, self._prefetch = self._prefetch, None
+        if candidate is None:
+            return None
+        if candidate.version != self.state_version or candidate.temperature != temperature:
+            candidate.discard("stale")
+            return None
+
+        # The candidate may still be in flight; waiting for it beats starting a new call
+        with telemetry.stage("prefetch_wait"):
+            try:
+                resp_text, event = candidate.future.result()
+            except Exception as e:
+                logger.warning("Prefetched iteration failed", extra={"error": str(e)})
+                event = None
+        if event is None:
+            telemetry.registry.inc("blob_prefetch_total", outcome="failed")
+            return None
+        telemetry.registry.inc("blob_prefetch_total", outcome="served")
+        return candidate.new_messages, resp_text, event
+
+    def apply_event(self, event: WorldEvent, create_image: bool = True):
+        """Commit a parsed event to the world state"""
+        # Update game state
+        self.mark_changed()
+        self._writable("timeline", Timeline.clone).turns.append(TurnDelta.capture(self, event))
+        self.current_year = event.year
+        self._writable("world_events").append(event)
+        self.search_index.add_event(len(self.world_events) - 1, event)
+        metrics_before = dict(self.world_metrics.metrics) if self.bus.has_subscribers else None
+        
+        # Update society relations based on the event
+        with telemetry.stage("relations"):
             self.update_society_relations(event)
-            
-            # Update world metrics based on the event
+        
+        # Update world metrics based on the event
+        with telemetry.stage("metrics"):
             self.update_world_metrics(event)
-            
-            # Update blob histories with impacts
+        
+        # Update blob histories with impacts
+        with telemetry.stage("histories"):
             self.update_blob_histories(event)
-            
-            if create_image:
-                # Generate an image for the event using our LLM-driven method
+
+        if metrics_before is not None:
+            self.publish_event_deltas(event, metrics_before)
+        
+        if create_image:
+            # Generate an image for the event using our LLM-driven method
+            with telemetry.stage("image"):
                 image_url = self.generate_event_image(event)
-                
-                # Log the successful image generation
-                if image_url:
-                    print(f"Successfully generated comic-style image for event: {event.headline}")
             
-            return event
-        else:
-            print("Could not parse a valid event from the response")
-            return None
+            # Log the successful image generation
+            if image_url:
+                logger.info("Generated event image", extra={"year": event.year})
+                self.bus.publish("img", self.state_version,
+                                 {"i": len(self.world_events) - 1, "url": image_url})
+
+    def publish_event_deltas(self, event: WorldEvent, metrics_before: Dict[str, float]):
+        """Push the changes committed by an event to live viewers"""
+        version, index = self.state_version, len(self.world_events) - 1
+        self.bus.publish("ev", version, {
+            "i": index, "year": event.year, "headline": event.headline, "details": event.details,
+            "subheadlines": event.subheadlines, "metrics_headline": event.metrics_headline,
+            "impacts": {str(blob_id): impact for blob_id, impact in event.impacts.items()},
+        })
+
+        changed = {name: round(value, 3) for name, value in self.world_metrics.metrics.items()
+                   if value != metrics_before.get(name)}
+        if changed:
+            self.bus.publish("m", version, changed)
+
+        # [society1, society2, new score] for each pair the event touched
+        societies = {s.society_id: s for s in self.societies}
+        relations = []
+        for relation_key in event.society_relations:
+            first, _, second = relation_key.partition("-")
+            if first.isdigit() and second.isdigit() and int(first) in societies:
+                score = societies[int(first)].relations.get(int(second))
+                if score is not None:
+                    relations.append([int(first), int(second), round(score, 3)])
+        if relations:
+            self.bus.publish("rel", version, relations)
+
+        # [blob id, history index] of each appended entry; the text is the event's impact for that blob
+        blobs = {b.blob_id: b for b in self.blobs}
+        appended = [[blob_id, len(blobs[blob_id].history) - 1] for blob_id in event.impacts if blob_id in blobs]
+        if appended:
+            self.bus.publish("h", version, appended)
+
+    def rewind(self, year: int) -> int:
+        """
+        Restore the world as it was when year was committed (the initialization year: right after
+        initialization) by undoing the later turns from their timeline deltas, without LLM calls.
+        Returns the number of turns undone; raises ValueError if year is not on the timeline.
+        Rewinding to the latest turn's year changes nothing (the game id and version are kept).
+        """
+        kept = self.timeline.turns_through(year)
+        undone, messages = self.timeline.turns[kept:], self.timeline.messages_at(kept)
+        if not undone:
+            return 0
+        self.discard_prefetch()
+
+        blobs = self._writable("blobs")
+        positions = {b.blob_id: i for i, b in enumerate(blobs)}
+        for delta in reversed(undone):
+            world_events = self._writable("world_events")
+            for event_index in range(delta.events, len(world_events)):
+                self.search_index.remove_event(event_index)
+            del world_events[delta.events:]
+
+            if delta.metrics:
+                world_metrics = self._writable("world_metrics", WorldMetrics.clone)
+                for metric_name, (value, history_length) in delta.metrics.items():
+                    world_metrics.metrics[metric_name] = value
+                    del world_metrics.history[metric_name][history_length:]
+
+            for society_id, other_id, score in reversed(delta.relations):
+                society = self._writable_society(society_id)
+                if score is None:
+                    society.relations.pop(other_id, None)
+                else:
+                    society.relations[other_id] = score
+
+            for blob_id, history_length in delta.histories:
+                blob = self._ownership.writable_item(blobs, positions[blob_id], Blob.clone)
+                if len(blob.history) > history_length:
+                    for entry_index in range(history_length, len(blob.history)):
+                        self.search_index.remove_history(blob_id, entry_index)
+                    del blob.history[history_length:]
+                    blob.touch()
+            self.current_year = delta.previous_year
+
+        del self._writable("timeline", Timeline.clone).turns[kept:]
+        del self._writable("message_history")[messages:]
+        # Event indices and versions are reused by the new future, so cached /event responses must not match
+        self.game_id = uuid.uuid4().hex[:12]
+        self.mark_changed()
+        self.bus.publish("rewind", self.state_version, {
+            "game": self.game_id, "year": self.current_year, "events": len(self.world_events),
+        })
+        return len(undone)
 
     def create_image_prompt(self, event: WorldEvent, previous_event: Optional[WorldEvent]) -> str:
         """
@@ -929,57 +1390,58 @@ class EnhancedGameState:
         
         if urls:
             event.image_url = urls[0]
-            print(f"Generated consistent blob-style image for event: {event.image_url}")
+            event.touch()
+            logger.debug("Event image URL", extra={"year": event.year, "image_url": event.image_url})
             return event.image_url
         return None
 
-    def policy_proposition(self, proposal: str, temperature: float = 0.7, create_image=True) -> str:
-        """Submit a user policy proposition to the simulation"""
-        # Add current metrics to provide context
-        metrics_summary = self.world_metrics.get_summary()
-        self.message_history.append({
-            "role": "system",
-            "content": f"Current world metrics:\n{metrics_summary}"
-        })
-        
-        # Add proposal to message history
-        self.message_history.append({
-            "role": "user", 
-            "content": (
-                f"POLICY PROPOSITION: {proposal}\n\n"
-                f"The lawmaker proposes a new policy to be enacted in the blob world. "
-                f"How does this affect the world of blobs? Return your response as a JSON object "
-                f"with fields for year, headline, details, subheadlines (5 fun, quirky headlines), "
-                f"impacts, society_relations, and world_metrics."
-            )
-        })
-        
-        # Get response
-        resp_text = OpenAIClient.ask_gpt(self.message_history, temperature=temperature, return_json=True)
-        self.message_history.append({"role": "assistant", "content": resp_text})
+    def policy_proposition(self, proposal: str, temperature: float = 0.7, create_image=True, fast: bool = False) -> str:
+        """
+        Submit a user policy proposition to the simulation. In fast mode, the cached outcome of the same
+        or a near-identical policy in this same world is replayed instead of asking the model (see app.policy_cache).
+        """
+        # A policy replaces the speculative no-policy iteration
+        self.discard_prefetch()
+        fingerprint = self.fingerprint()
+
+        with telemetry.stage("prompt_assembly"):
+            # Add current metrics to provide context
+            metrics_summary = self.world_metrics.get_summary()
+            new_messages = [{
+                "role": "system",
+                "content": f"Current world metrics:\n{metrics_summary}"
+            }]
+            
+            # Add proposal to message history
+            new_messages.append({
+                "role": "user", 
+                "content": (
+                    f"POLICY PROPOSITION: {proposal}\n\n"
+                    f"The lawmaker proposes a new policy to be enacted in the blob world. "
+                    f"How does this affect the world of blobs? Return your response as a JSON object "
+                    f"with fields for year, headline, details, subheadlines (5 fun, quirky headlines), "
+                    f"impacts, society_relations, and world_metrics."
+                )
+            })
+            turn_context = self.get_turn_context(f"{proposal}\n{self.recent_events_text()}")
         
-        # Parse the event
-        event = self.parse_event_from_response(resp_text)
+        # Get and parse the response (or replay a cached one)
+        cached = outcome_cache.lookup(fingerprint, proposal) if fast else None
+        if cached is not None:
+            resp_text, event = cached.response, WorldEvent.from_dict(copy.deepcopy(cached.event))
+            event.replayed = True
+        else:
+            resp_text, event = self.generate_event(self.message_history + turn_context + new_messages,
+                                                   temperature=temperature)
+            if event:
+                outcome_cache.store(fingerprint, proposal, resp_text, copy.deepcopy(event.to_dict()))
+        message_history = self._writable("message_history")
+        message_history.extend(new_messages)
+        message_history.append({"role": "assistant", "content": resp_text})
         if event:
-            self.current_year = event.year
-            self.world_events.append(event)
-            
-            # Update society relations based on the event
-            self.update_society_relations(event)
-            
-            # Update world metrics based on the event
-            self.update_world_metrics(event)
-            
-            # Update blob histories with impacts
-            self.update_blob_histories(event)
-            
-            if create_image:
-                # Use our LLM-driven image generation method
-                image_url = self.generate_event_image(event)
-                
-                # Log the successful image generation
-                if image_url:
-                    print(f"Successfully generated comic-style image for policy event: {event.headline}")
+            self.apply_event(event, create_image=create_image)
+        else:
+            self.mark_changed()
         
         return resp_text    
 
@@ -1048,9 +1510,11 @@ class EnhancedGameState:
             f"for the future of blob societies. Keep it under 500 characters."
         )
         
-        self.message_history.append({"role": "user", "content": prompt})
-        resp_text = OpenAIClient.ask_gpt(self.message_history, temperature=0.5)
-        self.message_history.append({"role": "assistant", "content": resp_text})
+        message_history = self._writable("message_history")
+        message_history.append({"role": "user", "content": prompt})
+        resp_text = OpenAIClient.ask_gpt(message_history, temperature=0.5, task="metrics_report")
+        message_history.append({"role": "assistant", "content": resp_text})
+        self.mark_changed()
         
         return resp_text
 
@@ -1075,46 +1539,35 @@ class EnhancedGameState:
             f"Keep it under 800 characters and focus on the most interesting elements."
         )
         
-        self.message_history.append({"role": "user", "content": prompt})
-        resp_text = OpenAIClient.ask_gpt(self.message_history, temperature=0.5)
-        self.message_history.append({"role": "assistant", "content": resp_text})
+        message_history = self._writable("message_history")
+        message_history.append({"role": "user", "content": prompt})
+        resp_text = OpenAIClient.ask_gpt(message_history, temperature=0.5, task="status_report")
+        message_history.append({"role": "assistant", "content": resp_text})
+        self.mark_changed()
         
         return resp_text
 
 
 
+    def relations_matrix(self) -> Tuple[List[int], List[str], array]:
+        """Society ids, ideologies and the row-major matrix of relation scores (0.0 when unset)"""
+        ids = [s.society_id for s in self.societies]
+        scores = array("d", bytes(8 * len(ids) * len(ids)))
+        for i, society in enumerate(self.societies):
+            row = i * len(ids)
+            for j, other_id in enumerate(ids):
+                scores[row + j] = society.relations.get(other_id, 0.0)
+        return ids, [s.ideology for s in self.societies], scores
+
+    def impact_story_rows(self) -> List[Tuple[int, str, List[Tuple[Any, str]]]]:
+        """(blob_id, personality, [(year, description), ...]) per blob, the input of executor.impact_strings"""
+        return [(b.blob_id, b.personality, [(h["year"], h["description"]) for h in b.history]) for b in self.blobs]
+
     def get_society_relations_report(self) -> str:
         """Generate a specific report about current society relations"""
         if not self.societies:
             return "No societies exist in the simulation."
-            
-        relations_status = []
-        for i, society1 in enumerate(self.societies):
-            for j, society2 in enumerate(self.societies):
-                if i < j:  # Only process each pair once
-                    relation = society1.relations.get(society2.society_id, 0.0)
-                    
-                    # Get a qualitative description
-                    description = "Neutral"
-                    if relation >= 0.75:
-                        description = "Allied"
-                    elif relation >= 0.4:
-                        description = "Friendly"
-                    elif relation >= 0.1:
-                        description = "Positive"
-                    elif relation <= -0.75:
-                        description = "Hostile"
-                    elif relation <= -0.4:
-                        description = "Unfriendly"
-                    elif relation <= -0.1:
-                        description = "Tense"
-                    
-                    relations_status.append(
-                        f"Society-{society1.society_id} ({society1.ideology}) and "
-                        f"Society-{society2.society_id} ({society2.ideology}): {description} ({relation:.2f})"
-                    )
-        
-        return "Current Society Relations:\n" + "\n".join([f"- {rel}" for rel in relations_status])
+        return relations_report(*self.relations_matrix())
 
 if __name__ == "__main__":
     # Example usage
@@ -0,0 +1,152 @@
+"""
+Response Compression
+--------------------
+ASGI middleware that compresses HTTP responses with the best encoding the
+client accepts: zstd or brotli when the optional zstandard/brotli packages are
+installed, gzip otherwise. Only textual content types at or above a size
+threshold are compressed; streaming responses and WebSocket traffic are passed
+through untouched.
+
+Strong ETags of compressed responses get the encoding appended ("abc-gzip"),
+since the compressed bytes differ from the identity representation;
+etag_matches accepts either form when evaluating If-None-Match.
+"""
+
+import gzip
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+
+# Server preference among encodings the client accepts equally
+ENCODING_PREFERENCE = ["zstd", "br", "gzip"]
+
+
+def available_encodings() -> List[str]:
+    return [e for e in ENCODING_PREFERENCE
+            if e == "gzip" or (e == "br" and brotli is not None) or (e == "zstd" and zstandard is not None)]
+
+
+def negotiate(accept_encoding: str, available: Optional[List[str]] = None) -> Optional[str]:
+    """Pick an encoding from an Accept-Encoding header (q-values honored, q=0 excluded)"""
+    available = available if available is not None else available_encodings()
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in available:  # In preference order, so ties go to the preferred encoding
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation that also accepts encoding-suffixed variants of the ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == bare or any(candidate == f"{bare}-{e}" for e in ENCODING_PREFERENCE):
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli/zstd compression for buffered responses above minimum_size bytes"""
+    def __init__(self, app: Callable, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 5, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors: Dict[str, Callable[[bytes], bytes]] = {
+            "gzip": lambda body: gzip.compress(body, compresslevel=gzip_level),
+        }
+        if brotli is not None:
+            self.compressors["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+        if zstandard is not None:
+            self.compressors["zstd"] = zstandard.ZstdCompressor(level=zstd_level).compress
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        # None still goes through the wrapper so caches see Vary: Accept-Encoding
+        encoding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"), list(self.compressors))
+
+        start_message = None
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, streaming
+            if message["type"] == "http.response.start":
+                start_message = message  # Held back until the body is known
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            if streaming or message.get("more_body", False):
+                # Streaming response: pass through uncompressed
+                if not streaming:
+                    streaming = True
+                    await send(start_message)
+                await send(message)
+                return
+            start, body = self._encode(start_message, message.get("body", b""), encoding)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _encode(self, start: dict, body: bytes, encoding: Optional[str]) -> Tuple[dict, bytes]:
+        headers = [(k, v) for k, v in start.get("headers", [])]
+        lookup = {k.lower(): v for k, v in headers}
+        content_type = lookup.get(b"content-type", b"").decode("latin-1")
+        if not content_type.startswith(COMPRESSIBLE_TYPES) or b"content-encoding" in lookup:
+            return start, body
+
+        vary = lookup.get(b"vary")
+        headers = [(k, v) for k, v in headers if k.lower() != b"vary"]
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if encoding is None or len(body) < self.minimum_size or start.get("status") in (204, 304):
+            return {**start, "headers": headers}, body
+
+        compressed = self.compressors[encoding](body)
+        rewritten = []
+        for key, value in headers:
+            name = key.lower()
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                value = value.rstrip(b'"') + f"-{encoding}\"".encode("latin-1")
+            rewritten.append((key, value))
+        rewritten.append((b"content-encoding", encoding.encode("latin-1")))
+        rewritten.append((b"content-length", str(len(compressed)).encode("latin-1")))
+        return {**start, "headers": rewritten}, compressed
@@ -1,10 +1,119 @@
 import os
+import json
 from dotenv import load_dotenv
 
 # Load variables from .env file
 load_dotenv()
 
+# Default model routing table; override or extend with
+# BLOB_MODEL_ROUTES='{"personality": {"model": "gpt-4o"}}'
+DEFAULT_MODEL_ROUTES = {
+    "default": {"model": "gpt-4o", "max_tokens": None, "timeout": 60},
+    "event": {"model": "gpt-4o", "max_tokens": 2500, "timeout": 60},
+    "event_repair": {"model": "gpt-4o-mini", "max_tokens": 800, "timeout": 20},
+    "personality": {"model": "gpt-4o-mini", "max_tokens": 120, "timeout": 15},
+    "societies": {"model": "gpt-4o-mini", "max_tokens": 500, "timeout": 20},
+    "status_report": {"model": "gpt-4o-mini", "max_tokens": 350, "timeout": 30},
+    "metrics_report": {"model": "gpt-4o-mini", "max_tokens": 250, "timeout": 30},
+}
+
+def _model_routes():
+    routes = {task: dict(route) for task, route in DEFAULT_MODEL_ROUTES.items()}
+    for task, route in json.loads(os.getenv("BLOB_MODEL_ROUTES", "{}")).items():
+        routes[task] = {**routes.get(task, routes["default"]), **route}
+    return routes
+
 # Access environment variables
 class Settings:
     openai_api_key = os.getenv("OPENAI_API_KEY")
+
+    # Offline LLM stand-in (used for benchmarks and local runs without an API key)
+    offline_llm = os.getenv("BLOB_OFFLINE_LLM", "0") == "1"
+    offline_llm_latency_ms = float(os.getenv("BLOB_OFFLINE_LLM_LATENCY_MS", "0"))
+    offline_llm_error_rate = float(os.getenv("BLOB_OFFLINE_LLM_ERROR_RATE", "0"))
+
+    # Export turn/stage spans through OpenTelemetry (requires opentelemetry-api)
+    otel_enabled = os.getenv("BLOB_OTEL", "0") == "1"
+
+    # Request events with the provider's strict JSON-schema structured output
+    structured_events = os.getenv("BLOB_STRUCTURED_EVENTS", "1") == "1"
+
+    # Circuit breaker shared by all provider calls
+    circuit_failure_threshold = int(os.getenv("BLOB_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    circuit_reset_timeout = float(os.getenv("BLOB_CIRCUIT_RESET_TIMEOUT", "30"))
+
+    # Client-side provider rate limits (0 = unlimited)
+    llm_rpm = float(os.getenv("BLOB_LLM_RPM", "0"))
+    llm_tpm = float(os.getenv("BLOB_LLM_TPM", "0"))
+    image_rpm = float(os.getenv("BLOB_IMAGE_RPM", "0"))
+    personality_concurrency = int(os.getenv("BLOB_PERSONALITY_CONCURRENCY", "4"))
+
+    # Per-task model routing: each task kind gets its own model, max_tokens and timeout (seconds)
+    model_routes = _model_routes()
+
+    # Hedged requests: duplicate a call still pending after the task's p90 latency
+    hedge_enabled = os.getenv("BLOB_HEDGE", "0") == "1"
+    hedge_tasks = set(os.getenv("BLOB_HEDGE_TASKS", "event").split(","))
+    hedge_percentile = float(os.getenv("BLOB_HEDGE_PERCENTILE", "90"))
+    hedge_min_samples = int(os.getenv("BLOB_HEDGE_MIN_SAMPLES", "20"))
+    hedge_budget = float(os.getenv("BLOB_HEDGE_BUDGET", "0.1"))  # Max hedges per call, per task
+    hedge_max_workers = int(os.getenv("BLOB_HEDGE_MAX_WORKERS", "8"))
+
+    # Encode the blob roster as one compact line per blob (short demographic codes plus a legend)
+    compact_roster = os.getenv("BLOB_COMPACT_ROSTER", "1") == "1"
+
+    # "full" keeps the whole roster in the history; "relevant" sends an aggregate summary once
+    # and, per turn, only the blobs most relevant to the policy or recent events
+    context_mode = os.getenv("BLOB_CONTEXT_MODE", "full")
+    context_max_blobs = int(os.getenv("BLOB_CONTEXT_MAX_BLOBS", "12"))
+
+    # Compress responses of at least compression_min_size bytes (gzip, or brotli/zstd when installed)
+    compression_enabled = os.getenv("BLOB_COMPRESSION", "1") == "1"
+    compression_min_size = int(os.getenv("BLOB_COMPRESSION_MIN_SIZE", "1024"))
+
+    # Messages buffered per WebSocket viewer before it is told to resync
+    ws_max_queue = int(os.getenv("BLOB_WS_MAX_QUEUE", "256"))
+
+    # Where game sessions live: "memory" (single worker), "sqlite" (workers on one host) or
+    # "redis" (any number of hosts; redis_url "memory://" selects the in-process stand-in)
+    session_store = os.getenv("BLOB_SESSION_STORE", "memory")
+    session_sqlite_path = os.getenv("BLOB_SESSION_SQLITE_PATH", "sessions.db")
+    redis_url = os.getenv("BLOB_REDIS_URL", "memory://")
+    session_cache_size = int(os.getenv("BLOB_SESSION_CACHE_SIZE", "64"))  # Deserialized states kept per worker
+
+    # uvicorn worker processes when run as a script (more than one needs a shared session store)
+    workers = int(os.getenv("BLOB_WORKERS", "1"))
+
+    # Largest world /initialize accepts (large-population mode: raise it and offload CPU work below)
+    max_blobs = int(os.getenv("BLOB_MAX_BLOBS", "50"))
+
+    # CPU-heavy work off the event loop: "inline", "thread" or "process" (see app/executor.py);
+    # work smaller than executor_min_items items always runs inline
+    executor_kind = os.getenv("BLOB_EXECUTOR", "thread")
+    executor_workers = int(os.getenv("BLOB_EXECUTOR_WORKERS", "0")) or (os.cpu_count() or 1)
+    executor_min_items = int(os.getenv("BLOB_EXECUTOR_MIN_ITEMS", "256"))
+
+    # Monte Carlo policy previews (/policy/evaluate): rollouts in flight across all requests,
+    # rollouts per request, and evaluations kept in the cache
+    policy_eval_concurrency = int(os.getenv("BLOB_POLICY_EVAL_CONCURRENCY", "4"))
+    policy_eval_max_samples = int(os.getenv("BLOB_POLICY_EVAL_MAX_SAMPLES", "16"))
+    policy_eval_cache_size = int(os.getenv("BLOB_POLICY_EVAL_CACHE_SIZE", "128"))
+
+    # Policy outcome cache (see app/policy_cache.py): fast-mode proposals replay the cached outcome of
+    # a policy for the same world at least this similar; bounded by estimated size and age (seconds)
+    policy_cache_similarity = float(os.getenv("BLOB_POLICY_CACHE_SIMILARITY", "0.9"))
+    policy_cache_max_bytes = int(os.getenv("BLOB_POLICY_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+    policy_cache_ttl = float(os.getenv("BLOB_POLICY_CACHE_TTL", "3600"))
+
+    # Speculatively generate the next no-policy iteration after each committed turn
+    prefetch_enabled = os.getenv("BLOB_PREFETCH", "0") == "1"
+
+    # USD per million (input, output) tokens, for the per-task cost report
+    model_prices = {
+        "gpt-4o": (2.50, 10.00),
+        "gpt-4o-mini": (0.15, 0.60),
+    }
+
+    # Log level for the structured logger (DEBUG enables per-blob/metric lines)
+    log_level = os.getenv("BLOB_LOG_LEVEL", "INFO")
 settings = Settings()
@@ -0,0 +1,123 @@
+"""
+Context Selector
+----------------
+Picks the blobs, societies and history snippets that matter for the next turn so
+the prompt does not have to carry the whole population. Blobs are ranked by
+keyword overlap between the turn's query (policy text or recent headlines) and
+their personality, traits, society and history, plus how often they were
+impacted by recent events. Everyone else is described only in aggregate.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+_WORD = re.compile(r"[a-z][a-z'-]+")
+
+STOPWORDS = frozenset("""
+a about after again all also an and any are as at be because been before being but by can could did do
+does for from had has have he her his how i if in into is it its more most no not of on or our out over
+own she should so some such than that the their them then there these they this those through to too
+under up very was we were what when where which while who why will with would you your blob blobs
+""".split())
+
+# Score weights: a matching keyword, similarity (about 0-1) from the search index,
+# and an impact in the last few years (decaying with age)
+KEYWORD_WEIGHT = 1.0
+SIMILARITY_WEIGHT = 4.0
+IMPACT_WEIGHT = 2.0
+IMPACT_DECAY = 0.5
+IMPACT_WINDOW = 5
+
+
+def keywords(text: str) -> Counter:
+    """Lowercased content words of a text with their counts"""
+    return Counter(w for w in _WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 2)
+
+
+def blob_text(blob: Any, societies: Dict[int, Any]) -> str:
+    """Searchable description of a blob (personality, traits, society and history)"""
+    society = societies.get(blob.society_id)
+    parts = [blob.personality, " ".join(blob.traits)]
+    if society is not None:
+        parts.append(f"{society.ideology} {' '.join(society.values)}")
+    parts.extend(entry.get("description", "") for entry in blob.history)
+    parts.extend(str(value) for value in blob.properties.values())
+    return " ".join(parts)
+
+
+def impact_score(blob: Any, current_year: int) -> float:
+    """Recency-weighted count of the blob's recent event impacts"""
+    score = 0.0
+    for entry in reversed(blob.history):
+        age = current_year - entry.get("year", 0)
+        if age >= IMPACT_WINDOW:
+            break
+        score += IMPACT_DECAY ** max(age, 0)
+    return score
+
+
+def rank_blobs(blobs: Sequence[Any], societies: Sequence[Any], query: str,
+               current_year: int, similarity: Optional[Dict[int, float]] = None) -> List[Any]:
+    """
+    Blobs ordered from most to least relevant to the query (ties keep roster order).
+    A precomputed text similarity per blob id (e.g. from the search index) replaces keyword overlap.
+    """
+    query_terms = keywords(query)
+    by_id = {s.society_id: s for s in societies}
+
+    def score(blob: Any) -> float:
+        if similarity is not None:
+            text_score = SIMILARITY_WEIGHT * similarity.get(blob.blob_id, 0.0)
+        else:
+            terms = keywords(blob_text(blob, by_id))
+            text_score = KEYWORD_WEIGHT * sum(min(count, terms[word])
+                                              for word, count in query_terms.items() if word in terms)
+        return text_score + IMPACT_WEIGHT * impact_score(blob, current_year)
+
+    scored = [(score(blob), index, blob) for index, blob in enumerate(blobs)]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [blob for _, _, blob in scored]
+
+
+def select_blobs(blobs: Sequence[Any], societies: Sequence[Any], query: str,
+                 current_year: int, limit: int, similarity: Optional[Dict[int, float]] = None) -> List[Any]:
+    """The `limit` most relevant blobs, in roster order"""
+    selected = rank_blobs(blobs, societies, query, current_year, similarity)[:limit]
+    return sorted(selected, key=lambda blob: blob.blob_id)
+
+
+def select_societies(societies: Sequence[Any], selected_blobs: Iterable[Any], query: str) -> List[Any]:
+    """Societies of the selected blobs, plus any whose ideology or values match the query"""
+    member_of = {blob.society_id for blob in selected_blobs}
+    query_terms = keywords(query)
+    return [s for s in societies
+            if s.society_id in member_of
+            or query_terms.keys() & keywords(f"{s.ideology} {' '.join(s.values)}").keys()]
+
+
+def history_snippets(blobs: Iterable[Any], per_blob: int = 1) -> List[str]:
+    """Most recent history entries of the given blobs"""
+    snippets = []
+    for blob in blobs:
+        for entry in blob.history[-per_blob:]:
+            snippets.append(f"Blob-{blob.blob_id} (year {entry.get('year')}): {entry.get('description', '')}")
+    return snippets
+
+
+def aggregate_summary(blobs: Sequence[Any], societies: Sequence[Any],
+                      properties: Optional[Sequence[str]] = None) -> str:
+    """Population-level summary: society sizes and the most common value of each property"""
+    lines = [f"Population: {len(blobs)} blobs"]
+    sizes = Counter(blob.society_id for blob in blobs)
+    society_sizes = [f"Society-{s.society_id}: {sizes.get(s.society_id, 0)}" for s in societies]
+    if sizes.get(None):
+        society_sizes.append(f"unaffiliated: {sizes[None]}")
+    lines.append("Society sizes: " + ", ".join(society_sizes))
+
+    names = properties or (list(blobs[0].properties) if blobs else [])
+    for name in names:
+        counts = Counter(blob.properties.get(name) for blob in blobs)
+        top = ", ".join(f"{value} {count * 100 // len(blobs)}%" for value, count in counts.most_common(3))
+        lines.append(f"{name}: {top}")
+    return "\n".join(lines)
@@ -0,0 +1,63 @@
+"""
+Copy-on-Write Sharing
+---------------------
+Forks of a game (what-if branches, undo, Monte Carlo rollouts) share every
+mutable container and object with the state they were forked from, so creating
+a fork is O(1). Each side records what it owns: containers and objects it
+created or copied since the last fork. Before changing anything else in place it
+takes a private shallow copy, swaps it into its own structure and owns that
+from then on. A fork therefore pays only for the parts it changes, and neither
+side ever sees the other's changes.
+
+Ownership is symmetric: forking releases everything the parent owned too, so
+the parent copies before its next change just like the fork.
+
+Precondition: fork only while nothing is changing the parent. A writer that
+already fetched an owned container before the fork still changes it in place
+afterwards, and the fork shares that container, so the fork sees the change.
+"""
+
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Ownership:
+    """The mutable objects one side may change in place (all of them until it is first forked)"""
+    __slots__ = ("_owned",)
+
+    def __init__(self, exclusive: bool = True):
+        # None: nothing is shared. Owned objects are kept alive so their ids cannot be reused
+        self._owned: Optional[Dict[int, Any]] = None if exclusive else {}
+
+    def owns(self, obj: Any) -> bool:
+        return self._owned is None or self._owned.get(id(obj)) is obj
+
+    def claim(self, obj: T) -> T:
+        """Record a new or privately copied object as owned"""
+        if self._owned is not None:
+            self._owned[id(obj)] = obj
+        return obj
+
+    def fork(self) -> "Ownership":
+        """
+        Share everything owned so far; returns the fork's (empty) ownership. Only call while no
+        writer holds an owned container (e.g. between turns), or the fork sees that writer's changes.
+        """
+        self._owned = {}
+        return Ownership(exclusive=False)
+
+    def writable_attr(self, obj: Any, name: str, copy: Callable[[T], T]) -> T:
+        """Attribute of obj, first replaced by an owned copy if it is shared"""
+        value = getattr(obj, name)
+        if not self.owns(value):
+            value = self.claim(copy(value))
+            setattr(obj, name, value)
+        return value
+
+    def writable_item(self, items: Any, key: Any, copy: Callable[[T], T]) -> T:
+        """items[key] (items must be owned), first replaced by an owned copy if it is shared"""
+        value = items[key]
+        if not self.owns(value):
+            value = items[key] = self.claim(copy(value))
+        return value
@@ -0,0 +1,120 @@
+"""
+World Event Bus
+---------------
+Fan-out of committed world changes to live viewers (the /ws WebSocket). Each
+change is encoded once as a compact JSON message and offered to every
+subscriber's bounded queue, so any number of viewers share one generation.
+
+Message format: {"t": type, "v": state version, "d": payload}, with types
+    init  world (re)initialized        ev   new event
+    m     metric values that changed   rel  society relation scores
+    h     blob history appends         img  event image ready
+    rewind  the world was rewound to an earlier year (refetch state)
+    resync  the viewer fell behind and should refetch state
+
+Backpressure: a viewer whose queue is full has its pending messages dropped and
+replaced by a single resync message rather than slowing down the simulation.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, List, Optional
+
+from app import telemetry
+
+try:
+    import orjson
+
+    def _encode(message: Any) -> str:
+        return orjson.dumps(message).decode("utf-8")
+except ImportError:  # orjson is optional
+    def _encode(message: Any) -> str:
+        return json.dumps(message, separators=(",", ":"))
+
+RESYNC = _encode({"t": "resync"})
+
+telemetry.registry.describe("blob_ws_messages_total", "counter", "World update messages published by type")
+telemetry.registry.describe("blob_ws_overflows_total", "counter", "Viewer queues that overflowed and were resynced")
+telemetry.registry.describe("blob_ws_subscribers", "gauge", "Connected world update viewers")
+
+# Viewers across every bus in this process (there is one bus per session)
+_viewers = 0
+_viewers_lock = threading.Lock()
+
+
+def _count_viewers(change: int):
+    global _viewers
+    with _viewers_lock:
+        _viewers += change
+        telemetry.registry.set_gauge("blob_ws_subscribers", _viewers)
+
+
+class Subscription:
+    """One viewer's bounded message queue, owned by the event loop serving its socket"""
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflows = 0
+
+    def offer(self, message: str):
+        """Queue a message from any thread"""
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._offer(message)
+        else:
+            self.loop.call_soon_threadsafe(self._offer, message)
+
+    def _offer(self, message: str):
+        if self.queue.full():
+            # Too far behind: drop the backlog and ask the viewer to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.overflows += 1
+            telemetry.registry.inc("blob_ws_overflows_total")
+            return
+        self.queue.put_nowait(message)
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class EventBus:
+    """Publishes world deltas to all current subscribers"""
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscription] = []
+
+    def subscribe(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        subscription = Subscription(loop or asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.append(subscription)
+        _count_viewers(1)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers.remove(subscription)
+        _count_viewers(-1)
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, message_type: str, version: int, payload: Any):
+        """Encode a delta once and offer it to every subscriber (no-op without viewers)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        message = _encode({"t": message_type, "v": version, "d": payload})
+        for subscription in subscribers:
+            subscription.offer(message)
+        telemetry.registry.inc("blob_ws_messages_total", type=message_type)
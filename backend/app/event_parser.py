@@ -0,0 +1,246 @@
+"""
+Event Parser
+------------
+Fast decoding of LLM event responses into WorldEvent objects. Responses produced
+in JSON mode are decoded directly (with orjson when installed); fenced or
+prose-wrapped JSON falls back to precompiled regexes. Change types, metric names
+and blob keys are normalized through lookup tables instead of substring chains.
+
+The strict JSON schema sent to the provider for structured output is derived
+from EVENT_FIELDS, which mirrors the WorldEvent constructor arguments.
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSONDecodeError = (orjson.JSONDecodeError, json.JSONDecodeError)
+except ImportError:  # orjson is optional
+    _loads = json.loads
+    JSONDecodeError = (json.JSONDecodeError,)
+
+VALID_METRICS = frozenset(["happiness", "safety", "environment_cleanliness",
+                           "trust_in_government", "health", "education", "poverty"])
+
+# Canonical change types and the spellings the model commonly uses for them
+CHANGE_TYPE_ALIASES: Dict[str, str] = {
+    "big_decrease": "big_decrease", "bigdecrease": "big_decrease", "large_decrease": "big_decrease",
+    "decrease": "decrease", "small_decrease": "decrease", "slight_decrease": "decrease",
+    "none": "none", "neutral": "none", "no_change": "none", "stable": "none", "": "none",
+    "increase": "increase", "small_increase": "increase", "slight_increase": "increase",
+    "big_increase": "big_increase", "bigincrease": "big_increase", "large_increase": "big_increase",
+}
+
+CHANGE_TYPES = ["big_decrease", "decrease", "none", "increase", "big_increase"]
+
+# JSON schema of each WorldEvent field as produced by the model
+EVENT_FIELDS: Dict[str, Dict[str, Any]] = {
+    "year": {"type": "integer"},
+    "headline": {"type": "string"},
+    "details": {"type": "string"},
+    "subheadlines": {"type": "array", "items": {"type": "string"}},
+    "impacts": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"blob_id": {"type": "integer"}, "impact": {"type": "string"}},
+            "required": ["blob_id", "impact"],
+            "additionalProperties": False,
+        },
+    },
+    "society_relations": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "society1": {"type": "integer"},
+                "society2": {"type": "integer"},
+                "change": {"type": "string", "enum": CHANGE_TYPES},
+            },
+            "required": ["society1", "society2", "change"],
+            "additionalProperties": False,
+        },
+    },
+    "world_metrics": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "metric": {"type": "string", "enum": sorted(VALID_METRICS)},
+                "change": {"type": "string", "enum": CHANGE_TYPES},
+            },
+            "required": ["metric", "change"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Python types accepted for each field when validating a decoded event
+_FIELD_TYPES: Dict[str, tuple] = {
+    "year": (int, str),
+    "headline": (str,),
+    "details": (str,),
+    "subheadlines": (list,),
+    "impacts": (dict, list),
+    "society_relations": (list,),
+    "world_metrics": (list,),
+}
+
+_FENCED_JSON_RE = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+_BARE_JSON_RE = re.compile(r'(\{.*\})', re.DOTALL)
+_BLOB_KEY_RE = re.compile(r'blob[_-]?(\d+)')
+
+
+class EventParseError(ValueError):
+    """Raised when a response does not contain a decodable event"""
+
+
+@lru_cache(maxsize=256)
+def _normalize_unknown_change(change_type: str) -> str:
+    """Substring fallback for spellings not in the table (cached per distinct value)"""
+    if "big_decrease" in change_type:
+        return "big_decrease"
+    if "decrease" in change_type:
+        return "decrease"
+    if "none" in change_type or "neutral" in change_type:
+        return "none"
+    if "big_increase" in change_type:
+        return "big_increase"
+    if "increase" in change_type:
+        return "increase"
+    # Default to no change if we can't parse
+    return "none"
+
+
+def normalize_change_type(change_type: Any) -> str:
+    """Map a model-provided change value to one of the RELATION_CHANGES keys"""
+    if not isinstance(change_type, str):
+        return "none"
+    canonical = CHANGE_TYPE_ALIASES.get(change_type)
+    if canonical is not None:
+        return canonical
+    key = change_type.strip().lower().replace(" ", "_").replace("-", "_")
+    return CHANGE_TYPE_ALIASES.get(key) or _normalize_unknown_change(key)
+
+
+@lru_cache(maxsize=4096)
+def parse_blob_key(key: str) -> Optional[int]:
+    """Extract a blob ID from keys like 'blob_1', 'Blob-2' or 'blob3'"""
+    lowered = key.lower()
+    if lowered.startswith("blob"):
+        digits = lowered[4:].lstrip("_-")
+        if digits.isdigit():
+            return int(digits)
+    match = _BLOB_KEY_RE.search(lowered)
+    return int(match.group(1)) if match else None
+
+
+def event_schema(fields: Optional[Iterable[str]] = None, name: str = "world_event") -> Dict[str, Any]:
+    """Strict json_schema response format covering the given event fields (default: all)"""
+    selected = list(fields) if fields is not None else list(EVENT_FIELDS)
+    return {
+        "name": name,
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {field: EVENT_FIELDS[field] for field in selected},
+            "required": selected,
+            "additionalProperties": False,
+        },
+    }
+
+
+def missing_fields(event_data: Any) -> List[str]:
+    """Event fields that are absent or have the wrong type"""
+    if not isinstance(event_data, dict):
+        return list(EVENT_FIELDS)
+    return [field for field, types in _FIELD_TYPES.items()
+            if not isinstance(event_data.get(field), types)]
+
+
+def extract_json(response: str) -> Any:
+    """Decode the JSON payload of a response, trying the strict JSON-mode path first"""
+    stripped = response.strip()
+    if stripped.startswith("{"):
+        try:
+            return _loads(stripped)
+        except JSONDecodeError:
+            pass  # Trailing prose after the object; fall through to the regexes
+
+    match = _FENCED_JSON_RE.search(response) or _BARE_JSON_RE.search(response)
+    if not match:
+        raise EventParseError("No JSON found in response")
+    try:
+        return _loads(match.group(1))
+    except JSONDecodeError as e:
+        raise EventParseError(f"Failed to parse JSON: {e}") from e
+
+
+def decode_event(event_data: Dict[str, Any], default_year: int, blobs: Iterable[Any]):
+    """Build a WorldEvent from decoded event JSON"""
+    # Imported here to avoid a circular import with blob_sim
+    from app.blob_sim import WorldEvent
+
+    if not isinstance(event_data, dict):
+        raise EventParseError("Event JSON is not an object")
+
+    # Extract the basic event data
+    year = int(event_data.get('year', default_year))
+    headline = event_data.get('headline', 'Unknown Event')
+    details = event_data.get('details', 'No details available')
+
+    subheadlines = event_data.get('subheadlines', [])
+    if not isinstance(subheadlines, list):
+        subheadlines = []
+
+    # Extract impacts (structured output uses a list of {blob_id, impact} objects)
+    impacts: Dict[int, str] = {}
+    names: Optional[Dict[str, int]] = None
+    impact_data = event_data.get('impacts') or {}
+    if isinstance(impact_data, list):
+        for item in impact_data:
+            if isinstance(item, dict) and isinstance(item.get('blob_id'), int):
+                impacts[item['blob_id']] = item.get('impact', '')
+        impact_data = {}
+    for key, value in impact_data.items():
+        blob_id = parse_blob_key(key)
+        if blob_id is None:
+            # Try to find blob by name (index built only when needed)
+            if names is None:
+                names = {b.name.lower(): b.blob_id for b in blobs}
+            blob_id = names.get(key.lower())
+            if blob_id is None:
+                # Just use a placeholder ID for unrecognized names
+                impacts[hash(key) % 1000 + 100] = f"{key}: {value}"
+                continue
+        impacts[blob_id] = value
+
+    # Extract society relations
+    society_relations: Dict[str, str] = {}
+    for relation in event_data.get('society_relations') or []:
+        society1 = relation.get('society1')
+        society2 = relation.get('society2')
+        # Skip invalid entries
+        if society1 is None or society2 is None:
+            continue
+        society_relations[f"{society1}-{society2}"] = normalize_change_type(relation.get('change', 'none'))
+
+    # Extract world metrics
+    world_metrics: Dict[str, str] = {}
+    for metric_data in event_data.get('world_metrics') or []:
+        metric_name = str(metric_data.get('metric', '')).lower().strip().replace(' ', '_')
+        if metric_name in VALID_METRICS:
+            world_metrics[metric_name] = normalize_change_type(metric_data.get('change', 'none'))
+
+    event = WorldEvent(year, headline, details, impacts, society_relations, world_metrics)
+    event.subheadlines = subheadlines
+    return event
+
+
+def parse_event(response: str, default_year: int, blobs: Iterable[Any]):
+    """Parse a response into a WorldEvent, raising EventParseError on failure"""
+    return decode_event(extract_json(response), default_year, blobs)
@@ -0,0 +1,203 @@
+"""
+CPU Work Executor
+-----------------
+Runs CPU-heavy work of large worlds (per-blob story strings, the society
+relations report, list serialization) off the event loop, so a big world being
+served does not stall requests for other sessions.
+
+    inline   run on the caller (no pool)
+    thread   a thread pool: frees the event loop; Python code still shares the GIL
+    process  additionally, a process pool (true parallelism) for pure functions
+             of array data
+
+Inputs with fewer than min_items work items always run inline, since handing
+them to a pool costs more than the work. In process mode, array.array
+arguments (e.g. the relation score matrix) are placed in shared memory and the
+worker reads them in place through a memoryview instead of receiving a pickled
+copy. Calls without array arguments (story strings, serialization of live
+objects) stay on the thread pool: pickling their text in and out of a worker
+process costs more event-loop time than running them on a thread.
+
+The pure functions offloaded this way live here, so pool workers can import
+them without loading the API or the game state.
+"""
+
+import asyncio
+import multiprocessing
+from array import array
+from concurrent.futures import Executor as _PoolExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app import telemetry
+from app.config import settings
+
+telemetry.registry.describe("blob_executor_tasks_total", "counter", "CPU work items by function and where they ran")
+
+
+class SharedArrayRef:
+    """A picklable handle to an array placed in shared memory (name, typecode and length)"""
+    __slots__ = ("name", "typecode", "length")
+
+    def __init__(self, name: str, typecode: str, length: int):
+        self.name = name
+        self.typecode = typecode
+        self.length = length
+
+    def __getstate__(self):
+        return (self.name, self.typecode, self.length)
+
+    def __setstate__(self, state):
+        self.name, self.typecode, self.length = state
+
+
+def _share(values: array) -> Tuple[shared_memory.SharedMemory, SharedArrayRef]:
+    """Copy an array into a new shared memory block (the caller closes and unlinks it)"""
+    block = shared_memory.SharedMemory(create=True, size=max(len(values) * values.itemsize, 1))
+    block.buf[:len(values) * values.itemsize] = memoryview(values).cast("B")
+    return block, SharedArrayRef(block.name, values.typecode, len(values))
+
+
+def _call_with_shared(fn: Callable, args: Tuple[Any, ...]) -> Any:
+    """Pool-worker side: attach shared arrays as memoryviews, call fn, detach"""
+    blocks, views, resolved = [], [], []
+    try:
+        for arg in args:
+            if isinstance(arg, SharedArrayRef):
+                block = shared_memory.SharedMemory(name=arg.name)  # Unlinked by the parent when the call returns
+                raw = block.buf[:arg.length * array(arg.typecode).itemsize]
+                view = raw.cast(arg.typecode)
+                blocks.append(block)
+                views.extend([view, raw])  # Released in this order before the block is closed
+                arg = view
+            resolved.append(arg)
+        return fn(*resolved)
+    finally:
+        for view in views:
+            view.release()
+        for block in blocks:
+            block.close()
+
+
+class Executor:
+    """Offloads pure CPU-bound functions to a thread or process pool (created on first use)"""
+    def __init__(self, kind: str = "thread", workers: int = 4, min_items: int = 256):
+        if kind not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown executor kind '{kind}' (expected inline, thread or process)")
+        self.kind = kind
+        self.workers = workers
+        self.min_items = min_items
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def offloads(self, items: Optional[int]) -> bool:
+        return self.kind != "inline" and (items is None or items >= self.min_items)
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="blob-cpu")
+        return self._threads
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            # spawn: forking a process that runs an event loop and thread pools is unsafe
+            self._processes = ProcessPoolExecutor(max_workers=self.workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        return self._processes
+
+    async def run(self, fn: Callable, *args: Any, items: Optional[int] = None) -> Any:
+        """
+        Await a pure function of plain data: on the process pool in process mode when it takes
+        array arguments, on the thread pool otherwise. items is the amount of work, compared against min_items.
+        """
+        if not self.offloads(items):
+            telemetry.registry.inc("blob_executor_tasks_total", function=fn.__name__, where="inline")
+            return fn(*args)
+        if self.kind == "thread" or not any(isinstance(arg, array) for arg in args):
+            return await self._submit(self._thread_pool(), fn, args, "thread")
+
+        blocks, shipped = [], []
+        try:
+            for arg in args:
+                if isinstance(arg, array):
+                    block, arg = _share(arg)
+                    blocks.append(block)
+                shipped.append(arg)
+            return await self._submit(self._process_pool(), _call_with_shared, (fn, tuple(shipped)), "process",
+                                      name=fn.__name__)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    async def run_in_thread(self, fn: Callable, *args: Any, items: Optional[int] = None) -> Any:
+        """Await a function that reads live objects (never sent to another process)"""
+        if not self.offloads(items):
+            telemetry.registry.inc("blob_executor_tasks_total", function=fn.__name__, where="inline")
+            return fn(*args)
+        return await self._submit(self._thread_pool(), fn, args, "thread")
+
+    async def _submit(self, pool: _PoolExecutor, fn: Callable, args: Tuple[Any, ...], where: str,
+                      name: Optional[str] = None) -> Any:
+        telemetry.registry.inc("blob_executor_tasks_total", function=name or fn.__name__, where=where)
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+    def shutdown(self):
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        self._threads = self._processes = None
+
+
+executor = Executor(settings.executor_kind, settings.executor_workers, settings.executor_min_items)
+
+
+# Offloadable pure functions
+
+def impact_strings(rows: Sequence[Tuple[int, str, Sequence[Tuple[Any, str]]]]) -> Dict[int, str]:
+    """
+    Per-blob story strings shown by the frontend: the personality followed by the history of impacts.
+    rows are (blob_id, personality, [(year, description), ...]).
+    """
+    stories = {}
+    for blob_id, personality, history in rows:
+        lines = [personality, "\nHistory of Impacts:\n"]
+        if history:
+            lines.extend(f"Iteration - {year}: {description}\n" for year, description in history)
+        else:
+            lines.append("No history available for this blob.\n")
+        stories[blob_id] = "".join(lines)
+    return stories
+
+
+def relation_description(score: float) -> str:
+    """Qualitative description of a society relation score"""
+    if score >= 0.75:
+        return "Allied"
+    if score >= 0.4:
+        return "Friendly"
+    if score >= 0.1:
+        return "Positive"
+    if score <= -0.75:
+        return "Hostile"
+    if score <= -0.4:
+        return "Unfriendly"
+    if score <= -0.1:
+        return "Tense"
+    return "Neutral"
+
+
+def relations_report(society_ids: Sequence[int], ideologies: Sequence[str], scores: Sequence[float]) -> str:
+    """
+    Report of every society pair's relation. scores is the row-major n x n matrix of
+    relation scores (an array or a memoryview over shared memory).
+    """
+    count = len(society_ids)
+    lines: List[str] = []
+    for i in range(count):
+        row = i * count
+        for j in range(i + 1, count):
+            relation = scores[row + j]
+            lines.append(f"- Society-{society_ids[i]} ({ideologies[i]}) and "
+                         f"Society-{society_ids[j]} ({ideologies[j]}): {relation_description(relation)} ({relation:.2f})")
+    return "Current Society Relations:\n" + "\n".join(lines)
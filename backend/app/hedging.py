@@ -0,0 +1,88 @@
+"""
+Hedged Requests
+---------------
+Optional tail-latency hedging for provider calls. When a call for a task kind has
+not returned within the recent p90 latency of that task, a duplicate request is
+sent and whichever response arrives first wins. Hedges are capped per task as a
+fraction of calls so the extra spend stays bounded.
+
+The blocking client cannot abort an in-flight HTTP request, so a losing leg that
+has already started is left to finish in the background and its result dropped.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from app import telemetry
+from app.config import settings
+
+telemetry.registry.describe("blob_llm_hedges_total", "counter", "Hedged provider requests by outcome")
+
+_executor = ThreadPoolExecutor(max_workers=settings.hedge_max_workers, thread_name_prefix="llm-hedge")
+
+_lock = threading.Lock()
+_calls: Dict[str, int] = {}
+_hedges: Dict[str, int] = {}
+
+
+def enabled_for(task: str) -> bool:
+    return settings.hedge_enabled and task in settings.hedge_tasks
+
+
+def hedge_delay(task: str) -> Optional[float]:
+    """Seconds to wait before hedging, or None while there are too few latency samples"""
+    return telemetry.task_latency_percentile(task, settings.hedge_percentile,
+                                             min_samples=settings.hedge_min_samples)
+
+
+def _reserve_hedge(task: str) -> bool:
+    """Take a hedge from the task's budget (hedges may not exceed hedge_budget of calls)"""
+    with _lock:
+        if _hedges.get(task, 0) + 1 > settings.hedge_budget * _calls.get(task, 0):
+            return False
+        _hedges[task] = _hedges.get(task, 0) + 1
+        return True
+
+
+def _submit(fn: Callable[[], Any]) -> Future:
+    # Carry contextvars (priority class, current turn) into the worker thread
+    return _executor.submit(contextvars.copy_context().run, fn)
+
+
+def hedged_call(fn: Callable[[], Any], task: str) -> Any:
+    """Call fn, sending a duplicate if the first call is slower than the task's p90"""
+    with _lock:
+        _calls[task] = _calls.get(task, 0) + 1
+
+    delay = hedge_delay(task)
+    if delay is None:
+        return fn()
+
+    primary = _submit(fn)
+    done, _ = wait([primary], timeout=delay)
+    if done or not _reserve_hedge(task):
+        return primary.result()
+
+    telemetry.registry.inc("blob_llm_hedges_total", task=task, outcome="fired")
+    hedge = _submit(fn)
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            for loser in pending:
+                loser.cancel()  # Only effective if the loser has not started yet
+            outcome = "won" if future is hedge else "lost"
+            telemetry.registry.inc("blob_llm_hedges_total", task=task, outcome=outcome)
+            return future.result()
+    raise error
+
+
+def hedge_stats() -> Dict[str, Dict[str, int]]:
+    with _lock:
+        return {task: {"calls": calls, "hedges": _hedges.get(task, 0)} for task, calls in _calls.items()}
@@ -0,0 +1,108 @@
+"""
+List Endpoint Helpers
+---------------------
+Cursor pagination, field projection and filtering for the list endpoints.
+Items are projected straight into plain dicts with per-field getters, so only
+the requested fields are ever built (no response models for data the client
+did not ask for).
+
+Cursors are the key of the last item returned (blob id, society id or event
+index); list endpoints send the next cursor in the X-Next-Cursor header.
+
+Pages are serialized by joining per-entity JSON fragments (orjson when
+installed). Entities that carry a version counter and a _fragments dict (blobs
+and events) keep their encoded fragments, which are reused until the entity's
+version changes, so repeated reads of unchanged entities skip encoding.
+"""
+
+import json
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:  # orjson is optional
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Cached field selections per entity; requesting more distinct selections evicts the oldest
+MAX_FRAGMENT_VARIANTS = 4
+
+Getters = Dict[str, Callable[[Any], Any]]
+
+
+def parse_fields(fields: Optional[str], getters: Getters) -> List[str]:
+    """Requested field names from a comma-separated list (all fields when not given)"""
+    if not fields:
+        return list(getters)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in getters]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(unknown)}; available: {', '.join(getters)}")
+    return names
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[int]:
+    if cursor is None or cursor == "":
+        return None
+    try:
+        return int(cursor)
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+def project(item: Any, getters: Getters, names: Iterable[str]) -> Dict[str, Any]:
+    return {name: getters[name](item) for name in names}
+
+
+def paginate(items: Sequence[Any], cursor: Optional[str] = None, limit: Optional[int] = None,
+             predicate: Optional[Callable[[Any], bool]] = None,
+             key: Optional[Callable[[Any], int]] = None) -> Tuple[List[Tuple[int, Any]], Optional[str]]:
+    """
+    One page of (key, item) pairs after the cursor, plus the cursor of the next page (None on the last).
+    items must be sorted by key; without a key function the position in the sequence is the key.
+    """
+    after = parse_cursor(cursor)
+    if after is None:
+        start = 0
+    elif key is None:
+        start = max(after + 1, 0)
+    else:
+        start = bisect_right(items, after, key=key)
+
+    page: List[Tuple[int, Any]] = []
+    for position in range(start, len(items)):
+        item = items[position]
+        if predicate is not None and not predicate(item):
+            continue
+        if limit is not None and len(page) == limit:
+            return page, str(page[-1][0])
+        page.append((position if key is None else key(item), item))
+    return page, None
+
+
+def encode_item(item: Any, getters: Getters, names: Sequence[str], cache: bool = True) -> bytes:
+    """JSON fragment of one projected item, reused while the item's version is unchanged"""
+    fragments = getattr(item, "_fragments", None) if cache else None
+    if fragments is None:
+        return _dumps(project(item, getters, names))
+
+    key = (id(getters), tuple(names))
+    # Read before projecting: if the item changes meanwhile, the fragment is stale but so is its version
+    version = item.version
+    cached = fragments.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    encoded = _dumps(project(item, getters, names))
+    if key not in fragments and len(fragments) >= MAX_FRAGMENT_VARIANTS:
+        fragments.pop(next(iter(fragments), None), None)  # Tolerates a concurrent encoder (executor threads)
+    fragments[key] = (version, encoded)
+    return encoded
+
+
+def encode_page(page: Iterable[Tuple[int, Any]], getters: Getters, names: Sequence[str], cache: bool = True) -> bytes:
+    """JSON array of projected items, joined from per-item fragments"""
+    return b"[" + b",".join(encode_item(item, getters, names, cache) for _, item in page) + b"]"
@@ -0,0 +1,148 @@
+"""
+LLM Request Scheduler
+---------------------
+Client-side rate limiting for provider calls. Each scheduler holds token buckets
+for requests per minute and tokens per minute (using estimated prompt tokens,
+corrected with actual usage afterwards) and admits waiting calls in priority
+order, so interactive turns go ahead of background image or personality work.
+
+The simulation calls the provider from worker threads with the blocking client,
+so admission blocks the calling thread rather than awaiting on the event loop.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app import telemetry
+from app.config import settings
+
+# Lower value = admitted first
+PRIORITIES: Dict[str, int] = {"interactive": 0, "normal": 1, "background": 2}
+
+_current_priority: ContextVar[str] = ContextVar("blob_llm_priority", default="normal")
+
+telemetry.registry.describe("blob_llm_queue_depth", "gauge", "Provider calls waiting for rate-limit admission")
+telemetry.registry.describe("blob_llm_queue_wait_seconds", "histogram", "Time spent waiting for admission")
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough token estimate (about four characters per token plus per-message overhead)"""
+    return sum(len(m.get("content") or "") // 4 + 4 for m in messages)
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """Run provider calls made in this context with the given priority class"""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority class '{name}'")
+    token = _current_priority.set(name)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+class TokenBucket:
+    """Continuously refilling bucket; a capacity of 0 means unlimited"""
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than capacity wait for a full bucket)"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def take(self, amount: float):
+        if not self.unlimited:
+            self.level -= amount  # May go negative for oversize requests; later callers wait it off
+
+
+class LLMScheduler:
+    """Priority admission control over RPM/TPM token buckets"""
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._cond = threading.Condition()
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._depth: Dict[str, int] = {name: 0 for name in PRIORITIES}
+
+    @property
+    def enabled(self) -> bool:
+        return not (self.requests.unlimited and self.tokens.unlimited)
+
+    def queue_depth(self) -> Dict[str, int]:
+        with self._cond:
+            return dict(self._depth)
+
+    def _set_depth(self, priority_name: str, delta: int):
+        self._depth[priority_name] += delta
+        telemetry.registry.set_gauge("blob_llm_queue_depth", self._depth[priority_name],
+                                     scheduler=self.name, priority=priority_name)
+
+    def acquire(self, estimated_tokens: int = 0, priority_name: Optional[str] = None):
+        """Block until the call may be sent to the provider"""
+        if not self.enabled:
+            return
+        priority_name = priority_name or current_priority()
+        start = time.monotonic()
+        entry: Tuple[int, int] = (PRIORITIES[priority_name], next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            self._set_depth(priority_name, 1)
+            try:
+                while True:
+                    if self._waiters[0] == entry:
+                        now = time.monotonic()
+                        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(estimated_tokens, now))
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(estimated_tokens)
+                            break
+                        self._cond.wait(timeout=wait)
+                    else:
+                        self._cond.wait(timeout=1.0)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._set_depth(priority_name, -1)
+                self._cond.notify_all()
+        telemetry.registry.observe("blob_llm_queue_wait_seconds", time.monotonic() - start,
+                                   scheduler=self.name, priority=priority_name)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the token bucket once the provider reports actual usage"""
+        if self.tokens.unlimited or actual_tokens <= 0:
+            return
+        with self._cond:
+            self.tokens.take(actual_tokens - estimated_tokens)
+
+
+chat_scheduler = LLMScheduler("chat", rpm=settings.llm_rpm, tpm=settings.llm_tpm)
+image_scheduler = LLMScheduler("images", rpm=settings.image_rpm)
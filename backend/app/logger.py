@@ -0,0 +1,88 @@
+"""
+Structured Logging
+------------------
+Leveled JSON logging for the simulation. Records are pushed onto an in-memory
+queue by a QueueHandler and written to stdout by a background QueueListener, so
+the request path never blocks on terminal I/O. The level is controlled by
+BLOB_LOG_LEVEL (default INFO); per-entity lines are logged at DEBUG.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+from app.config import settings
+
+# Attributes present on every LogRecord; anything else was passed via `extra`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as one JSON object per line, including `extra` fields"""
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 6),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # Already rendered by _QueueHandler
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps the traceback apart from the message: the stock prepare() folds it into
+    msg and clears exc_info, so JsonFormatter could never fill in its exc field
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks hold frames, so render them now rather than on the listener thread
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level: Optional[str] = None):
+    """Install the queue-backed handler on the `blob` logger (idempotent)"""
+    global _listener
+    root = logging.getLogger("blob")
+    if level is not None:
+        root.setLevel(level.upper())
+    if _listener is not None:
+        return
+    if level is None:
+        root.setLevel(settings.log_level.upper())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_QueueHandler(log_queue))
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a child of the `blob` logger, configuring the sink on first use"""
+    configure_logging()
+    return logging.getLogger(f"blob.{name}")
@@ -1,8 +1,17 @@
-from fastapi import FastAPI, HTTPException, Query, Path, Body
+import asyncio
+from fastapi import FastAPI, HTTPException, Query, Path, Body, Header, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, validator
 from typing import List, Dict, Optional, Any
-from app.blob_sim import EnhancedGameState  # Using the correct class from your paste.txt
+from app import hedging, listing, llm_scheduler, telemetry
+from app.compression import CompressionMiddleware, etag_matches
+from app.config import settings
+from app.executor import executor, impact_strings, relations_report
+from app.policy_cache import outcome_cache
+from app.policy_eval import evaluator
+from app.session_store import Session, SessionManager, VersionConflict, create_store
 
 # Pydantic models for request/response data
 class InitializeRequest(BaseModel):
@@ -12,13 +21,20 @@ class InitializeRequest(BaseModel):
     # Add validator to prevent resource exhaustion
     @validator('num_blobs')
     def check_reasonable_blobs(cls, v):
-        if v > 50:  # Prevent creating too many blobs
-            raise ValueError("Maximum number of blobs is 50")
+        if v > settings.max_blobs:  # Prevent creating too many blobs
+            raise ValueError(f"Maximum number of blobs is {settings.max_blobs}")
         return v
 
 class PolicyRequest(BaseModel):
     proposal: str = Field(..., description="Policy proposal text")
     temperature: float = Field(0.7, description="Temperature for generation", ge=0.0, le=1.0)
+    fast: bool = Field(False, description="Replay the cached outcome of the same or a near-identical policy "
+                                          "in this world, if there is one, instead of generating a new one")
+
+class PolicyEvaluationRequest(BaseModel):
+    proposal: str = Field(..., description="Policy proposal text")
+    samples: int = Field(8, description="Number of simulated outcomes", ge=1, le=settings.policy_eval_max_samples)
+    temperature: float = Field(0.7, description="Center of the sampled temperatures", ge=0.0, le=1.0)
 
 class BlobResponse(BaseModel):
     blob_id: int
@@ -47,6 +63,7 @@ class EventResponse(BaseModel):
     image_url: Optional[str]
 
 class StatusResponse(BaseModel):
+    game_id: str
     current_year: int
     num_blobs: int
     num_societies: int
@@ -67,10 +84,61 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the pagination cursor and their session's version
+    expose_headers=[listing.NEXT_CURSOR_HEADER, "X-Session-Id", "X-Session-Version"],
 )
 
-# Initialize the game state
-game_state = EnhancedGameState()
+# Negotiated gzip/brotli/zstd compression of larger responses
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+
+# Game sessions live in the configured session store, so any worker can serve any request.
+# Requests name their session in the X-Session-Id header (one shared session when omitted).
+sessions = SessionManager(create_store(), max_cached=settings.session_cache_size)
+DEFAULT_SESSION = "default"
+SESSION_ID_PATTERN = r"^[A-Za-z0-9_.-]{1,64}$"
+
+def session_headers(session: Session) -> Dict[str, str]:
+    """Response headers identifying the session and the version the response reflects"""
+    return {"X-Session-Id": session.session_id, "X-Session-Version": str(session.version),
+            "Vary": "X-Session-Id"}
+
+def open_session(response: Response,
+                 x_session_id: str = Header(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN,
+                                            description="Game session id (the shared default session when omitted)")) -> Session:
+    """The request's game session as last committed (a snapshot: turns in progress don't show in it)"""
+    session = sessions.open(x_session_id)
+    response.headers.update(session_headers(session))
+    return session
+
+async def open_session_for_update(response: Response, session: Session = Depends(open_session),
+                                  if_match: Optional[str] = Header(None, description="Session version the client last saw")):
+    """
+    The live state of a session a request changes, held until the request ends so this worker runs one
+    turn of a session at a time (the session is reopened once the previous turn is done, since it may
+    have committed). A stale If-Match version is refused up front (412); a turn that fails leaves this
+    worker's copy half-applied, so it is dropped and reloaded next time.
+    """
+    async with sessions.turn_lock(session.session_id):
+        session = await run_in_threadpool(sessions.open, session.session_id, True)
+        response.headers.update(session_headers(session))
+        if if_match is not None and if_match.strip().strip('"') != str(session.version):
+            raise HTTPException(status_code=412, detail=f"Session '{session.session_id}' is at version {session.version}",
+                                headers=session_headers(session))
+        try:
+            yield session
+        except Exception:
+            sessions.invalidate(session.session_id)
+            raise
+
+def commit_session(session: Session, response: Response):
+    """Save a changed session (optimistic concurrency: 409 if another request committed it first)"""
+    try:
+        sessions.commit(session)
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=f"{e}; reload the session and retry",
+                            headers={"X-Session-Id": session.session_id, "X-Session-Version": str(e.actual)})
+    response.headers.update(session_headers(session))
 
 @app.get("/", tags=["General"])
 async def root():
@@ -79,74 +147,97 @@ async def root():
         "message": "Blob Simulation API is running",
         "version": "1.0.0",
         "endpoints": [
-            "/initialize", "/run_iteration", "/status", "/propose_policy",
+            "/initialize", "/run_iteration", "/status", "/propose_policy", "/policy/evaluate",
+            "/timeline", "/rewind",
             "/blobs", "/societies", "/events", 
-            "/blob/{blob_id}", "/society/{society_id}", "/event/{event_index}"
+            "/blob/{blob_id}", "/society/{society_id}", "/event/{event_index}",
+            "/search", "/ws", "/metrics", "/llm_report"
         ]
     }
 
 @app.get("/health", tags=["General"])
-async def health_check():
+async def health_check(session: Session = Depends(open_session)):
     """Basic health check endpoint."""
-    return {"status": "healthy", "initialized": len(game_state.blobs) > 0}
+    return {"status": "healthy", "initialized": len(session.state.blobs) > 0}
+
+@app.get("/metrics", tags=["General"], response_class=PlainTextResponse)
+async def metrics():
+    """Per-stage turn latency, token and retry metrics in Prometheus text format."""
+    return PlainTextResponse(telemetry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/llm_report", tags=["General"], response_model=Dict[str, Any])
+async def llm_report():
+    """Latency, token and estimated cost summary per LLM task kind (and the routing table)."""
+    return {"tasks": telemetry.task_report(), "routes": settings.model_routes,
+            "hedging": hedging.hedge_stats(), "policy_cache": outcome_cache.stats()}
 
 @app.post("/initialize", tags=["Simulation Control"], response_model=Dict[str, Any])
-async def initialize(request: InitializeRequest):
+async def initialize(request: InitializeRequest, response: Response,
+                     session: Session = Depends(open_session_for_update)):
     """
     Initialize the simulation with a specified number of blobs and societies.
     Returns basic information about the generated world.
     """
+    game_state = session.state
     try:
-        game_state.initialize_with_personalities(
-            num_blobs=request.num_blobs,
-            num_societies=request.num_societies
-        )
+        with telemetry.turn("initialize"):
+            # The LLM pipeline blocks (rate limiting, retry backoff), so it runs off the event loop
+            await run_in_threadpool(
+                game_state.initialize_with_personalities,
+                num_blobs=request.num_blobs,
+                num_societies=request.num_societies
+            )
+        commit_session(session, response)
         
         return {
             "status": "Game initialized successfully",
+            "game_id": game_state.game_id,
             "num_blobs": len(game_state.blobs),
             "num_societies": len(game_state.societies),
             "current_year": game_state.current_year,
             "blobs": [{"id": b.blob_id, "name": b.name} for b in game_state.blobs],
             "societies": [{"id": s.society_id, "ideology": s.ideology} for s in game_state.societies]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to initialize game: {str(e)}")
 
 @app.get("/run_iteration", tags=["Simulation Control"], response_model=Dict[str, Any])
-async def run_iteration(temperature: float = Query(0.7, ge=0.0, le=1.0), create_image: bool = Query(True)):
+async def run_iteration(response: Response, temperature: float = Query(0.7, ge=0.0, le=1.0),
+                        create_image: bool = Query(True), session: Session = Depends(open_session_for_update)):
     """
     Run a single iteration of the simulation.
     Returns information about the generated event.
     """
+    game_state = session.state
     if not game_state.blobs:
         raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
     
+    def play():
+        with llm_scheduler.priority("interactive"):
+            event = game_state.run_iteration(temperature=temperature, create_image=create_image)
+            
+            if not event:
+                raise HTTPException(status_code=500, detail="Failed to generate a valid event")
+            
+            with telemetry.stage("response_build"):
+                # Get the current metrics
+                return event, game_state.get_metrics(), game_state.impact_story_rows()
+
     try:
-        event = game_state.run_iteration(temperature=temperature, create_image=create_image)
+        with telemetry.turn("run_iteration"):
+            event, metrics, story_rows = await run_in_threadpool(play)
+        commit_session(session, response)
+        current_year = game_state.current_year
+        hacked_impact_string_dict = await build_impact_strings(story_rows)
         
-        if not event:
-            raise HTTPException(status_code=500, detail="Failed to generate a valid event")
-        
-        # Get the current metrics
-        metrics = game_state.get_metrics()
-
-        hacked_impact_string_dict = {}
-        #loop over all blobs
-        for blob in game_state.blobs:
-            blob_id = blob.blob_id
-            temp_str = blob.personality + "\nHistory of Impacts:\n"
-            #now add the history to the string
-            if blob.history:
-                for history in blob.history:
-                    temp_str += f"Iteration - {history['year']}: {history['description']}\n"
-            else:
-                temp_str += "No history available for this blob.\n"
-            hacked_impact_string_dict[blob_id] = temp_str
+        if settings.prefetch_enabled:
+            game_state.start_prefetch(temperature=temperature)
         
         return {
             "status": "Iteration completed",
-            "current_year": game_state.current_year,
+            "current_year": current_year,
             "metrics": metrics,  # Include world metrics
             "event": {
                 "year": event.year,
@@ -158,12 +249,15 @@ async def run_iteration(temperature: float = Query(0.7, ge=0.0, le=1.0), create_
                 "image_url": event.image_url
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to run iteration: {str(e)}")
 
 @app.get("/world_metrics", tags=["Information"], response_model=Dict[str, Any])
-async def get_world_metrics():
+async def get_world_metrics(session: Session = Depends(open_session)):
     """Get the current world metrics."""
+    game_state = session.state
     if not game_state.blobs:
         raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
     
@@ -174,40 +268,44 @@ async def get_world_metrics():
         raise HTTPException(status_code=500, detail=f"Failed to get world metrics: {str(e)}")
 
 @app.post("/propose_policy", tags=["Simulation Control"], response_model=Dict[str, Any])
-async def propose_policy(request: PolicyRequest):
+async def propose_policy(request: PolicyRequest, response: Response,
+                         session: Session = Depends(open_session_for_update)):
     """
     Submit a policy proposition to the simulation.
     Returns the result and effect on the world.
     """
+    game_state = session.state
     if not game_state.blobs:
         raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
     
+    def play():
+        with llm_scheduler.priority("interactive"):
+            game_state.policy_proposition(
+                proposal=request.proposal,
+                temperature=request.temperature,
+                create_image=False,
+                fast=request.fast
+            )
+            
+            with telemetry.stage("response_build"):
+                # Get current metrics
+                return game_state.get_metrics(), game_state.impact_story_rows()
+
     try:
-        result = game_state.policy_proposition(
-            proposal=request.proposal,
-            temperature=request.temperature,
-            create_image=False
-        )
+        events_before = len(game_state.world_events)
+        with telemetry.turn("propose_policy"):
+            metrics, story_rows = await run_in_threadpool(play)
+        commit_session(session, response)
+        current_year = game_state.current_year
+        event = game_state.world_events[-1] if game_state.world_events else None
+        cached = len(game_state.world_events) > events_before and event.replayed
+        hacked_impact_string_dict = await build_impact_strings(story_rows)
         
-        # Get current metrics
-        metrics = game_state.get_metrics()
-
-        hacked_impact_string_dict = {}
-        #loop over all blobs
-        for blob in game_state.blobs:
-            blob_id = blob.blob_id
-            temp_str = blob.personality + "\nHistory of Impacts:\n"
-            #now add the history to the string
-            if blob.history:
-                for history in blob.history:
-                    temp_str += f"Iteration - {history['year']}: {history['description']}\n"
-            else:
-                temp_str += "No history available for this blob.\n"
-            hacked_impact_string_dict[blob_id] = temp_str
+        if settings.prefetch_enabled:
+            game_state.start_prefetch()
         
         # Get the most recent event (should be the one created by the policy)
-        if game_state.world_events:
-            event = game_state.world_events[-1]
+        if event is not None:
             event_data = {
                 "year": event.year,
                 "headline": event.headline,
@@ -219,7 +317,7 @@ async def propose_policy(request: PolicyRequest):
             }
         else:
             event_data = {
-                "year": game_state.current_year,
+                "year": current_year,
                 "headline": "Nice day in Blobtopia",
                 "subheadlines": [],
                 "headline_metrics": "Environment cleanliness stable",
@@ -231,90 +329,183 @@ async def propose_policy(request: PolicyRequest):
         return {
             "status": "Policy proposition processed",
             #"result": result,
-            "current_year": game_state.current_year,
+            "cached": cached,
+            "current_year": current_year,
             "metrics": metrics,  # Include world metrics
             "event": event_data
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process policy: {str(e)}")
 
+@app.post("/policy/evaluate", tags=["Simulation Control"], response_model=Dict[str, Any])
+async def evaluate_policy(request: PolicyEvaluationRequest, session: Session = Depends(open_session)):
+    """
+    Preview a policy without enacting it: simulate it several times on forks of the world as last
+    committed (at temperatures around the requested one) and return the distribution of metric and
+    society relation changes. The world itself is not changed.
+    """
+    game_state = session.state
+    if not game_state.blobs:
+        raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
+    
+    try:
+        with telemetry.turn("evaluate_policy"):
+            return await evaluator.evaluate(game_state, request.proposal, request.samples, request.temperature)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to evaluate policy: {str(e)}")
+
+@app.get("/timeline", tags=["Information"], response_model=Dict[str, Any])
+async def get_timeline(session: Session = Depends(open_session)):
+    """The years the world can be rewound to, with the headline of the event committed in each."""
+    game_state = session.state
+    if not game_state.blobs:
+        raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
+
+    timeline = game_state.timeline
+    return {
+        "game_id": game_state.game_id,
+        "current_year": game_state.current_year,
+        "start_year": timeline.start_year,
+        "turns": [{"year": turn.year, "headline": game_state.world_events[turn.events].headline}
+                  for turn in timeline.turns],
+    }
+
+@app.post("/rewind", tags=["Simulation Control"], response_model=Dict[str, Any])
+async def rewind(response: Response, year: int = Query(..., description="Year to return to (see /timeline)"),
+                 branch: Optional[str] = Query(None, pattern=SESSION_ID_PATTERN,
+                                               description="Save the rewound world as this new session instead"),
+                 session: Session = Depends(open_session_for_update)):
+    """
+    Undo every turn after a year: the world is restored exactly as it was when that year was
+    committed, from per-turn undo records (no LLM calls). The game id changes, since the years
+    after it will be played again. With branch, the session is left as it is and the rewound
+    world is saved as a new session (a copy-on-write fork, so branching is cheap).
+    """
+    game_state = session.state
+    if not game_state.blobs:
+        raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
+    if branch is not None and sessions.store.version(branch):
+        raise HTTPException(status_code=409, detail=f"Session '{branch}' already exists")
+
+    try:
+        with telemetry.turn("rewind"):
+            if branch is None:
+                target = session
+            else:
+                target = Session(branch, game_state.fork(), 0)
+                target.state.bus = sessions.bus_for(branch)
+            turns_undone = await run_in_threadpool(target.state.rewind, year)
+            if turns_undone or branch is not None:  # Nothing to save otherwise
+                commit_session(target, response)
+
+        return {
+            "status": "Rewound" if branch is None else "Branched",
+            "session": target.session_id,
+            "game_id": target.state.game_id,
+            "current_year": target.state.current_year,
+            "turns_undone": turns_undone,
+            "metrics": target.state.get_metrics(),
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to rewind: {str(e)}")
+
 @app.get("/status", tags=["Information"], response_model=StatusResponse)
-async def get_status():
+async def get_status(session: Session = Depends(open_session)):
     """Get the current status report of the world."""
+    game_state = session.state
     if not game_state.blobs:
         raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
     
     try:
-        status_report = game_state.get_world_status_report()
+        # Written on a fork of the committed snapshot (never of the live state a turn may be changing),
+        # so viewing the report neither changes the session nor bumps its version
+        status_report = await run_in_threadpool(game_state.fork().get_world_status_report)
         
         return StatusResponse(
+            game_id=game_state.game_id,
             current_year=game_state.current_year,
             num_blobs=len(game_state.blobs),
             num_societies=len(game_state.societies),
             num_events=len(game_state.world_events),
             status_report=status_report
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get status: {str(e)}")
 
 @app.get("/blobs", tags=["Information"], response_model=List[BlobResponse])
-async def get_blobs():
-    """Get information about all blobs in the simulation."""
+async def get_blobs(cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+                    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all blobs when omitted)"),
+                    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. blob_id,name"),
+                    society_id: Optional[int] = Query(None, description="Only members of this society"),
+                    year_from: Optional[int] = Query(None, description="Only history entries from this year"),
+                    year_to: Optional[int] = Query(None, description="Only history entries up to this year"),
+                    session: Session = Depends(open_session)):
+    """Get information about the blobs in the simulation (paginated, projectable)."""
+    game_state = session.state
     if not game_state.blobs:
         raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
     
-    return [
-        BlobResponse(
-            blob_id=blob.blob_id,
-            name=blob.name,
-            society_id=blob.society_id,
-            personality=blob.personality,
-            traits=blob.traits,
-            properties=blob.properties,
-            image_url=blob.image_url,
-            history = blob.history
-        )
-        for blob in game_state.blobs
-    ]
+    getters, cache = BLOB_GETTERS, True
+    if year_from is not None or year_to is not None:
+        getters = {**BLOB_GETTERS, "history": lambda b: [h for h in b.history if year_in_range(h.get("year"), year_from, year_to)]}
+        cache = False
+    predicate = (lambda b: b.society_id == society_id) if society_id is not None else None
+    return await list_response(session, game_state.blobs, getters, fields, cursor, limit, predicate,
+                         key=lambda b: b.blob_id, cache=cache)
 
 @app.get("/societies", tags=["Information"], response_model=List[SocietyResponse])
-async def get_societies():
-    """Get information about all societies in the simulation."""
+async def get_societies(cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+                        limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all societies when omitted)"),
+                        fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. society_id,ideology"),
+                        blob_id: Optional[int] = Query(None, description="Only the society this blob belongs to"),
+                        session: Session = Depends(open_session)):
+    """Get information about the societies in the simulation (paginated, projectable)."""
+    game_state = session.state
     if not game_state.societies:
         raise HTTPException(status_code=400, detail="No societies found. Initialize the game first.")
     
-    return [
-        SocietyResponse(
-            society_id=society.society_id,
-            ideology=society.ideology,
-            values=society.values,
-            members=society.members,
-            image_url=society.image_url
-        )
-        for society in game_state.societies
-    ]
+    predicate = (lambda s: blob_id in s.members) if blob_id is not None else None
+    return await list_response(session, game_state.societies, SOCIETY_GETTERS, fields, cursor, limit, predicate,
+                         key=lambda s: s.society_id)
 
 @app.get("/events", tags=["Information"], response_model=List[EventResponse])
-async def get_events():
-    """Get a list of all world events that have occurred."""
+async def get_events(cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+                     limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all events when omitted)"),
+                     fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. year,headline"),
+                     year_from: Optional[int] = Query(None, description="Earliest year (inclusive)"),
+                     year_to: Optional[int] = Query(None, description="Latest year (inclusive)"),
+                     blob_id: Optional[int] = Query(None, description="Only events that impacted this blob"),
+                     society_id: Optional[int] = Query(None, description="Only events that impacted members of this society"),
+                     session: Session = Depends(open_session)):
+    """Get the world events that have occurred (paginated, projectable, filterable)."""
+    game_state = session.state
     if not game_state.world_events:
         raise HTTPException(status_code=400, detail="No events found. Run iterations first.")
     
-    return [
-        EventResponse(
-            year=event.year,
-            headline=event.headline,
-            headline_metric=event.metrics_headline,
-            details=event.details,
-            impacts={str(blob_id): impact for blob_id, impact in event.impacts.items()},
-            image_url=event.image_url
-        )
-        for event in game_state.world_events
-    ]
+    conditions = []
+    if year_from is not None or year_to is not None:
+        conditions.append(lambda e: year_in_range(e.year, year_from, year_to))
+    if blob_id is not None:
+        conditions.append(lambda e: blob_id in e.impacts)
+    if society_id is not None:
+        members = {b.blob_id for b in game_state.blobs if b.society_id == society_id}
+        conditions.append(lambda e: not members.isdisjoint(e.impacts))
+    predicate = (lambda e: all(condition(e) for condition in conditions)) if conditions else None
+    return await list_response(session, game_state.world_events, EVENT_GETTERS, fields, cursor, limit, predicate)
 
 @app.get("/blob/{blob_id}", tags=["Information"], response_model=Dict[str, Any])
-async def get_blob(blob_id: int = Path(..., description="The ID of the blob to retrieve")):
+async def get_blob(blob_id: int = Path(..., description="The ID of the blob to retrieve"),
+                   session: Session = Depends(open_session)):
     """Get detailed information about a specific blob, including relationships."""
+    game_state = session.state
     if not game_state.blobs:
         raise HTTPException(status_code=400, detail="Game not initialized. Call /initialize first.")
     
@@ -365,8 +556,11 @@ async def get_blob(blob_id: int = Path(..., description="The ID of the blob to r
     }
 
 @app.get("/society/{society_id}", tags=["Information"], response_model=Dict[str, Any])
-async def get_society(society_id: int = Path(..., description="The ID of the society to retrieve")):
+async def get_society(society_id: int = Path(..., description="The ID of the society to retrieve"),
+                      member_fields: Optional[str] = Query(None, description="Comma-separated member fields, e.g. blob_id,name"),
+                      session: Session = Depends(open_session)):
     """Get detailed information about a specific society, including all members."""
+    game_state = session.state
     if not game_state.societies:
         raise HTTPException(status_code=400, detail="No societies found. Initialize the game first.")
     
@@ -374,17 +568,13 @@ async def get_society(society_id: int = Path(..., description="The ID of the soc
     if not society:
         raise HTTPException(status_code=404, detail=f"Society with ID {society_id} not found")
     
-    # Get all members of this society
-    members = []
-    for blob in game_state.blobs:
-        if blob.society_id == society_id:
-            members.append({
-                "blob_id": blob.blob_id,
-                "name": blob.name,
-                "personality": blob.personality,
-                "traits": blob.traits,
-                "image_url": blob.image_url
-            })
+    # Get all members of this society (only the requested fields)
+    try:
+        names = listing.parse_fields(member_fields, MEMBER_GETTERS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    members = [listing.project(blob, MEMBER_GETTERS, names)
+               for blob in game_state.blobs if blob.society_id == society_id]
     
     # Get relations with other societies
     relations = []
@@ -408,8 +598,16 @@ async def get_society(society_id: int = Path(..., description="The ID of the soc
     }
 
 @app.get("/event/{event_index}", tags=["Information"], response_model=Dict[str, Any])
-async def get_event(event_index: int = Path(..., description="The index of the event to retrieve")):
-    """Get detailed information about a specific event by its index in the event history."""
+async def get_event(event_index: int = Path(..., description="The index of the event to retrieve"),
+                    game: Optional[str] = Query(None, description="Game id; pins the URL to one history so it can be cached long-term"),
+                    if_none_match: Optional[str] = Header(None),
+                    session: Session = Depends(open_session)):
+    """
+    Get detailed information about a specific event by its index in the event history.
+    Past events are settled, so responses carry a strong ETag; when the URL is pinned to the
+    current game id they are also cacheable as immutable.
+    """
+    game_state = session.state
     if not game_state.world_events:
         raise HTTPException(status_code=400, detail="No events found. Run iterations first.")
     
@@ -417,6 +615,12 @@ async def get_event(event_index: int = Path(..., description="The index of the e
         raise HTTPException(status_code=404, detail=f"Event at index {event_index} not found")
     
     event = game_state.world_events[event_index]
+    etag = f'"{game_state.game_id}.{event_index}.{event.version}"'
+    # The same index means a different event after a re-initialize, so only a pinned URL is immutable
+    cache_control = "public, max-age=31536000, immutable" if game == game_state.game_id else "no-cache"
+    cache_headers = {"ETag": etag, "Cache-Control": cache_control, **session_headers(session)}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers)
     
     # Format impacts with blob names
     impacts_with_names = {}
@@ -432,7 +636,7 @@ async def get_event(event_index: int = Path(..., description="The index of the e
             # If blob_id can't be converted to int, just use it as is
             impacts_with_names[str(blob_id)] = impact
     
-    return {
+    return JSONResponse({
         "index": event_index,
         "year": event.year,
         "headline": event.headline,
@@ -440,15 +644,138 @@ async def get_event(event_index: int = Path(..., description="The index of the e
         "impacts": impacts_with_names,
         "image_url": event.image_url,
         "society_relations": event.society_relations if hasattr(event, 'society_relations') else {}
-    }
+    }, headers=cache_headers)
 
 @app.get("/relations", tags=["Information"])
-async def get_society_relations():
+async def get_society_relations(session: Session = Depends(open_session)):
     """Get a comprehensive report of relations between societies."""
+    game_state = session.state
     if not game_state.societies:
         raise HTTPException(status_code=400, detail="No societies found. Initialize the game first.")
     
-    return {"relations_report": game_state.get_society_relations_report()}
+    # Same report as get_society_relations_report, built off the event loop for many societies
+    society_ids, ideologies, scores = game_state.relations_matrix()
+    report = await executor.run(relations_report, society_ids, ideologies, scores, items=len(scores))
+    return {"relations_report": report}
+
+@app.get("/search", tags=["Information"], response_model=Dict[str, Any])
+async def search(q: str = Query(..., min_length=1, description="Free-text query"),
+                 k: int = Query(10, ge=1, le=100, description="Number of results"),
+                 type: Optional[str] = Query(None, pattern="^(blob|event|history)$",
+                                             description="Restrict to blob profiles, events or blob history entries"),
+                 mode: str = Query("bm25", pattern="^(bm25|tfidf)$",
+                                   description="BM25 full-text ranking or TF-IDF similarity"),
+                 year_from: Optional[int] = Query(None, description="Earliest year (inclusive)"),
+                 year_to: Optional[int] = Query(None, description="Latest year (inclusive)"),
+                 blob_id: Optional[int] = Query(None, description="Only results about (or impacting) this blob"),
+                 society_id: Optional[int] = Query(None, description="Only results about members of this society"),
+                 session: Session = Depends(open_session)):
+    """
+    Ranked search over world events (headline, details, subheadlines and impacts),
+    blob histories and blob personalities.
+    """
+    results = session.state.search_index.search(q, k=k, mode=mode, kind=type, year_from=year_from,
+                                                year_to=year_to, blob_id=blob_id, society_id=society_id)
+    return {"query": q, "results": results}
+
+@app.websocket("/ws")
+async def world_updates(websocket: WebSocket,
+                        session: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN, description="Game session id")):
+    """
+    Live world updates: new events, metric and relation changes, blob history appends and
+    image-ready notifications, pushed as they are committed (see app.event_bus for the format).
+    Updates come from turns served by this worker.
+    """
+    await websocket.accept()
+    # Subscribed before the state is read, so a turn committed in between is still pushed
+    # (viewers can skip messages whose version the hello already covers)
+    subscription = sessions.subscribe(session)
+    receiving = update = None
+    try:
+        game_state = (await run_in_threadpool(sessions.open, session)).state
+        await websocket.send_json({"t": "hello", "v": game_state.state_version,
+                                   "d": {"game": game_state.game_id, "year": game_state.current_year,
+                                         "events": len(game_state.world_events)}})
+        # Also wait for the client, so a viewer that leaves while the world is idle is noticed at once
+        receiving = asyncio.ensure_future(websocket.receive())
+        while True:
+            if update is None:
+                update = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait({receiving, update}, return_when=asyncio.FIRST_COMPLETED)
+            if update in done:
+                await websocket.send_text(update.result())
+                update = None
+            if receiving in done:
+                if receiving.result()["type"] == "websocket.disconnect":
+                    break
+                receiving = asyncio.ensure_future(websocket.receive())  # Messages from viewers are ignored
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in (receiving, update):
+            if task is not None:
+                task.cancel()
+        sessions.unsubscribe(session, subscription)
+
+# Field getters for list endpoints and projections (only requested fields are evaluated)
+BLOB_GETTERS = {
+    "blob_id": lambda b: b.blob_id,
+    "name": lambda b: b.name,
+    "society_id": lambda b: b.society_id,
+    "personality": lambda b: b.personality,
+    "traits": lambda b: b.traits,
+    "properties": lambda b: b.properties,
+    "image_url": lambda b: b.image_url,
+    "history": lambda b: b.history,
+}
+
+MEMBER_GETTERS = {name: BLOB_GETTERS[name] for name in ("blob_id", "name", "personality", "traits", "image_url")}
+
+SOCIETY_GETTERS = {
+    "society_id": lambda s: s.society_id,
+    "ideology": lambda s: s.ideology,
+    "values": lambda s: s.values,
+    "members": lambda s: s.members,
+    "image_url": lambda s: s.image_url,
+}
+
+EVENT_GETTERS = {
+    "year": lambda e: e.year,
+    "headline": lambda e: e.headline,
+    "subheadlines": lambda e: e.subheadlines,
+    "headline_metric": lambda e: e.metrics_headline,
+    "details": lambda e: e.details,
+    "impacts": lambda e: {str(blob_id): impact for blob_id, impact in e.impacts.items()},
+    "image_url": lambda e: e.image_url,
+}
+
+def year_in_range(year: Optional[int], year_from: Optional[int], year_to: Optional[int]) -> bool:
+    if year is None:
+        return False
+    return (year_from is None or year >= year_from) and (year_to is None or year <= year_to)
+
+async def list_response(session, items, getters, fields, cursor, limit, predicate=None, key=None, cache=True) -> Response:
+    """
+    Encode one page of projected items from cached per-entity fragments (no response models);
+    the next page's cursor goes in a header. cache=False for ad-hoc getters (e.g. filtered history).
+    Large pages are encoded on an executor thread.
+    """
+    try:
+        names = listing.parse_fields(fields, getters)
+        page, next_cursor = listing.paginate(items, cursor, limit, predicate, key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = session_headers(session)
+    if next_cursor is not None:
+        headers[listing.NEXT_CURSOR_HEADER] = next_cursor
+    body = await executor.run_in_thread(listing.encode_page, page, getters, names, cache, items=len(page))
+    return Response(body, media_type="application/json", headers=headers)
+
+# Helper function to build the per-blob impact story strings shown by the frontend
+async def build_impact_strings(story_rows) -> Dict[int, str]:
+    """Map each blob ID to its personality followed by its history of impacts (off the event loop for large worlds)."""
+    items = sum(len(history) + 1 for _, _, history in story_rows)
+    return await executor.run(impact_strings, story_rows, items=items)
 
 # Helper function to convert relationship scores to status text
 def get_relationship_status(score: float) -> str:
@@ -464,7 +791,12 @@ def get_relationship_status(score: float) -> str:
     else:
         return "enemy"
 
-# Run with: uvicorn main:app --reload
+# Run from backend/ with: python -m app.main (BLOB_WORKERS processes), or uvicorn app.main:app --workers N.
+# More than one worker needs a store shared between processes (BLOB_SESSION_STORE=sqlite or redis).
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    if settings.workers > 1 and (settings.session_store == "memory"
+                                 or (settings.session_store == "redis" and settings.redis_url == "memory://")):
+        raise SystemExit("BLOB_WORKERS > 1 needs a session store shared between processes "
+                         "(BLOB_SESSION_STORE=sqlite, or redis with a real BLOB_REDIS_URL)")
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, workers=settings.workers)
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Offline LLM Stand-in
+--------------------
+Deterministic replacement for the OpenAI chat and image endpoints. It mimics the
+response shapes used by the simulation so the API can be run and benchmarked
+without network access or an API key (set BLOB_OFFLINE_LLM=1).
+"""
+
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.llm_scheduler import estimate_tokens
+
+CHANGE_TYPES = ["big_decrease", "decrease", "none", "increase", "big_increase"]
+METRIC_NAMES = ["happiness", "safety", "environment_cleanliness",
+                "trust_in_government", "health", "education", "poverty"]
+
+PERSONALITY_WORDS = ["cheerful", "stubborn", "curious", "anxious", "ambitious", "gentle",
+                     "sarcastic", "loyal", "thrifty", "idealistic", "pragmatic", "grumpy"]
+EVENT_TOPICS = ["factory strike", "river cleanup", "waste tax debate", "recycling festival",
+                "smog alert", "union rally", "new landfill", "green jobs fair"]
+
+
+def _usage(messages: List[Dict[str, str]], content: str) -> SimpleNamespace:
+    prompt_tokens = estimate_tokens(messages)
+    completion_tokens = len(content) // 4 + 1
+    return SimpleNamespace(prompt_tokens=prompt_tokens,
+                           completion_tokens=completion_tokens,
+                           total_tokens=prompt_tokens + completion_tokens)
+
+
+def _completion(messages: List[Dict[str, str]], content: str, model: str) -> SimpleNamespace:
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(model=model,
+                           choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+                           usage=_usage(messages, content))
+
+
+class OfflineRateLimitError(Exception):
+    """Injected 429 (BLOB_OFFLINE_LLM_ERROR_RATE) carrying a Retry-After header like the real API"""
+    status_code = 429
+
+    def __init__(self, retry_after: float = 0.05):
+        super().__init__("Rate limit reached (offline stand-in)")
+        self.response = SimpleNamespace(headers={"retry-after": str(retry_after)})
+
+
+def _maybe_fail():
+    if settings.offline_llm_error_rate > 0 and random.random() < settings.offline_llm_error_rate:
+        raise OfflineRateLimitError()
+
+
+class _OfflineChatCompletions:
+    """Stand-in for openai.chat.completions"""
+
+    def create(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.7,
+               response_format: Optional[Dict[str, Any]] = None, **kwargs) -> SimpleNamespace:
+        if settings.offline_llm_latency_ms > 0:
+            time.sleep(settings.offline_llm_latency_ms / 1000.0)
+        _maybe_fail()
+
+        # Seed from the conversation so identical requests produce identical answers
+        rng = random.Random(len(messages) * 7919 + len(messages[-1].get("content") or ""))
+        system_text = messages[0].get("content") or ""
+
+        if "personalities for fantasy creatures" in system_text:
+            content = self._personality(rng)
+        elif "fantasy societies" in system_text:
+            content = self._societies(rng, messages[-1].get("content") or "")
+        elif response_format is not None:
+            content = self._event(rng, messages, response_format)
+        else:
+            content = self._report(rng)
+        return _completion(messages, content, model)
+
+    @staticmethod
+    def _personality(rng: random.Random) -> str:
+        traits = rng.sample(PERSONALITY_WORDS, 4)
+        description = (f"A {traits[0]} blob who worries about the factories "
+                       f"but values a steady paycheck and {traits[1]} friends.")
+        return f"PERSONALITY: {description} | TRAITS: {', '.join(traits)}"
+
+    @staticmethod
+    def _societies(rng: random.Random, prompt: str) -> str:
+        match = re.search(r"Create (\d+) distinct societies", prompt)
+        count = int(match.group(1)) if match else 3
+        societies = [
+            {"ideology": f"{rng.choice(['Green', 'Industrial', 'Cooperative', 'Libertarian'])} Collective {i}",
+             "values": rng.sample(["Progress", "Community", "Nature", "Wealth", "Tradition", "Freedom"], 3)}
+            for i in range(count)
+        ]
+        return json.dumps(societies)
+
+    @staticmethod
+    def _event(rng: random.Random, messages: List[Dict[str, str]], response_format: Dict[str, Any]) -> str:
+        history_text = "\n".join(m.get("content") or "" for m in messages)
+        blob_match = re.search(r"with (\d+) blob creatures", history_text)
+        num_blobs = int(blob_match.group(1)) if blob_match else 10
+        society_ids = sorted({int(s) for s in re.findall(r"Society-(\d+)", history_text)}) or [0, 1, 2]
+        year = 1 + sum(1 for m in messages
+                       if m.get("role") == "assistant" and (m.get("content") or "").lstrip().startswith("{"))
+
+        topic = rng.choice(EVENT_TOPICS)
+        affected = rng.sample(range(num_blobs), k=max(1, min(num_blobs, rng.randint(2, 5))))
+        event = {
+            "year": year,
+            "headline": f"Blobtopia reels from {topic}",
+            "details": f"In year {year} the {topic} divided workers and factory owners across the valley.",
+            "subheadlines": [f"Local blob {rng.choice(PERSONALITY_WORDS)} about {topic}" for _ in range(5)],
+            "impacts": {f"blob_{i}": f"Blob-{i} was {rng.choice(PERSONALITY_WORDS)} about the {topic}."
+                        for i in affected},
+            "society_relations": [
+                {"society1": a, "society2": b, "change": rng.choice(CHANGE_TYPES)}
+                for idx, a in enumerate(society_ids) for b in society_ids[idx + 1:]
+            ],
+            "world_metrics": [{"metric": name, "change": rng.choice(CHANGE_TYPES)} for name in METRIC_NAMES],
+        }
+
+        # Structured output: follow the requested schema (impacts as a list, only requested fields)
+        if response_format.get("type") == "json_schema":
+            properties = response_format["json_schema"]["schema"]["properties"]
+            event["impacts"] = [{"blob_id": i, "impact": f"Blob-{i} was {rng.choice(PERSONALITY_WORDS)} about the {topic}."}
+                                for i in affected]
+            event = {key: value for key, value in event.items() if key in properties}
+        return json.dumps(event)
+
+    @staticmethod
+    def _report(rng: random.Random) -> str:
+        return (f"The blob world is {rng.choice(['tense', 'hopeful', 'restless'])}. "
+                f"Factories keep running while societies argue about the waste problem.")
+
+
+class _OfflineImages:
+    """Stand-in for client.images"""
+
+    def generate(self, prompt: str, n: int = 1, **kwargs) -> SimpleNamespace:
+        _maybe_fail()
+        digest = abs(hash(prompt)) % 10 ** 8
+        return SimpleNamespace(data=[SimpleNamespace(url=f"offline://images/{digest}-{i}.png")
+                                     for i in range(n)])
+
+
+chat = SimpleNamespace(completions=_OfflineChatCompletions())
+images = _OfflineImages()
@@ -0,0 +1,159 @@
+"""
+Policy Outcome Cache
+--------------------
+Players often submit near-identical policies ("ban factory waste", "Ban
+factory waste!"), and each one is a full event-generation call. Every
+generated policy outcome (the model's response and the parsed event) is cached
+under the world's fingerprint and the normalized policy text. The fingerprint
+(EnhancedGameState.fingerprint) is the same for a fork and after rewinding to
+the same point, so outcomes previewed with /policy/evaluate or generated before
+a rewind are cached too.
+
+In fast mode (opt-in per proposal) a proposal for the same world whose text
+matches a cached one after normalization, or whose hashed term vector has at
+least policy_cache_similarity cosine similarity with it, replays the cached
+outcome instead of calling the model. Term vectors drop stopwords such as
+"not", so a similar policy is only replayed when it has the same polarity words
+("Do not ban factory waste" never replays "Ban factory waste").
+
+Entries expire policy_cache_ttl seconds after they are stored, and the least
+recently used ones are evicted once the cached responses and events exceed
+policy_cache_max_bytes (estimated from their encoded size). The cache is per
+worker process.
+"""
+
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from app import telemetry
+from app.config import settings
+from app.policy_eval import normalize_policy
+from app.search import hashed_tf
+
+# Rough per-entry overhead (key, vector, bookkeeping) added to the encoded size
+ENTRY_OVERHEAD_BYTES = 512
+
+# Words that negate or reverse a policy; any word ending in "n't" counts as "not"
+POLARITY_WORDS = frozenset("""
+not no never nor none without cannot stop allow permit lift repeal end unban
+""".split())
+_WORD = re.compile(r"[a-z][a-z']*")
+
+telemetry.registry.describe("blob_policy_cache_total", "counter", "Policy outcome cache lookups and changes by outcome")
+telemetry.registry.describe("blob_policy_cache_bytes", "gauge", "Estimated size of the cached policy outcomes")
+
+
+def polarity(policy: str) -> FrozenSet[str]:
+    """Negating or reversing words of a normalized policy"""
+    words = ("not" if w.endswith("n't") else w for w in _WORD.findall(policy))
+    return frozenset(w for w in words if w in POLARITY_WORDS)
+
+
+class CachedOutcome:
+    """A generated policy outcome: the model's response and the parsed event (as WorldEvent.to_dict)"""
+    __slots__ = ("fingerprint", "policy", "polarity", "vector", "norm", "response", "event", "size", "stored_at")
+
+    def __init__(self, fingerprint: str, policy: str, response: str, event: Dict[str, Any]):
+        self.fingerprint = fingerprint
+        self.policy = policy
+        self.polarity = polarity(policy)
+        self.vector = hashed_tf(policy)
+        self.norm = math.sqrt(sum(w * w for w in self.vector.values())) or 1.0
+        self.response = response
+        self.event = event
+        self.size = len(response) + len(json.dumps(event)) + len(policy) + ENTRY_OVERHEAD_BYTES
+        self.stored_at = time.monotonic()
+
+    def similarity(self, vector: Dict[int, float], norm: float) -> float:
+        """Cosine similarity of the policy text to another hashed term vector"""
+        return sum(w * self.vector.get(bucket, 0.0) for bucket, w in vector.items()) / (norm * self.norm)
+
+
+class PolicyCache:
+    """Policy outcomes by (world fingerprint, normalized policy), LRU within a byte budget and with a TTL"""
+    def __init__(self, max_bytes: int = 8 << 20, ttl: float = 3600.0, similarity: float = 0.9):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.similarity = similarity
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], CachedOutcome]" = OrderedDict()
+        self._by_world: Dict[str, Dict[str, CachedOutcome]] = {}  # For similarity lookups
+        self._bytes = 0
+        self._lookups = {"hit": 0, "similar": 0, "miss": 0}
+
+    def lookup(self, fingerprint: str, proposal: str) -> Optional[CachedOutcome]:
+        """The cached outcome of this or a similar enough policy in this world, if any"""
+        policy = normalize_policy(proposal)
+        with self._lock:
+            entry = self._live(self._entries.get((fingerprint, policy)))
+            outcome = "hit"
+            if entry is None:
+                outcome = "similar"
+                vector = hashed_tf(policy)
+                norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+                words = polarity(policy)
+                best = 0.0
+                for candidate in list(self._by_world.get(fingerprint, {}).values()):
+                    if candidate.polarity != words:
+                        continue
+                    score = candidate.similarity(vector, norm) if vector else 0.0
+                    if score >= self.similarity and score > best and self._live(candidate) is not None:
+                        entry, best = candidate, score
+            if entry is None:
+                outcome = "miss"
+            else:
+                self._entries.move_to_end((entry.fingerprint, entry.policy))
+            self._lookups[outcome] += 1
+        telemetry.registry.inc("blob_policy_cache_total", outcome=outcome)
+        return entry
+
+    def store(self, fingerprint: str, proposal: str, response: str, event: Dict[str, Any]):
+        """Cache a generated outcome (replacing any earlier one for the same world and policy)"""
+        entry = CachedOutcome(fingerprint, normalize_policy(proposal), response, event)
+        if entry.size > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            self._remove((fingerprint, entry.policy))
+            self._entries[(fingerprint, entry.policy)] = entry
+            self._by_world.setdefault(fingerprint, {})[entry.policy] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+            size = self._bytes
+        telemetry.registry.inc("blob_policy_cache_total", outcome="stored")
+        if evicted:
+            telemetry.registry.inc("blob_policy_cache_total", evicted, outcome="evicted")
+        telemetry.registry.set_gauge("blob_policy_cache_bytes", size)
+
+    def _live(self, entry: Optional[CachedOutcome]) -> Optional[CachedOutcome]:
+        """entry unless it expired (expired entries are dropped); call with the lock held"""
+        if entry is not None and time.monotonic() - entry.stored_at > self.ttl:
+            self._remove((entry.fingerprint, entry.policy))
+            telemetry.registry.inc("blob_policy_cache_total", outcome="expired")
+            return None
+        return entry
+
+    def _remove(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        world = self._by_world[entry.fingerprint]
+        del world[entry.policy]
+        if not world:
+            del self._by_world[entry.fingerprint]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "similarity": self.similarity, "lookups": dict(self._lookups)}
+
+
+outcome_cache = PolicyCache(settings.policy_cache_max_bytes, settings.policy_cache_ttl, settings.policy_cache_similarity)
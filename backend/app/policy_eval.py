@@ -0,0 +1,167 @@
+"""
+Policy Evaluation
+-----------------
+Monte Carlo preview of a policy before it is committed: the current world is
+forked K times, each fork runs the policy at a different temperature, and the
+distributions of world metric and society relation changes are summarized.
+The forks are discarded afterwards, so the real world is never touched.
+
+Rollouts from all requests share one bounded pool (at most
+policy_eval_concurrency provider calls in flight for previews), run below
+committed turns in the LLM scheduler, and identical concurrent requests share
+one evaluation. Results are cached by (game, state version, normalized policy
+text, samples, temperature), so asking again before the world changes is free.
+"""
+
+import asyncio
+import contextvars
+import re
+import statistics
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from app import llm_scheduler, telemetry
+from app.config import settings
+
+# Sampled temperatures are spread evenly over +/- this much around the requested one
+TEMPERATURE_SPREAD = 0.3
+
+telemetry.registry.describe("blob_policy_evaluations_total", "counter", "Policy evaluations by outcome")
+telemetry.registry.describe("blob_policy_rollouts_total", "counter", "Policy evaluation rollouts by outcome")
+
+_SPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$")
+
+
+def normalize_policy(text: str) -> str:
+    """Policy text for cache keys: case, surrounding punctuation and repeated whitespace ignored"""
+    return _EDGE_PUNCTUATION.sub("", _SPACE.sub(" ", text.strip().lower()))
+
+
+def sample_temperatures(samples: int, center: float) -> List[float]:
+    """samples temperatures spread evenly around center, within 0-1"""
+    if samples == 1:
+        return [center]
+    low, high = max(0.0, center - TEMPERATURE_SPREAD), min(1.0, center + TEMPERATURE_SPREAD)
+    return [round(low + (high - low) * i / (samples - 1), 3) for i in range(samples)]
+
+
+def relation_scores(state: Any) -> Dict[str, float]:
+    """Relation score of every society pair ("a-b" with a < b)"""
+    ids, _, scores = state.relations_matrix()
+    count = len(ids)
+    return {f"{ids[i]}-{ids[j]}": scores[i * count + j] for i in range(count) for j in range(i + 1, count)}
+
+
+def rollout(fork: Any, proposal: str, temperature: float) -> Dict[str, Any]:
+    """Run the policy on a forked world and report what it changed"""
+    metrics_before, relations_before = fork.get_metrics(), relation_scores(fork)
+    events_before = len(fork.world_events)
+    try:
+        with llm_scheduler.priority("normal"):
+            fork.policy_proposition(proposal, temperature=temperature, create_image=False)
+    except Exception as e:
+        telemetry.registry.inc("blob_policy_rollouts_total", outcome="failed")
+        return {"ok": False, "temperature": temperature, "error": str(e)}
+    if len(fork.world_events) == events_before:
+        telemetry.registry.inc("blob_policy_rollouts_total", outcome="failed")
+        return {"ok": False, "temperature": temperature, "error": "No valid event was generated"}
+
+    event = fork.world_events[-1]
+    metrics_after, relations_after = fork.get_metrics(), relation_scores(fork)
+    telemetry.registry.inc("blob_policy_rollouts_total", outcome="ok")
+    return {
+        "ok": True,
+        "temperature": temperature,
+        "headline": event.headline,
+        "metrics_headline": event.metrics_headline,
+        "metrics": {name: value - metrics_before.get(name, value) for name, value in metrics_after.items()},
+        "relations": {pair: relations_after.get(pair, 0.0) - relations_before.get(pair, 0.0)
+                      for pair in relations_before.keys() | relations_after.keys()},
+    }
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    """Summary statistics of a sample"""
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.fmean(ordered), 4),
+        "stdev": round(statistics.pstdev(ordered), 4),
+        "min": round(ordered[0], 4),
+        "p10": round(telemetry.nearest_rank(ordered, 10), 4),
+        "median": round(statistics.median(ordered), 4),
+        "p90": round(telemetry.nearest_rank(ordered, 90), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def aggregate(proposal: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Distributions of metric and relation changes over the successful rollouts"""
+    completed = [r for r in results if r["ok"]]
+    metrics = {name: distribution([r["metrics"][name] for r in completed])
+               for name in (completed[0]["metrics"] if completed else {})}
+    # Only pairs that some rollout changed
+    pairs = sorted({pair for r in completed for pair, delta in r["relations"].items() if delta})
+    relations = {pair: distribution([r["relations"].get(pair, 0.0) for r in completed]) for pair in pairs}
+    return {
+        "proposal": proposal,
+        "samples": len(results),
+        "completed": len(completed),
+        "metrics": metrics,
+        "relations": relations,
+        "outcomes": [{key: r.get(key) for key in ("temperature", "ok", "headline", "metrics_headline", "error")}
+                     for r in results],
+    }
+
+
+class PolicyEvaluator:
+    """Runs policy rollouts on a shared bounded pool and caches evaluations"""
+    def __init__(self, max_concurrency: int = 4, cache_size: int = 128):
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="blob-eval")
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    async def evaluate(self, state: Any, proposal: str, samples: int, temperature: float = 0.7) -> Dict[str, Any]:
+        """
+        Evaluate a policy against a state nothing is changing, such as a session's committed snapshot
+        (SessionManager.open); forking a live state mid-turn would share its in-flight changes.
+        Call from the event loop.
+        """
+        state_version = state.state_version  # The forks' version; a turn may commit while they play out
+        key = (state.game_id, state_version, normalize_policy(proposal), samples, temperature)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            telemetry.registry.inc("blob_policy_evaluations_total", outcome="cached")
+            return {**cached, "cached": True}
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            telemetry.registry.inc("blob_policy_evaluations_total", outcome="joined")
+            return {**await asyncio.shield(inflight), "cached": True}
+
+        # Forks are taken up front, so every rollout starts from the same snapshot
+        forks = [state.fork() for _ in range(samples)]
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight[key] = loop.create_future()
+        try:
+            futures = [loop.run_in_executor(self._pool, contextvars.copy_context().run, rollout, fork, proposal, t)
+                       for fork, t in zip(forks, sample_temperatures(samples, temperature))]
+            result = {**aggregate(proposal, await asyncio.gather(*futures)), "state_version": state_version}
+        except BaseException as e:
+            inflight.set_exception(e)
+            inflight.exception()  # Joined requests re-raise it; don't warn if there are none
+            raise
+        finally:
+            del self._inflight[key]
+        inflight.set_result(result)
+        telemetry.registry.inc("blob_policy_evaluations_total", outcome="computed")
+        if result["completed"]:  # Don't cache an outage
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return {**result, "cached": False}
+
+
+evaluator = PolicyEvaluator(settings.policy_eval_concurrency, settings.policy_eval_cache_size)
@@ -0,0 +1,201 @@
+"""
+Upstream Resilience
+-------------------
+Retry policies and a circuit breaker for calls to the LLM provider. Errors are
+classified (rate limit, timeout, connection, server, client) and each class has
+its own retry policy: exponential backoff with full jitter, honoring Retry-After
+when the provider sends it. A circuit breaker shared by all provider calls fails
+fast while the upstream is unhealthy so a brownout does not turn into a retry storm.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import openai
+
+from app import telemetry
+from app.config import settings
+from app.logger import get_logger
+
+logger = get_logger("resilience")
+
+telemetry.registry.describe("blob_upstream_errors_total", "counter", "Provider errors by class")
+telemetry.registry.describe("blob_circuit_open", "gauge", "1 while the circuit breaker is open")
+telemetry.registry.describe("blob_circuit_rejections_total", "counter", "Calls rejected by an open circuit")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open"""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float, multiplier: float = 2.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def backoff(self, retry: int, base_delay: Optional[float] = None) -> float:
+        """Delay before the given retry (1-based)"""
+        base = self.base_delay if base_delay is None else base_delay
+        ceiling = min(self.max_delay, base * (self.multiplier ** (retry - 1)))
+        return random.uniform(0, ceiling)
+
+
+# Per error class retry policies; None means the error is not retried
+ERROR_POLICIES: Dict[str, Optional[RetryPolicy]] = {
+    "rate_limit": RetryPolicy(max_retries=4, base_delay=1.0, max_delay=20.0),
+    "timeout": RetryPolicy(max_retries=2, base_delay=0.5, max_delay=4.0),
+    "connection": RetryPolicy(max_retries=3, base_delay=0.5, max_delay=8.0),
+    "server": RetryPolicy(max_retries=3, base_delay=1.0, max_delay=10.0),
+    "client": None,
+    "unknown": RetryPolicy(max_retries=2, base_delay=1.0, max_delay=4.0),
+}
+
+# Error classes that indicate an unhealthy upstream (count towards opening the circuit)
+UPSTREAM_FAILURES = {"rate_limit", "timeout", "connection", "server"}
+
+
+def classify_error(exc: BaseException) -> str:
+    """Map a provider exception to an error class"""
+    if isinstance(exc, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(exc, openai.APIConnectionError):
+        return "connection"
+    status = getattr(exc, "status_code", None)
+    if status == 429:
+        return "rate_limit"
+    if isinstance(status, int):
+        if status >= 500:
+            return "server"
+        if status in (408, 409):
+            return "timeout"
+        if 400 <= status < 500:
+            return "client"
+    return "unknown"
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read Retry-After / retry-after-ms from the error response, if present"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None  # HTTP-date form is not used by the provider
+    return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe"""
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may proceed"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True  # Let exactly one probe through
+                return
+        telemetry.registry.inc("blob_circuit_rejections_total", breaker=self.name)
+        raise CircuitOpenError(f"Circuit '{self.name}' is open; upstream considered unhealthy")
+
+    def release(self):
+        """End a call that says nothing about upstream health (e.g. a bad request)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+        telemetry.registry.set_gauge("blob_circuit_open", 0, breaker=self.name)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._failures < self.failure_threshold and self._opened_at is None:
+                return
+            self._opened_at = time.monotonic()
+        logger.warning("Circuit opened", extra={"breaker": self.name, "failures": self._failures})
+        telemetry.registry.set_gauge("blob_circuit_open", 1, breaker=self.name)
+
+
+# Shared by every call to the provider (chat and images)
+provider_breaker = CircuitBreaker("openai",
+                                  failure_threshold=settings.circuit_failure_threshold,
+                                  reset_timeout=settings.circuit_reset_timeout)
+
+
+def call_with_retry(fn: Callable[[], Any], max_retries: Optional[int] = None,
+                    base_delay: Optional[float] = None,
+                    breaker: CircuitBreaker = provider_breaker) -> Any:
+    """
+    Call fn with per-error-class retries and the circuit breaker.
+    max_retries/base_delay override the class policies' retry count cap and base delay.
+    """
+    retries = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            error_class = classify_error(e)
+            telemetry.registry.inc("blob_upstream_errors_total", error_class=error_class)
+            if error_class in UPSTREAM_FAILURES:
+                breaker.record_failure()
+            else:
+                breaker.release()
+
+            policy = ERROR_POLICIES.get(error_class)
+            allowed = policy.max_retries if policy else 0
+            if max_retries is not None:
+                allowed = min(allowed, max_retries)
+            if retries >= allowed:
+                raise
+
+            retries += 1
+            delay = policy.backoff(retries, base_delay)
+            retry_after = retry_after_seconds(e)
+            if retry_after is not None:
+                if retry_after > policy.max_delay:
+                    raise  # Waiting that long would blow the latency budget
+                delay = retry_after
+            logger.warning("Provider call failed, retrying", extra={
+                "error": str(e), "error_class": error_class, "retry": retries, "delay_s": round(delay, 3)
+            })
+            time.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result
@@ -0,0 +1,346 @@
+"""
+World Search Index
+------------------
+Local in-process retrieval over blob personalities/traits, world events and
+per-blob history entries. Two indexes are kept over the same documents:
+
+- hashed TF-IDF vectors (the hashing trick, so no vocabulary has to be kept),
+  used for similarity lookups by the prompt builder;
+- a BM25 inverted index over the full text (events include subheadlines and
+  impacts), used for ranked full-text search with year/blob/society filters.
+
+Both are scored through posting lists, so a query only touches documents that
+share a term with it, and both are updated incrementally as blobs are created
+and events are applied; no embedding model or numpy is required.
+
+A forked game forks its index in O(1): the fork shares the document and
+posting maps copy-on-write (see app.cow), so its first change copies the
+top-level maps (references only) and after that only the postings it touches.
+"""
+
+import heapq
+import math
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app import cow
+from app.context_selector import keywords
+
+# Number of hash buckets; collisions are rare at this size for a game-sized vocabulary
+HASH_BUCKETS = 1 << 20
+
+
+def _bucket(word: str) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(word.encode("utf-8")) & (HASH_BUCKETS - 1)
+
+
+def hashed_tf(text: str) -> Dict[int, float]:
+    """Sublinear term frequencies of a text by hash bucket"""
+    counts: Dict[int, int] = {}
+    for word, count in keywords(text).items():
+        bucket = _bucket(word)
+        counts[bucket] = counts.get(bucket, 0) + count
+    return {bucket: 1.0 + math.log(count) for bucket, count in counts.items()}
+
+
+class SearchDoc:
+    """An indexed document: its key, kind, display text and filterable metadata"""
+    __slots__ = ("key", "kind", "text", "meta", "weights", "norm")
+
+    def __init__(self, key: str, kind: str, text: str, meta: Dict[str, Any], weights: Dict[int, float]):
+        self.key = key
+        self.kind = kind
+        self.text = text
+        self.meta = meta
+        self.weights = weights
+        self.norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+
+    def to_dict(self, score: float) -> Dict[str, Any]:
+        return {"type": self.kind, "key": self.key, "score": round(score, 4), "text": self.text, **self.meta}
+
+
+def _writable_posting(ownership: cow.Ownership, index: Any, term: Any) -> Dict[str, Any]:
+    """The index's posting list of a term (created if missing), safe to change in place"""
+    postings = ownership.writable_attr(index, "_postings", dict)
+    if term not in postings:
+        postings[term] = ownership.claim({})
+    return ownership.writable_item(postings, term, dict)
+
+
+class HashedTfidfIndex:
+    """
+    Sparse hashed TF-IDF vectors scored over posting lists.
+    Document vectors are normalized by their term-frequency norm when added and IDF is
+    applied at query time, so adding documents never requires re-weighting old ones.
+    Scores are therefore close to, but not bounded by, cosine similarity (about 0-1).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ownership = cow.Ownership()
+        self._docs: Dict[str, SearchDoc] = {}
+        self._postings: Dict[int, Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def fork(self) -> "HashedTfidfIndex":
+        """Copy of the index that shares its maps with this one until either side changes them"""
+        fork = HashedTfidfIndex()
+        with self._lock:
+            fork._docs, fork._postings = self._docs, self._postings
+            fork._ownership = self._ownership.fork()
+        return fork
+
+    def add(self, key: str, kind: str, text: str, **meta: Any):
+        """Index (or re-index) a document"""
+        doc = SearchDoc(key, kind, text, meta, hashed_tf(text))
+        with self._lock:
+            self._remove(key)
+            self._ownership.writable_attr(self, "_docs", dict)[key] = doc
+            for bucket, weight in doc.weights.items():
+                _writable_posting(self._ownership, self, bucket)[key] = weight / doc.norm
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        if key not in self._docs:
+            return
+        doc = self._ownership.writable_attr(self, "_docs", dict).pop(key)
+        postings = self._ownership.writable_attr(self, "_postings", dict)
+        for bucket in doc.weights:
+            if bucket in postings:
+                posting = self._ownership.writable_item(postings, bucket, dict)
+                posting.pop(key, None)
+                if not posting:
+                    del postings[bucket]
+
+    def clear(self):
+        with self._lock:
+            # Fresh maps: nothing is shared with a fork any more
+            self._docs, self._postings, self._ownership = {}, {}, cow.Ownership()
+
+    def _idf(self, bucket: int) -> float:
+        return math.log((len(self._docs) + 1) / (len(self._postings.get(bucket, ())) + 1)) + 1.0
+
+    def query(self, text: str, k: int = 10,
+              predicate: Optional[Callable[[SearchDoc], bool]] = None) -> List[Tuple[float, SearchDoc]]:
+        """Top-k documents by TF-IDF similarity to the text, optionally filtered"""
+        query_tf = hashed_tf(text)
+        if not query_tf:
+            return []
+        with self._lock:
+            query_weights = {bucket: tf * self._idf(bucket) for bucket, tf in query_tf.items()}
+            query_norm = math.sqrt(sum(w * w for w in query_weights.values()))
+            scores: Dict[str, float] = {}
+            for bucket, query_weight in query_weights.items():
+                posting = self._postings.get(bucket)
+                if not posting:
+                    continue
+                idf = self._idf(bucket)
+                for key, doc_weight in posting.items():
+                    scores[key] = scores.get(key, 0.0) + query_weight * idf * doc_weight
+            candidates = ((score / query_norm, self._docs[key]) for key, score in scores.items())
+            if predicate is not None:
+                candidates = (item for item in candidates if predicate(item[1]))
+            return heapq.nlargest(k, candidates, key=lambda item: item[0])
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index of exact terms, with incremental document statistics"""
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._ownership = cow.Ownership()
+        self._docs: Dict[str, SearchDoc] = {}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+        self._postings: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def fork(self) -> "BM25Index":
+        """Copy of the index that shares its maps with this one until either side changes them"""
+        fork = BM25Index(self.k1, self.b)
+        with self._lock:
+            fork._docs, fork._lengths, fork._terms = self._docs, self._lengths, self._terms
+            fork._total_length, fork._postings = self._total_length, self._postings
+            fork._ownership = self._ownership.fork()
+        return fork
+
+    def add(self, key: str, kind: str, text: str, display_text: Optional[str] = None, **meta: Any):
+        """Index (or re-index) a document; display_text is returned in results instead of the full text"""
+        terms = keywords(text)
+        doc = SearchDoc(key, kind, display_text if display_text is not None else text, meta, {})
+        with self._lock:
+            self._remove(key)
+            length = sum(terms.values())
+            self._ownership.writable_attr(self, "_docs", dict)[key] = doc
+            self._ownership.writable_attr(self, "_lengths", dict)[key] = length
+            self._ownership.writable_attr(self, "_terms", dict)[key] = list(terms)
+            self._total_length += length
+            for term, count in terms.items():
+                _writable_posting(self._ownership, self, term)[key] = count
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        if key not in self._docs:
+            return
+        writable = self._ownership.writable_attr
+        del writable(self, "_docs", dict)[key]
+        self._total_length -= writable(self, "_lengths", dict).pop(key)
+        postings = writable(self, "_postings", dict)
+        for term in writable(self, "_terms", dict).pop(key):
+            posting = self._ownership.writable_item(postings, term, dict)
+            del posting[key]
+            if not posting:
+                del postings[term]
+
+    def clear(self):
+        with self._lock:
+            # Fresh maps: nothing is shared with a fork any more
+            self._docs, self._lengths, self._terms, self._postings = {}, {}, {}, {}
+            self._total_length = 0
+            self._ownership = cow.Ownership()
+
+    def query(self, text: str, k: int = 10,
+              predicate: Optional[Callable[[SearchDoc], bool]] = None) -> List[Tuple[float, SearchDoc]]:
+        """Top-k documents by BM25 score, optionally filtered"""
+        terms = keywords(text)
+        with self._lock:
+            if not terms or not self._docs:
+                return []
+            count = len(self._docs)
+            avg_length = self._total_length / count or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1.0 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for key, tf in posting.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * self._lengths[key] / avg_length)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+            candidates = ((score, self._docs[key]) for key, score in scores.items())
+            if predicate is not None:
+                candidates = (item for item in candidates if predicate(item[1]))
+            return heapq.nlargest(k, candidates, key=lambda item: item[0])
+
+
+def search_filter(kind: Optional[str] = None, year_from: Optional[int] = None, year_to: Optional[int] = None,
+                  blob_id: Optional[int] = None, society_id: Optional[int] = None
+                  ) -> Optional[Callable[[SearchDoc], bool]]:
+    """
+    Predicate over document type and metadata. Year filters exclude documents without a year
+    (blob profiles); blob/society filters match events through the blobs they impacted.
+    """
+    if kind is None and year_from is None and year_to is None and blob_id is None and society_id is None:
+        return None
+
+    def predicate(doc: SearchDoc) -> bool:
+        meta = doc.meta
+        if kind is not None and doc.kind != kind:
+            return False
+        if year_from is not None or year_to is not None:
+            year = meta.get("year")
+            if year is None or (year_from is not None and year < year_from) or (year_to is not None and year > year_to):
+                return False
+        if blob_id is not None and meta.get("blob_id") != blob_id and blob_id not in meta.get("blob_ids", ()):
+            return False
+        if society_id is not None and meta.get("society_id") != society_id \
+                and society_id not in meta.get("society_ids", ()):
+            return False
+        return True
+    return predicate
+
+
+class WorldIndex:
+    """Search indexes over one game's blobs, events and blob histories"""
+    def __init__(self):
+        self.index = HashedTfidfIndex()
+        self.text_index = BM25Index()
+        self._ownership = cow.Ownership()
+        self._society_of: Dict[int, Optional[int]] = {}
+
+    def fork(self) -> "WorldIndex":
+        """Copy of the indexes for a forked game (O(1); see app.cow)"""
+        fork = WorldIndex()
+        fork.index, fork.text_index = self.index.fork(), self.text_index.fork()
+        fork._society_of, fork._ownership = self._society_of, self._ownership.fork()
+        return fork
+
+    def clear(self):
+        self.index.clear()
+        self.text_index.clear()
+        self._society_of, self._ownership = {}, cow.Ownership()
+
+    def add_blob(self, blob: Any):
+        self._ownership.writable_attr(self, "_society_of", dict)[blob.blob_id] = blob.society_id
+        key, text = f"blob:{blob.blob_id}", f"{blob.name}: {blob.personality} (Traits: {', '.join(blob.traits)})"
+        self.index.add(key, "blob", text, blob_id=blob.blob_id, society_id=blob.society_id)
+        self.text_index.add(key, "blob", text, blob_id=blob.blob_id, society_id=blob.society_id)
+
+    def add_event(self, event_index: int, event: Any):
+        key, summary = f"event:{event_index}", f"{event.headline}\n{event.details}"
+        blob_ids = sorted(blob_id for blob_id in event.impacts if isinstance(blob_id, int))
+        society_ids = sorted({self._society_of.get(blob_id) for blob_id in blob_ids} - {None})
+        full_text = "\n".join([summary, *(event.subheadlines or []), *map(str, event.impacts.values())])
+        self.index.add(key, "event", summary, event_index=event_index, year=event.year)
+        self.text_index.add(key, "event", full_text, display_text=summary, event_index=event_index,
+                            year=event.year, blob_ids=blob_ids, society_ids=society_ids)
+
+    def add_history(self, blob: Any, entry_index: int):
+        entry = blob.history[entry_index]
+        key, text = f"history:{blob.blob_id}:{entry_index}", entry.get("description", "")
+        meta = dict(blob_id=blob.blob_id, society_id=blob.society_id, year=entry.get("year"))
+        self.index.add(key, "history", text, **meta)
+        self.text_index.add(key, "history", text, **meta)
+
+    def remove_event(self, event_index: int):
+        self.index.remove(f"event:{event_index}")
+        self.text_index.remove(f"event:{event_index}")
+
+    def remove_history(self, blob_id: int, entry_index: int):
+        self.index.remove(f"history:{blob_id}:{entry_index}")
+        self.text_index.remove(f"history:{blob_id}:{entry_index}")
+
+    def rebuild(self, blobs: List[Any], events: List[Any]):
+        """Index a whole game from scratch"""
+        self.clear()
+        for blob in blobs:
+            self.add_blob(blob)
+            for entry_index in range(len(blob.history)):
+                self.add_history(blob, entry_index)
+        for event_index, event in enumerate(events):
+            self.add_event(event_index, event)
+
+    def search(self, query: str, k: int = 10, mode: str = "bm25", **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Ranked matches for a free-text query: BM25 full-text ("bm25") or TF-IDF similarity ("tfidf"),
+        filtered by search_filter arguments (kind, year_from, year_to, blob_id, society_id).
+        """
+        index = self.text_index if mode == "bm25" else self.index
+        return [doc.to_dict(score) for score, doc in index.query(query, k, search_filter(**filters))]
+
+    def blob_similarity(self, query: str, k: int = 200) -> Dict[int, float]:
+        """Best match score per blob over its profile and history entries"""
+        scores: Dict[int, float] = {}
+        for score, doc in self.index.query(query, k, lambda doc: doc.kind in ("blob", "history")):
+            blob_id = doc.meta["blob_id"]
+            scores[blob_id] = max(scores.get(blob_id, 0.0), score)
+        return scores
+
+    def related_events(self, query: str, k: int = 3, before_index: Optional[int] = None) -> List[int]:
+        """Indices of past events most similar to the query"""
+        def predicate(doc: SearchDoc) -> bool:
+            return doc.kind == "event" and (before_index is None or doc.meta["event_index"] < before_index)
+        return [doc.meta["event_index"] for _, doc in self.index.query(query, k, predicate)]
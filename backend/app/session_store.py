@@ -0,0 +1,420 @@
+"""
+Session Store
+-------------
+Externalized game sessions, so the API can run several worker processes (or
+hosts) without session affinity: any worker can serve any request.
+
+A store keeps one record per session id: a version number and the serialized
+game state. Writes are optimistic: a save names the version it was based on
+and fails with VersionConflict if another worker committed in the meantime.
+
+    memory   in-process only (a single worker; the default), as copy-on-write
+             forks instead of serialized states
+    sqlite   a shared SQLite file in WAL mode (workers on one host)
+    redis    a Redis hash per session, compare-and-set through WATCH/MULTI
+             (redis_url "memory://" uses the in-process InMemoryRedis stand-in)
+
+SessionManager caches deserialized states per worker and only reloads one when
+the store's version has moved on, so a worker that served the previous turn of
+a session pays a single version lookup per request. It keeps two per session:
+the live state that turns change, and a copy-on-write snapshot of it as last
+committed (app.cow), which readers get. Readers therefore never see a turn in
+progress, and forking for previews only ever forks a state nobody changes.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import event_bus, telemetry
+from app.blob_sim import EnhancedGameState
+from app.config import settings
+
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)  # Integer id keys, as json.dumps allows
+except ImportError:  # orjson is optional
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    _loads = json.loads
+
+try:
+    import redis
+    from redis.exceptions import WatchError as _RedisWatchError
+except ImportError:  # redis is optional (only needed for a real Redis server)
+    redis = None
+    _RedisWatchError = None
+
+telemetry.registry.describe("blob_session_loads_total", "counter", "Session states loaded from the store by outcome")
+telemetry.registry.describe("blob_session_commits_total", "counter", "Session commits by outcome")
+
+
+class VersionConflict(Exception):
+    """The session was committed by someone else since it was loaded"""
+    def __init__(self, session_id: str, expected: int, actual: int):
+        super().__init__(f"Session '{session_id}' is at version {actual}, not {expected}")
+        self.session_id = session_id
+        self.expected = expected
+        self.actual = actual
+
+
+class MemorySessionStore:
+    """Game state snapshots in this process (forks, not serialized; not shared between workers)"""
+    serializes = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: Dict[str, Tuple[int, Any]] = {}
+
+    def version(self, session_id: str) -> int:
+        record = self._records.get(session_id)
+        return record[0] if record else 0
+
+    def load(self, session_id: str) -> Optional[Tuple[int, Any]]:
+        return self._records.get(session_id)
+
+    def save(self, session_id: str, data: Any, expected: int) -> int:
+        with self._lock:
+            current = self.version(session_id)
+            if current != expected:
+                raise VersionConflict(session_id, expected, current)
+            self._records[session_id] = (expected + 1, data)
+            return expected + 1
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._records.pop(session_id, None)
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite file shared by all workers on a host (one connection per thread)"""
+    serializes = True
+
+    def __init__(self, path: str = "sessions.db", timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions ("
+                         "id TEXT PRIMARY KEY, version INTEGER NOT NULL, data BLOB NOT NULL, updated REAL NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers never block the committing worker
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def version(self, session_id: str) -> int:
+        row = self._connection().execute("SELECT version FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, session_id: str) -> Optional[Tuple[int, bytes]]:
+        row = self._connection().execute("SELECT version, data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def save(self, session_id: str, data: bytes, expected: int) -> int:
+        conn = self._connection()
+        with conn:
+            if expected == 0:
+                cursor = conn.execute("INSERT OR IGNORE INTO sessions (id, version, data, updated) VALUES (?, 1, ?, ?)",
+                                      (session_id, data, time.time()))
+            else:
+                cursor = conn.execute("UPDATE sessions SET version = version + 1, data = ?, updated = ? "
+                                      "WHERE id = ? AND version = ?", (data, time.time(), session_id, expected))
+        if cursor.rowcount != 1:
+            raise VersionConflict(session_id, expected, self.version(session_id))
+        return expected + 1
+
+    def delete(self, session_id: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+class InMemoryRedis:
+    """
+    In-process stand-in for the subset of the redis-py client the Redis store uses
+    (hget, hmget, hset, delete and WATCH/MULTI/EXEC pipelines), for tests and local runs.
+    """
+    class WatchError(Exception):
+        pass
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._hashes: Dict[str, Dict[str, bytes]] = {}
+        self._writes: Dict[str, int] = {}  # Per-key write counter, checked by watched transactions
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def hget(self, key: str, field: str) -> Optional[bytes]:
+        with self._lock:
+            return self._hashes.get(key, {}).get(field)
+
+    def hmget(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            stored = self._hashes.get(key, {})
+            return [stored.get(field) for field in fields]
+
+    def hset(self, key: str, field: Optional[str] = None, value: Any = None,
+             mapping: Optional[Dict[str, Any]] = None) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        with self._lock:
+            stored = self._hashes.setdefault(key, {})
+            added = len(items.keys() - stored.keys())
+            stored.update({name: self._encode(v) for name, v in items.items()})
+            self._writes[key] = self._writes.get(key, 0) + 1
+            return added
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._hashes.pop(key, None) is not None:
+                    removed += 1
+                    self._writes[key] = self._writes.get(key, 0) + 1
+            return removed
+
+    def pipeline(self) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+
+
+class InMemoryPipeline:
+    """Immediate reads after watch(), buffered writes after multi(), applied by execute() if nothing watched changed"""
+    def __init__(self, client: InMemoryRedis):
+        self.client = client
+        self._watched: Dict[str, int] = {}
+        self._queued: List[Tuple[str, tuple, dict]] = []
+        self._buffering = False
+
+    def __enter__(self) -> "InMemoryPipeline":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.reset()
+
+    def reset(self):
+        self._watched.clear()
+        self._queued.clear()
+        self._buffering = False
+
+    def watch(self, *keys: str):
+        with self.client._lock:
+            for key in keys:
+                self._watched[key] = self.client._writes.get(key, 0)
+
+    def multi(self):
+        self._buffering = True
+
+    def hget(self, key: str, field: str) -> Optional[bytes]:
+        return self.client.hget(key, field)
+
+    def hset(self, key: str, *args: Any, **kwargs: Any):
+        if not self._buffering:
+            return self.client.hset(key, *args, **kwargs)
+        self._queued.append(("hset", (key, *args), kwargs))
+        return self
+
+    def execute(self) -> List[Any]:
+        with self.client._lock:
+            if any(self.client._writes.get(key, 0) != count for key, count in self._watched.items()):
+                self.reset()
+                raise InMemoryRedis.WatchError("Watched key changed")
+            queued = list(self._queued)
+            self.reset()
+            return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in queued]
+
+
+class RedisSessionStore:
+    """Sessions as Redis hashes {version, data} shared by workers on any host"""
+    serializes = True
+
+    def __init__(self, client: Any, prefix: str = "blob:session:"):
+        self.client = client
+        self.prefix = prefix
+        self._watch_errors = tuple(e for e in (_RedisWatchError, InMemoryRedis.WatchError) if e is not None)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    def version(self, session_id: str) -> int:
+        return int(self.client.hget(self._key(session_id), "version") or 0)
+
+    def load(self, session_id: str) -> Optional[Tuple[int, bytes]]:
+        version, data = self.client.hmget(self._key(session_id), ["version", "data"])
+        return (int(version), data) if version is not None else None
+
+    def save(self, session_id: str, data: bytes, expected: int) -> int:
+        key = self._key(session_id)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = int(pipe.hget(key, "version") or 0)
+                if current != expected:
+                    raise VersionConflict(session_id, expected, current)
+                pipe.multi()
+                pipe.hset(key, mapping={"version": expected + 1, "data": data})
+                pipe.execute()
+            except self._watch_errors:
+                raise VersionConflict(session_id, expected, self.version(session_id))
+        return expected + 1
+
+    def delete(self, session_id: str):
+        self.client.delete(self._key(session_id))
+
+
+def create_store(kind: Optional[str] = None) -> Any:
+    """The session store selected by settings (memory, sqlite or redis)"""
+    kind = kind or settings.session_store
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore(settings.session_sqlite_path)
+    if kind == "redis":
+        if settings.redis_url == "memory://":
+            return RedisSessionStore(InMemoryRedis())
+        if redis is None:
+            raise RuntimeError("BLOB_SESSION_STORE=redis requires the redis package (pip install redis)")
+        return RedisSessionStore(redis.Redis.from_url(settings.redis_url))
+    raise ValueError(f"Unknown session store '{kind}' (expected memory, sqlite or redis)")
+
+
+class Session:
+    """A game state checked out of the store at a version"""
+    __slots__ = ("session_id", "state", "version")
+
+    def __init__(self, session_id: str, state: EnhancedGameState, version: int):
+        self.session_id = session_id
+        self.state = state
+        self.version = version
+
+
+class SessionManager:
+    """Opens and commits sessions, caching deserialized states in this worker (LRU)"""
+    def __init__(self, store: Any, max_cached: int = 64):
+        self.store = store
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        # session id: (version, live state, committed snapshot)
+        self._cache: "OrderedDict[str, Tuple[int, EnhancedGameState, EnhancedGameState]]" = OrderedDict()
+        self._buses: Dict[str, event_bus.EventBus] = {}
+        self._turn_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def turn_lock(self, session_id: str) -> asyncio.Lock:
+        """Held by a request that changes the session, so this worker runs one turn of it at a time"""
+        with self._lock:
+            lock = self._turn_locks.get(session_id)
+            if lock is None:
+                lock = self._turn_locks[session_id] = asyncio.Lock()
+            return lock
+
+    def bus_for(self, session_id: str) -> event_bus.EventBus:
+        """Live viewers of a session in this worker"""
+        with self._lock:
+            return self._bus(session_id)
+
+    def subscribe(self, session_id: str) -> event_bus.Subscription:
+        """A new viewer of the session's updates in this worker"""
+        with self._lock:
+            return self._bus(session_id).subscribe()
+
+    def unsubscribe(self, session_id: str, subscription: event_bus.Subscription):
+        """Remove a viewer (the session's bus is forgotten once nothing uses it)"""
+        with self._lock:
+            bus = self._buses.get(session_id)
+            if bus is not None:
+                bus.unsubscribe(subscription)
+                self._prune_bus(session_id)
+
+    def _bus(self, session_id: str) -> event_bus.EventBus:
+        bus = self._buses.get(session_id)
+        if bus is None:
+            bus = self._buses[session_id] = event_bus.EventBus(max_queue=settings.ws_max_queue)
+        return bus
+
+    def _prune_bus(self, session_id: str):
+        """Forget a bus without viewers or a cached state publishing to it; call with the lock held"""
+        bus = self._buses.get(session_id)
+        if bus is not None and not bus.has_subscribers and session_id not in self._cache:
+            del self._buses[session_id]
+
+    def open(self, session_id: str, for_update: bool = False) -> Session:
+        """
+        The session as last committed (a new, uninitialized game if it was never committed): a snapshot
+        that must not be changed, or with for_update the live state (hold turn_lock while changing it)
+        """
+        version = self.store.version(session_id)
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(session_id)
+                telemetry.registry.inc("blob_session_loads_total", outcome="cached")
+                return Session(session_id, cached[1] if for_update else cached[2], version)
+
+        record = self.store.load(session_id) if version else None
+        snapshot = None
+        if record is None:
+            state, version, outcome = EnhancedGameState(), 0, "new"
+        elif self.store.serializes:
+            version, data = record
+            state, outcome = EnhancedGameState.from_dict(_loads(data)), "loaded"
+        else:
+            # The stored snapshot is never changed, so readers can share it
+            version, snapshot, outcome = record[0], record[1], "loaded"
+            state = snapshot.fork()
+        snapshot = self._remember(session_id, version, state, snapshot)
+        telemetry.registry.inc("blob_session_loads_total", outcome=outcome)
+        return Session(session_id, state if for_update else snapshot, version)
+
+    def commit(self, session: Session):
+        """Save the session's state; raises VersionConflict if it was committed elsewhere first"""
+        snapshot = session.state.fork()  # The turn is over, so nothing is changing the state now
+        data = _dumps(snapshot.to_dict()) if self.store.serializes else snapshot
+        try:
+            session.version = self.store.save(session.session_id, data, session.version)
+        except VersionConflict:
+            self.invalidate(session.session_id)
+            telemetry.registry.inc("blob_session_commits_total", outcome="conflict")
+            raise
+        self._remember(session.session_id, session.version, session.state, snapshot)
+        telemetry.registry.inc("blob_session_commits_total", outcome="committed")
+
+    def invalidate(self, session_id: str):
+        """Forget this worker's copy (e.g. after a failed turn left it half-applied)"""
+        with self._lock:
+            cached = self._cache.pop(session_id, None)
+            self._prune_bus(session_id)
+        if cached is not None:
+            cached[1].discard_prefetch()
+
+    def _remember(self, session_id: str, version: int, state: EnhancedGameState,
+                  snapshot: Optional[EnhancedGameState] = None) -> EnhancedGameState:
+        """Cache a live state and its committed snapshot (forked from it if not given); returns the snapshot"""
+        if snapshot is None:
+            snapshot = state.fork()
+        with self._lock:
+            state.bus = self._bus(session_id)  # Cached states always publish to the session's current bus
+            self._cache[session_id] = (version, state, snapshot)
+            self._cache.move_to_end(session_id)
+            evicted = []
+            while len(self._cache) > self.max_cached:
+                evicted_id, (_, evicted_state, _) = self._cache.popitem(last=False)
+                self._prune_bus(evicted_id)
+                evicted.append(evicted_state)
+        for old_state in evicted:
+            old_state.discard_prefetch()
+        return snapshot
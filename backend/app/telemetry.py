@@ -0,0 +1,297 @@
+"""
+Turn Telemetry
+--------------
+Per-stage timing spans, token counts and retry counts for each simulation turn.
+Measurements are aggregated into a small in-process registry that renders the
+Prometheus text format for the /metrics endpoint. When BLOB_OTEL=1 and the
+OpenTelemetry API is installed, every turn and stage is also emitted as a span.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # OpenTelemetry is optional
+    otel_trace = None
+
+_tracer = otel_trace.get_tracer("blob_sim") if (otel_trace and settings.otel_enabled) else None
+
+# Histogram buckets in seconds, spanning in-process work up to slow LLM round trips
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class TurnTrace:
+    """Measurements collected while serving a single turn"""
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started_at = time.time()
+        self.duration: float = 0.0
+        self.stages: Dict[str, float] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_calls = 0
+        self.retries = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "duration_s": round(self.duration, 6),
+            "stages_s": {name: round(value, 6) for name, value in self.stages.items()},
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "llm_calls": self.llm_calls,
+            "retries": self.retries,
+        }
+
+
+class MetricsRegistry:
+    """Minimal thread-safe counter/histogram registry with Prometheus text rendering"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        self._help[name] = (metric_type, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # Layout: one cumulative count per bucket, then +Inf count, then sum
+            state = series.setdefault(key, [0.0] * (len(LATENCY_BUCKETS) + 2))
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    @staticmethod
+    def _labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        items = list(key) + ([extra] if extra else [])
+        if not items:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(store.items()):
+                    _, help_text = self._help.get(name, (kind, name))
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(series.items()):
+                        lines.append(f"{name}{self._labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                _, help_text = self._help.get(name, ("histogram", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in sorted(series.items()):
+                    for bound, count in zip(LATENCY_BUCKETS, state):
+                        lines.append(f"{name}_bucket{self._labels(key, ('le', f'{bound:g}'))} {count:g}")
+                    lines.append(f"{name}_bucket{self._labels(key, ('le', '+Inf'))} {state[-2]:g}")
+                    lines.append(f"{name}_count{self._labels(key)} {state[-2]:g}")
+                    lines.append(f"{name}_sum{self._labels(key)} {state[-1]:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+registry.describe("blob_turns_total", "counter", "Simulation turns served")
+registry.describe("blob_turn_seconds", "histogram", "End-to-end turn latency")
+registry.describe("blob_turn_stage_seconds", "histogram", "Latency of each stage within a turn")
+registry.describe("blob_llm_calls_total", "counter", "LLM chat completion calls")
+registry.describe("blob_llm_tokens_total", "counter", "LLM tokens consumed")
+registry.describe("blob_llm_retries_total", "counter", "LLM call retries")
+registry.describe("blob_llm_task_seconds", "histogram", "LLM call latency by task kind and model")
+registry.describe("blob_llm_cost_usd_total", "counter", "Estimated LLM spend by task kind and model")
+registry.describe("blob_event_parse_total", "counter", "Event responses by first-pass validity and repair outcome")
+
+def nearest_rank(ordered: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile (0-100) of sorted, non-empty samples: the smallest covering pct of them"""
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))]
+
+
+class TaskStats:
+    """Running latency/token/cost totals for one task kind, with recent latencies for percentiles"""
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.total_seconds = 0.0
+        self.models: Dict[str, int] = {}
+        self.recent_latencies: deque = deque(maxlen=200)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        samples = sorted(self.recent_latencies)
+        if not samples:
+            return None
+        return nearest_rank(samples, pct)
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50, p90 = self.percentile(50), self.percentile(90)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "models": dict(self.models),
+            "mean_latency_s": round(self.total_seconds / len_ok, 4) if (len_ok := self.calls - self.failures) else None,
+            "p50_latency_s": round(p50, 4) if p50 is not None else None,
+            "p90_latency_s": round(p90, 4) if p90 is not None else None,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+task_stats: Dict[str, TaskStats] = {}
+_task_lock = threading.Lock()
+
+# Most recent turn traces, kept for debugging
+recent_turns: deque = deque(maxlen=50)
+
+_current_turn: ContextVar[Optional[TurnTrace]] = ContextVar("blob_current_turn", default=None)
+
+
+def current_turn() -> Optional[TurnTrace]:
+    """Return the trace of the turn being served, if any"""
+    return _current_turn.get()
+
+
+@contextmanager
+def _otel_span(name: str, **attributes: Any) -> Iterator[Any]:
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+@contextmanager
+def turn(kind: str) -> Iterator[TurnTrace]:
+    """Trace a whole turn (e.g. one /run_iteration request)"""
+    trace = TurnTrace(kind)
+    token = _current_turn.set(trace)
+    start = time.perf_counter()
+    try:
+        with _otel_span(f"turn.{kind}") as span:
+            yield trace
+            if span is not None:
+                span.set_attribute("blob.prompt_tokens", trace.prompt_tokens)
+                span.set_attribute("blob.completion_tokens", trace.completion_tokens)
+                span.set_attribute("blob.retries", trace.retries)
+    finally:
+        trace.duration = time.perf_counter() - start
+        _current_turn.reset(token)
+        registry.inc("blob_turns_total", kind=kind)
+        registry.observe("blob_turn_seconds", trace.duration, kind=kind)
+        recent_turns.append(trace)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time one stage of the current turn (prompt assembly, LLM call, parsing, ...)"""
+    trace = _current_turn.get()
+    kind = trace.kind if trace else "none"
+    start = time.perf_counter()
+    try:
+        with _otel_span(f"stage.{name}", kind=kind):
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if trace is not None:
+            trace.stages[name] = trace.stages.get(name, 0.0) + elapsed
+        registry.observe("blob_turn_stage_seconds", elapsed, kind=kind, stage=name)
+
+
+def record_llm_call(usage: Any, retries: int = 0, task: str = "default",
+                    model: Optional[str] = None, latency: Optional[float] = None):
+    """Record token usage, retries, latency and cost of one LLM call (usage is None on failure)"""
+    trace = _current_turn.get()
+    kind = trace.kind if trace else "none"
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    model = model or "unknown"
+    prices = settings.model_prices.get(model, (0.0, 0.0))
+    cost = (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+    with _task_lock:
+        stats = task_stats.setdefault(task, TaskStats())
+        stats.calls += 1
+        stats.models[model] = stats.models.get(model, 0) + 1
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += completion_tokens
+        stats.cost_usd += cost
+        if usage is None:
+            stats.failures += 1
+        elif latency is not None:
+            stats.total_seconds += latency
+            stats.recent_latencies.append(latency)
+
+    if latency is not None and usage is not None:
+        registry.observe("blob_llm_task_seconds", latency, task=task, model=model)
+    if cost:
+        registry.inc("blob_llm_cost_usd_total", cost, task=task, model=model)
+
+    if trace is not None:
+        trace.llm_calls += 1
+        trace.prompt_tokens += prompt_tokens
+        trace.completion_tokens += completion_tokens
+        trace.retries += retries
+
+    registry.inc("blob_llm_calls_total", kind=kind)
+    registry.inc("blob_llm_tokens_total", prompt_tokens, kind=kind, type="prompt")
+    registry.inc("blob_llm_tokens_total", completion_tokens, kind=kind, type="completion")
+    if retries:
+        registry.inc("blob_llm_retries_total", retries, kind=kind)
+
+
+def record_event_parse(outcome: str):
+    """Count an event parse outcome: valid, repaired or failed"""
+    trace = _current_turn.get()
+    registry.inc("blob_event_parse_total", kind=trace.kind if trace else "none", outcome=outcome)
+
+
+def task_report() -> Dict[str, Dict[str, Any]]:
+    """Latency and cost summary per LLM task kind"""
+    with _task_lock:
+        return {task: stats.to_dict() for task, stats in sorted(task_stats.items())}
+
+
+def task_latency_percentile(task: str, pct: float, min_samples: int = 1) -> Optional[float]:
+    """Recent latency percentile for a task kind, or None without enough samples"""
+    with _task_lock:
+        stats = task_stats.get(task)
+        if stats is None or len(stats.recent_latencies) < min_samples:
+            return None
+        return stats.percentile(pct)
+
+
+def render_prometheus() -> str:
+    return registry.render()
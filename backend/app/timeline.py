@@ -0,0 +1,149 @@
+"""
+Turn Timeline
+-------------
+Undo records of the turns applied to a game, so it can be rewound to any
+earlier year without replaying LLM calls. A turn only appends (its event,
+messages, blob history entries and metric history values) or overwrites a few
+values (the metrics and society relations its event named), so its TurnDelta
+holds just the lengths before the appends and the overwritten values, and
+undoing it costs O(what the turn changed).
+
+Rewinding to a year restores the world as it was when that year's turn was
+committed; messages added after it (reports, failed turns) are dropped too.
+Rewinding to the latest turn's year is a no-op.
+Together with copy-on-write forks (app.cow), branching from a past year is a
+fork plus a rewind.
+
+Each turn also extends a fingerprint chain (a hash of the previous fingerprint
+and the turn's event, starting from a random origin at initialization): equal
+fingerprints mean the same world history, in a fork or after a rewind, even
+though the game id differs. Saves from before fingerprints existed get a new
+origin, and their turns are chained from it by year, so their history matches
+only its own forks.
+"""
+
+import hashlib
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def chain(fingerprint: str, *parts: Any) -> str:
+    """Fingerprint of a history extended by one turn (described by parts)"""
+    chained = "\n".join([fingerprint, *map(str, parts)])
+    return hashlib.blake2b(chained.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class TurnDelta:
+    """What applying one event changed: lengths before its appends and the values it overwrote"""
+    __slots__ = ("year", "previous_year", "messages", "events", "metrics", "relations", "histories", "fingerprint")
+
+    def __init__(self, year: int, previous_year: int, messages: int, events: int,
+                 metrics: Dict[str, Tuple[float, int]], relations: List[Tuple[int, int, Optional[float]]],
+                 histories: List[Tuple[int, int]], fingerprint: Optional[str]):
+        self.year = year
+        self.previous_year = previous_year
+        self.messages = messages  # Message history length once the turn was committed
+        self.events = events  # Index of the turn's event
+        self.metrics = metrics  # metric: (old value, history length)
+        self.relations = relations  # (society id, other society id, old score or None if unset)
+        self.histories = histories  # (blob id, history length)
+        self.fingerprint = fingerprint  # Of the history up to and including this turn
+
+    @classmethod
+    def capture(cls, state: Any, event: Any) -> "TurnDelta":
+        """Record what applying event will change (call before the state applies it)"""
+        world_metrics = state.world_metrics
+        metrics = {name: (world_metrics.metrics[name], len(world_metrics.history[name]))
+                   for name in event.world_metrics if name in world_metrics.metrics}
+
+        # Parsed like EnhancedGameState.update_society_relations; both directions change
+        societies = {s.society_id: s for s in state.societies}
+        relations = []
+        for relation_key in event.society_relations:
+            society_ids = relation_key.split("-")
+            if len(society_ids) != 2:
+                continue
+            try:
+                first, second = int(society_ids[0]), int(society_ids[1])
+            except ValueError:
+                continue
+            if first in societies and second in societies:
+                relations.append((first, second, societies[first].relations.get(second)))
+                relations.append((second, first, societies[second].relations.get(first)))
+
+        history_lengths = {b.blob_id: len(b.history) for b in state.blobs}
+        histories = []
+        for blob_id in event.impacts:
+            try:
+                blob_id = int(blob_id) if isinstance(blob_id, str) else blob_id
+            except ValueError:
+                continue
+            if blob_id in history_lengths:
+                histories.append((blob_id, history_lengths[blob_id]))
+
+        return cls(event.year, state.current_year, len(state.message_history), len(state.world_events),
+                   metrics, relations, histories,
+                   chain(state.timeline.fingerprint(), event.year, event.headline, event.details))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"year": self.year, "previous_year": self.previous_year, "messages": self.messages,
+                "events": self.events, "metrics": self.metrics, "relations": self.relations,
+                "histories": self.histories, "fingerprint": self.fingerprint}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TurnDelta":
+        return cls(data["year"], data["previous_year"], data["messages"], data["events"],
+                   {name: tuple(value) for name, value in data["metrics"].items()},
+                   [tuple(relation) for relation in data["relations"]],
+                   [tuple(history) for history in data["histories"]], data.get("fingerprint"))
+
+
+class Timeline:
+    """Undo records of a game's turns since it was initialized (at start_year, with start_messages messages)"""
+    def __init__(self, start_year: int = 0, start_messages: int = 0, origin: Optional[str] = None):
+        self.start_year = start_year
+        self.start_messages = start_messages
+        self.origin = origin or uuid.uuid4().hex[:16]  # Fingerprint of the world as initialized
+        self.turns: List[TurnDelta] = []
+
+    def clone(self) -> "Timeline":
+        """Copy that can be changed without affecting this timeline (see app.cow); deltas are immutable"""
+        timeline = Timeline(self.start_year, self.start_messages, self.origin)
+        timeline.turns = list(self.turns)
+        return timeline
+
+    def fingerprint(self) -> str:
+        """Fingerprint of the history so far"""
+        return self.turns[-1].fingerprint if self.turns else self.origin
+
+    def years(self) -> List[int]:
+        """Years that can be rewound to"""
+        return [self.start_year] + [turn.year for turn in self.turns]
+
+    def turns_through(self, year: int) -> int:
+        """Number of turns kept when rewinding to year (the last turn committed in it counts)"""
+        for kept in range(len(self.turns), 0, -1):
+            if self.turns[kept - 1].year == year:
+                return kept
+        if year == self.start_year:
+            return 0
+        raise ValueError(f"Year {year} is not on the timeline (years: {', '.join(map(str, self.years()))})")
+
+    def messages_at(self, kept: int) -> int:
+        """Message history length once the first kept turns were committed"""
+        return self.turns[kept - 1].messages if kept else self.start_messages
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start_year": self.start_year, "start_messages": self.start_messages, "origin": self.origin,
+                "turns": [turn.to_dict() for turn in self.turns]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Timeline":
+        timeline = cls(data["start_year"], data["start_messages"], data.get("origin"))
+        timeline.turns = [TurnDelta.from_dict(turn) for turn in data["turns"]]
+        fingerprint = timeline.origin
+        for turn in timeline.turns:
+            if turn.fingerprint is None:  # Saved before fingerprints existed
+                turn.fingerprint = chain(fingerprint, turn.year, turn.events)
+            fingerprint = turn.fingerprint
+        return timeline
@@ -0,0 +1,230 @@
+"""
+API Benchmark Harness
+---------------------
+Drives the FastAPI app in-process against the offline LLM stand-in and sweeps
+population size, session length (turns) and concurrent clients. Concurrent
+clients first only read, then play turns mixed with reads, each on its own
+session and then all on one shared session. Latency percentiles, throughput,
+prompt-token growth per turn and RSS are written to a JSON file so regressions
+in the EnhancedGameState hot paths can be tracked.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_api --blobs 5,20,50 --turns 10 --clients 1,4 --out bench_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+# The stand-in must be enabled before the app (and its settings) are imported
+os.environ["BLOB_OFFLINE_LLM"] = "1"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import main, telemetry  # noqa: E402
+from app.llm_scheduler import estimate_tokens  # noqa: E402
+
+POLICIES = [
+    "Ban factory waste in the river",
+    "Subsidize recycling jobs for factory workers",
+    "Introduce a waste tax on factory owners",
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    return telemetry.nearest_rank(sorted(samples), pct)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (falls back to peak RSS off Linux)"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class Recorder:
+    """Thread-safe collection of per-endpoint latencies"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def timed(self, client: TestClient, name: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[name] += 1
+        return response
+
+
+def run_session(client: TestClient, recorder: Recorder, num_blobs: int, turns: int) -> List[int]:
+    """Initialize a world and play a session, returning prompt tokens after each turn"""
+    recorder.timed(client, "/initialize", "POST", "/initialize",
+                   json={"num_blobs": num_blobs, "num_societies": 3})
+    prompt_tokens = [estimate_tokens(main.sessions.open(main.DEFAULT_SESSION).state.message_history)]
+    for turn in range(turns):
+        if turn % 3 == 2:
+            recorder.timed(client, "/propose_policy", "POST", "/propose_policy",
+                           json={"proposal": POLICIES[turn % len(POLICIES)], "temperature": 0.7})
+        else:
+            recorder.timed(client, "/run_iteration", "GET", "/run_iteration",
+                           params={"temperature": 0.7, "create_image": False})
+        prompt_tokens.append(estimate_tokens(main.sessions.open(main.DEFAULT_SESSION).state.message_history))
+    return prompt_tokens
+
+
+def run_readers(client: TestClient, recorder: Recorder, num_blobs: int,
+                clients: int, requests_per_client: int) -> float:
+    """Hammer the read endpoints from concurrent clients, returning throughput (req/s)"""
+    def worker(offset: int):
+        for i in range(requests_per_client):
+            if i % 2 == 0:
+                recorder.timed(client, "/blobs", "GET", "/blobs")
+            else:
+                recorder.timed(client, "/blob/{id}", "GET", f"/blob/{(offset + i) % num_blobs}")
+
+    elapsed = run_clients(worker, clients)
+    return clients * requests_per_client / elapsed if elapsed > 0 else 0.0
+
+
+def run_clients(worker, clients: int) -> float:
+    """Run worker(n) for each client on its own thread, returning the elapsed seconds"""
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run_players(client: TestClient, recorder: Recorder, num_blobs: int, clients: int, turns: int,
+                shared: bool) -> float:
+    """
+    Concurrent clients playing turns (iterations and policies) with reads in between, each on its own
+    session or all on one shared session, returning turn throughput (turns/s)
+    """
+    kind = "shared" if shared else "own"
+    if shared:
+        client.post("/initialize", json={"num_blobs": num_blobs, "num_societies": 3},
+                    headers={"X-Session-Id": "bench-shared"})
+
+    def worker(n: int):
+        headers = {"X-Session-Id": "bench-shared" if shared else f"bench-{n}"}
+        if not shared:
+            recorder.timed(client, f"{kind}:/initialize", "POST", "/initialize", headers=headers,
+                           json={"num_blobs": num_blobs, "num_societies": 3})
+        for turn in range(turns):
+            if turn % 3 == 2:
+                recorder.timed(client, f"{kind}:/propose_policy", "POST", "/propose_policy", headers=headers,
+                               json={"proposal": POLICIES[(n + turn) % len(POLICIES)], "temperature": 0.7})
+            else:
+                recorder.timed(client, f"{kind}:/run_iteration", "GET", "/run_iteration", headers=headers,
+                               params={"temperature": 0.7, "create_image": False})
+            recorder.timed(client, f"{kind}:/blobs", "GET", "/blobs", headers=headers)
+            recorder.timed(client, f"{kind}:/events", "GET", "/events", headers=headers)
+
+    elapsed = run_clients(worker, clients)
+    return clients * turns / elapsed if elapsed > 0 else 0.0
+
+
+def run_config(num_blobs: int, turns: int, clients: int, requests_per_client: int, concurrent_turns: int) -> Dict:
+    recorder = Recorder()
+    rss_start = rss_mb()
+    with TestClient(main.app) as client:
+        session_start = time.perf_counter()
+        prompt_tokens = run_session(client, recorder, num_blobs, turns)
+        session_elapsed = time.perf_counter() - session_start
+        read_throughput = run_readers(client, recorder, num_blobs, clients, requests_per_client)
+        own_throughput = run_players(client, recorder, num_blobs, clients, concurrent_turns, shared=False)
+        shared_throughput = run_players(client, recorder, num_blobs, clients, concurrent_turns, shared=True)
+
+    growth = [b - a for a, b in zip(prompt_tokens, prompt_tokens[1:])]
+    return {
+        "config": {"num_blobs": num_blobs, "turns": turns, "clients": clients,
+                   "requests_per_client": requests_per_client, "concurrent_turns": concurrent_turns},
+        "endpoints": {name: summarize(samples) for name, samples in sorted(recorder.latencies.items())},
+        "errors": dict(recorder.errors),
+        "session_turns_per_s": round(turns / session_elapsed, 3) if session_elapsed > 0 else 0.0,
+        "read_throughput_rps": round(read_throughput, 3),
+        "own_sessions_turns_per_s": round(own_throughput, 3),
+        "shared_session_turns_per_s": round(shared_throughput, 3),
+        "prompt_tokens": prompt_tokens,
+        "prompt_token_growth_per_turn": round(sum(growth) / len(growth), 1) if growth else 0.0,
+        "rss_mb_start": round(rss_start, 2),
+        "rss_mb_end": round(rss_mb(), 2),
+    }
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the blob simulation API offline")
+    parser.add_argument("--blobs", type=parse_int_list, default=[5, 20, 50], help="Population sizes")
+    parser.add_argument("--turns", type=parse_int_list, default=[10], help="Session lengths")
+    parser.add_argument("--clients", type=parse_int_list, default=[1, 4], help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=50, help="Read requests per client")
+    parser.add_argument("--concurrent-turns", type=int, default=6, help="Turns per client in the concurrent sweeps")
+    parser.add_argument("--out", default="bench_results.json", help="Output JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for num_blobs in args.blobs:
+        for turns in args.turns:
+            for clients in args.clients:
+                result = run_config(num_blobs, turns, clients, args.requests, args.concurrent_turns)
+                results.append(result)
+                endpoints = result["endpoints"]
+                print(f"blobs={num_blobs} turns={turns} clients={clients}: "
+                      f"run_iteration p95={endpoints.get('/run_iteration', {}).get('p95_ms')}ms "
+                      f"blobs p95={endpoints.get('/blobs', {}).get('p95_ms')}ms "
+                      f"reads={result['read_throughput_rps']}rps "
+                      f"turns own/shared={result['own_sessions_turns_per_s']}/{result['shared_session_turns_per_s']}/s "
+                      f"errors={sum(result['errors'].values())} "
+                      f"tokens/turn={result['prompt_token_growth_per_turn']}")
+
+    report = {
+        "meta": {"timestamp": time.time(), "python": platform.python_version(),
+                 "platform": platform.platform(),
+                 "offline_latency_ms": float(os.getenv("BLOB_OFFLINE_LLM_LATENCY_MS", "0"))},
+        "results": results,
+    }
+    with open(args.out, "w") as out:
+        json.dump(report, out, indent=2)
+    print(f"Wrote {len(results)} results to {args.out}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,89 @@
+"""
+Executor Benchmark
+------------------
+Measures how long CPU-heavy response work of a large world (per-blob story
+strings and the society relations report) stalls the event loop when run
+inline, on the thread pool and on the process pool (relation scores passed
+through shared memory). A ticker coroutine records the worst delay it sees
+while the work runs; that delay is what every other request on the worker
+would wait.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_executor --blobs 2000 --history 40 --societies 150
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from array import array
+from typing import Dict, List, Tuple
+
+from app.executor import Executor, impact_strings, relations_report
+
+
+def build_world(num_blobs: int, history: int, num_societies: int) -> Tuple[list, List[int], List[str], array]:
+    """Synthetic story rows and relation matrix (no game state or LLM needed)"""
+    rng = random.Random(0)
+    rows = [(blob_id, f"Blob-{blob_id} is a thoughtful blob who likes tidy rivers.",
+             [(year, f"Blob-{blob_id} felt {rng.choice(['hopeful', 'angry', 'calm'])} about event {year}.")
+              for year in range(1, history + 1)])
+            for blob_id in range(num_blobs)]
+    ids = list(range(num_societies))
+    scores = array("d", (rng.uniform(-1.0, 1.0) for _ in range(num_societies * num_societies)))
+    return rows, ids, [f"Collective {i}" for i in ids], scores
+
+
+async def measure(executor: Executor, rows, ids, ideologies, scores, repeats: int) -> Dict[str, float]:
+    """Wall time per repeat and the worst event-loop stall while the work ran"""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        interval = 0.001
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stall = max(stall, time.perf_counter() - start - interval)
+
+    # Warm the pools up (process start-up is a one-off cost)
+    await executor.run(relations_report, ids[:2], ideologies[:2], array("d", [0.0] * 4), items=None)
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        items = sum(len(history) + 1 for _, _, history in rows)
+        stories = await executor.run(impact_strings, rows, items=items)
+        report = await executor.run(relations_report, ids, ideologies, scores, items=len(scores))
+    elapsed = (time.perf_counter() - start) / repeats
+    done = True
+    await tick
+    assert len(stories) == len(rows) and report.count("\n") == len(ids) * (len(ids) - 1) // 2
+    return {"seconds": elapsed, "max_loop_stall": stall}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark event-loop stalls of inline vs offloaded CPU work")
+    parser.add_argument("--blobs", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=40, help="History entries per blob")
+    parser.add_argument("--societies", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rows, ids, ideologies, scores = build_world(args.blobs, args.history, args.societies)
+    assert impact_strings(rows[:1])[0].startswith(rows[0][1] + "\nHistory of Impacts:\nIteration - 1: ")
+    for kind in ("inline", "thread", "process"):
+        executor = Executor(kind, workers=args.workers, min_items=0)
+        try:
+            result = asyncio.run(measure(executor, rows, ids, ideologies, scores, args.repeats))
+        finally:
+            executor.shutdown()
+        print(f"{kind:>7}: {result['seconds'] * 1000:8.1f} ms/round  "
+              f"max event-loop stall {result['max_loop_stall'] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,69 @@
+"""
+Fork Benchmark
+--------------
+Measures the cost of forking a played world (copy-on-write, see app.cow)
+against a full serialize-and-rebuild copy, and the cost of one turn played on
+a fresh fork (which pays for the parts it changes) against a turn on the
+original. Uses the offline LLM stand-in, so no API calls are made.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_fork --blobs 50 --turns 40 --repeats 200
+"""
+
+import argparse
+import copy
+import os
+import random
+import time
+from typing import Callable
+
+# The stand-in must be enabled before the game state (and its settings) is imported
+os.environ["BLOB_OFFLINE_LLM"] = "1"
+os.environ.setdefault("BLOB_LOG_LEVEL", "ERROR")
+
+from app.blob_sim import EnhancedGameState  # noqa: E402
+
+
+def timed(fn: Callable[[], object], repeats: int) -> float:
+    """Mean seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark copy-on-write forks of a game state")
+    parser.add_argument("--blobs", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=40, help="Turns played before forking")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    state = EnhancedGameState()
+    state.initialize_with_personalities(num_blobs=args.blobs, num_societies=3)
+    for _ in range(args.turns):
+        state.run_iteration(create_image=False)
+
+    def deep_copy():
+        return EnhancedGameState.from_dict(copy.deepcopy(state.to_dict()))
+
+    def fork_and_play():
+        state.fork().run_iteration(create_image=False)
+
+    def play_on_copy():
+        deep_copy().run_iteration(create_image=False)
+
+    fork_s = timed(state.fork, args.repeats)
+    copy_s = timed(deep_copy, max(1, args.repeats // 10))
+    fork_turn_s = timed(fork_and_play, max(1, args.repeats // 10))
+    copy_turn_s = timed(play_on_copy, max(1, args.repeats // 10))
+    print(f"world: {len(state.blobs)} blobs, {len(state.world_events)} events, "
+          f"{len(state.message_history)} messages")
+    print(f"  fork:             {fork_s * 1e6:10.1f} us   deep copy:        {copy_s * 1e6:10.1f} us")
+    print(f"  fork + one turn:  {fork_turn_s * 1e6:10.1f} us   copy + one turn:  {copy_turn_s * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,196 @@
+"""
+Event Parser Benchmark
+----------------------
+Compares the cost of parsing LLM event responses with the baseline regex and
+substring-chain parser against app.event_parser, for strict JSON-mode output
+and for fenced JSON embedded in prose.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_parser --iterations 2000
+"""
+
+import argparse
+import json
+import re
+import time
+from types import SimpleNamespace
+
+from app import event_parser
+from app.blob_sim import Blob, WorldEvent
+from app.offline_llm import chat
+
+
+def legacy_parse(self, response: str):
+    """Baseline regex/substring parser, kept verbatim for comparison"""
+    try:
+        # Try to find and extract JSON from the response
+        json_match = re.search(r'```json\s*(\{.*?\})\s*```', response, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(1)
+        else:
+            # Try to find JSON without code blocks
+            json_match = re.search(r'(\{.*\})', response, re.DOTALL)
+            if json_match:
+                json_str = json_match.group(1)
+            else:
+                # No JSON found
+                pass
+                return None
+
+        try:
+            # Parse the JSON
+            event_data = json.loads(json_str)
+
+            # Extract the basic event data
+            year = int(event_data.get('year', self.current_year + 1))
+            headline = event_data.get('headline', 'Unknown Event')
+            details = event_data.get('details', 'No details available')
+
+            # Extract subheadlines
+            subheadlines = event_data.get('subheadlines', [])
+            if not isinstance(subheadlines, list):
+                subheadlines = []
+
+            # Extract impacts
+            impacts = {}
+            impact_data = event_data.get('impacts', {})
+            for key, value in impact_data.items():
+                # Try to extract blob ID from keys like "blob_1" or "Blob-2"
+                blob_id_match = re.search(r'blob[_-]?(\d+)', key.lower())
+                if blob_id_match:
+                    blob_id = int(blob_id_match.group(1))
+                    impacts[blob_id] = value
+                else:
+                    # Try to find blob by name
+                    blob = next((b for b in self.blobs if b.name.lower() == key.lower()), None)
+                    if blob:
+                        impacts[blob.blob_id] = value
+                    else:
+                        # Just use a placeholder ID for unrecognized names
+                        impacts[hash(key) % 1000 + 100] = f"{key}: {value}"
+
+            # Extract society relations
+            society_relations = {}
+            relations_data = event_data.get('society_relations', [])
+            for relation in relations_data:
+                society1 = relation.get('society1')
+                society2 = relation.get('society2')
+                change_type = relation.get('change', 'none')
+
+                # Skip invalid entries
+                if society1 is None or society2 is None:
+                    continue
+
+                # Normalize change type
+                if "big_decrease" in change_type:
+                    change_type = "big_decrease"
+                elif "decrease" in change_type:
+                    change_type = "decrease"
+                elif "none" in change_type or "neutral" in change_type:
+                    change_type = "none"
+                elif "big_increase" in change_type:
+                    change_type = "big_increase"
+                elif "increase" in change_type:
+                    change_type = "increase"
+                else:
+                    # Default to no change if we can't parse
+                    change_type = "none"
+
+                # Store relation change
+                relation_key = f"{society1}-{society2}"
+                society_relations[relation_key] = change_type
+
+            # Extract world metrics
+            world_metrics = {}
+            metrics_data = event_data.get('world_metrics', [])
+            valid_metrics = ["happiness", "safety", "environment_cleanliness", 
+                            "trust_in_government", "health", "education", "poverty"]
+
+            for metric_data in metrics_data:
+                metric_name = metric_data.get('metric', '').lower().strip()
+                change_type = metric_data.get('change', 'none')
+
+                # Normalize metric names
+                metric_name = metric_name.replace(' ', '_')
+
+                # Skip if not a valid metric
+                if metric_name not in valid_metrics:
+                    continue
+
+                # Normalize change type
+                if "big_decrease" in change_type:
+                    change_type = "big_decrease"
+                elif "decrease" in change_type:
+                    change_type = "decrease"
+                elif "none" in change_type or "neutral" in change_type:
+                    change_type = "none"
+                elif "big_increase" in change_type:
+                    change_type = "big_increase"
+                elif "increase" in change_type:
+                    change_type = "increase"
+                else:
+                    # Default to no change if we can't parse
+                    change_type = "none"
+
+                # Store metric change
+                world_metrics[metric_name] = change_type
+
+            event = WorldEvent(year, headline, details, impacts, society_relations, world_metrics)
+
+            # Add subheadlines to the event
+            event.subheadlines = subheadlines
+
+            return event
+
+        except json.JSONDecodeError as e:
+            pass
+            return None
+
+    except Exception as e:
+        pass
+        return None
+
+
+def sample_responses(num_blobs: int):
+    """Offline stand-in event in JSON mode and wrapped in a fenced block with prose"""
+    messages = [{"role": "system", "content": f"Simulation with {num_blobs} blob creatures. "
+                 + " ".join(f"Society-{i}" for i in range(4))},
+                {"role": "user", "content": "Advance the simulation"}]
+    raw = chat.completions.create(model="gpt-4o", messages=messages,
+                                  response_format={"type": "json_object"}).choices[0].message.content
+    event = json.loads(raw)
+    event["impacts"] = {f"blob_{i}": f"Blob-{i} was affected." for i in range(num_blobs)}
+    event["world_metrics"] = [dict(m, change=f"slight {m['change']}".replace("_", " ")) for m in event["world_metrics"]]
+    strict = json.dumps(event)
+    fenced = f"Here is the next event:\n```json\n{json.dumps(event, indent=2)}\n```\nEnjoy!"
+    return {"json_mode": strict, "fenced": fenced}
+
+
+def time_parser(parse, response: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse(response)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark event response parsing")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--blobs", type=int, default=50)
+    args = parser.parse_args()
+
+    blobs = [Blob(i, {}) for i in range(args.blobs)]
+    state = SimpleNamespace(current_year=0, blobs=blobs)
+    for name, response in sample_responses(args.blobs).items():
+        legacy = legacy_parse(state, response)
+        fast = event_parser.parse_event(response, 1, blobs)
+        assert legacy.impacts == fast.impacts and legacy.society_relations == fast.society_relations
+
+        legacy_us = time_parser(lambda r: legacy_parse(state, r), response, args.iterations)
+        fast_us = time_parser(lambda r: event_parser.parse_event(r, 1, blobs), response, args.iterations)
+        print(f"{name:>9}: legacy {legacy_us:8.1f} us  fast {fast_us:8.1f} us  speedup {legacy_us / fast_us:4.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,66 @@
+"""
+Roster Encoding Benchmark
+-------------------------
+Measures the prompt size of the initial blob/society description with the verbose
+encoding (properties spelled out, personalities and society members listed
+separately) against the compact one-line-per-blob roster. Token counts use
+tiktoken when installed and the scheduler's character estimate otherwise.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_roster --blobs 10 50 200
+"""
+
+import argparse
+import random
+
+from app.blob_sim import EnhancedGameState, Society
+from app.config import settings
+from app.llm_scheduler import estimate_tokens
+from app.offline_llm import PERSONALITY_WORDS
+
+try:
+    import tiktoken
+except ImportError:  # Optional: exact token counts
+    tiktoken = None
+
+
+def count_tokens(text: str) -> int:
+    if tiktoken is not None:
+        return len(tiktoken.encoding_for_model("gpt-4o").encode(text))
+    return estimate_tokens([{"content": text}])
+
+
+def build_state(num_blobs: int, num_societies: int = 3) -> EnhancedGameState:
+    """Populate a game state without calling the LLM"""
+    random.seed(num_blobs)
+    state = EnhancedGameState()
+    state.generate_blobs(num_blobs)
+    state.societies = [Society(i, f"Collective {i}", ["Progress", "Nature", "Community"]) for i in range(num_societies)]
+    for blob in state.blobs:
+        traits = random.sample(PERSONALITY_WORDS, 4)
+        blob.personality = f"A {traits[0]} blob who worries about the factories but values a steady paycheck."
+        blob.traits = traits
+    state.assign_blobs_to_societies()
+    return state
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Measure roster prompt tokens per blob")
+    parser.add_argument("--blobs", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    print(f"token counter: {'tiktoken' if tiktoken else 'estimate (chars / 4)'}")
+    for num_blobs in args.blobs:
+        state = build_state(num_blobs)
+        sizes = {}
+        for compact in (False, True):
+            settings.compact_roster = compact
+            sizes[compact] = count_tokens(state.get_roster_message())
+        verbose, compact = sizes[False], sizes[True]
+        print(f"{num_blobs:>4} blobs: verbose {verbose:7d} tok ({verbose / num_blobs:6.1f}/blob)  "
+              f"compact {compact:7d} tok ({compact / num_blobs:6.1f}/blob)  saved {1 - compact / verbose:5.1%}")
+
+
+if __name__ == "__main__":
+    main_cli()
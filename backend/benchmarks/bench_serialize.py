@@ -0,0 +1,90 @@
+"""
+List Serialization Benchmark
+----------------------------
+Compares encoding /blobs and /events the way the endpoints used to (one
+Pydantic response model per item, then FastAPI's jsonable_encoder and JSON
+encoding) with the fragment path in app.listing, cold (every entity
+re-encoded) and warm (unchanged entities served from cached fragments).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialize --blobs 50 --turns 200
+"""
+
+import argparse
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app import listing
+from app.blob_sim import Blob, WorldEvent
+from app.main import BLOB_GETTERS, EVENT_GETTERS, BlobResponse, EventResponse
+from app.random_stats import generate_random_blobs
+
+
+def build_world(num_blobs: int, turns: int):
+    random.seed(0)
+    blobs = [Blob(i, props) for i, props in enumerate(generate_random_blobs(num_blobs))]
+    events = []
+    for year in range(1, turns + 1):
+        affected = random.sample(blobs, k=min(5, num_blobs))
+        event = WorldEvent(year, f"Headline {year}", "Details of the event. " * 10,
+                           {b.blob_id: f"Blob-{b.blob_id} reacted to event {year}." for b in affected})
+        event.subheadlines = [f"Subheadline {i}" for i in range(5)]
+        for blob in affected:
+            blob.add_event(year, "world_event", event.impacts[blob.blob_id])
+        events.append(event)
+    return blobs, events
+
+
+def legacy_blobs(blobs):
+    models = [BlobResponse(blob_id=b.blob_id, name=b.name, society_id=b.society_id, personality=b.personality,
+                           traits=b.traits, properties=b.properties, image_url=b.image_url, history=b.history)
+              for b in blobs]
+    return json.dumps(jsonable_encoder(models)).encode("utf-8")
+
+
+def legacy_events(events):
+    models = [EventResponse(year=e.year, headline=e.headline, subheadlines=e.subheadlines,
+                            headline_metric=e.metrics_headline, details=e.details,
+                            impacts={str(k): v for k, v in e.impacts.items()}, image_url=e.image_url)
+              for e in events]
+    return json.dumps(jsonable_encoder(models)).encode("utf-8")
+
+
+def fragments(items, getters, cold: bool):
+    if cold:
+        for item in items:
+            item.touch()
+    return listing.encode_page(enumerate(items), getters, list(getters))
+
+
+def time_ms(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization")
+    parser.add_argument("--blobs", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    blobs, events = build_world(args.blobs, args.turns)
+    for name, items, getters, legacy in (("/blobs", blobs, BLOB_GETTERS, legacy_blobs),
+                                         ("/events", events, EVENT_GETTERS, legacy_events)):
+        assert json.loads(legacy(items)) == json.loads(fragments(items, getters, cold=True))
+        legacy_ms = time_ms(lambda: legacy(items), args.iterations)
+        cold_ms = time_ms(lambda: fragments(items, getters, cold=True), args.iterations)
+        warm_ms = time_ms(lambda: fragments(items, getters, cold=False), args.iterations)
+        print(f"{name:>8}: pydantic {legacy_ms:7.3f} ms  fragments cold {cold_ms:7.3f} ms  "
+              f"warm {warm_ms:7.3f} ms  ({legacy_ms / warm_ms:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,5 @@
+import os
+
+# The offline LLM stand-in must be enabled before the settings are imported
+os.environ["BLOB_OFFLINE_LLM"] = "1"
+os.environ.setdefault("BLOB_LOG_LEVEL", "ERROR")
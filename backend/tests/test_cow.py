@@ -0,0 +1,98 @@
+import json
+import random
+
+import pytest
+
+from app.blob_sim import EnhancedGameState
+from app.cow import Ownership
+
+
+class Box:
+    def __init__(self, items):
+        self.items = items
+
+
+def test_exclusive_ownership_changes_in_place():
+    ownership, box = Ownership(), Box([1])
+    assert ownership.writable_attr(box, "items", list) is box.items
+
+
+def test_fork_then_change_is_isolated_on_both_sides():
+    parent_ownership, parent = Ownership(), Box([[1], [2]])
+    child_ownership = parent_ownership.fork()
+    child = Box(parent.items)
+
+    # The fork copies the shared list and item before changing them
+    items = child_ownership.writable_attr(child, "items", list)
+    child_ownership.writable_item(items, 0, list).append("child")
+    assert parent.items == [[1], [2]] and child.items == [[1, "child"], [2]]
+
+    # So does the parent: forking released what it owned
+    items = parent_ownership.writable_attr(parent, "items", list)
+    parent_ownership.writable_item(items, 1, list).append("parent")
+    assert parent.items == [[1], [2, "parent"]] and child.items == [[1, "child"], [2]]
+
+    # Copies are owned afterwards, so later changes are in place
+    assert child_ownership.writable_attr(child, "items", list) is child.items
+    assert parent_ownership.writable_item(parent.items, 1, list) is parent.items[1]
+
+
+def test_nested_forks_are_isolated():
+    root_ownership, root = Ownership(), Box([0])
+    child_ownership = root_ownership.fork()
+    child = Box(root.items)
+    child_ownership.writable_attr(child, "items", list).append(1)
+    grandchild_ownership = child_ownership.fork()
+    grandchild = Box(child.items)
+    grandchild_ownership.writable_attr(grandchild, "items", list).append(2)
+    child_ownership.writable_attr(child, "items", list).append("c")
+    assert (root.items, child.items, grandchild.items) == ([0], [0, 1, "c"], [0, 1, 2])
+
+
+def dump(state: EnhancedGameState) -> str:
+    return json.dumps(state.to_dict(), sort_keys=True, default=str)
+
+
+@pytest.fixture
+def world() -> EnhancedGameState:
+    random.seed(0)
+    state = EnhancedGameState()
+    state.initialize_with_personalities(num_blobs=6, num_societies=3)
+    for _ in range(2):
+        state.run_iteration(create_image=False)
+    return state
+
+
+def test_game_fork_isolation_on_both_sides(world):
+    before = dump(world)
+    fork = world.fork()
+    fork.run_iteration(create_image=False)
+    fork.policy_proposition("Ban factory waste", create_image=False)
+    assert dump(world) == before
+
+    fork_state = dump(fork)
+    world.run_iteration(create_image=False)
+    assert dump(fork) == fork_state
+
+
+def test_nested_game_forks(world):
+    child = world.fork()
+    child.run_iteration(create_image=False)
+    child_state, world_state = dump(child), dump(world)
+    grandchild = child.fork()
+    for _ in range(2):
+        grandchild.run_iteration(create_image=False)
+    child.run_iteration(create_image=False)
+    assert dump(world) == world_state
+    assert len(grandchild.world_events) == len(child.world_events) + 1
+    child_events = json.loads(child_state)["world_events"]
+    assert json.loads(dump(grandchild))["world_events"][:len(child_events)] == child_events
+
+
+def test_fork_matches_a_rebuilt_copy(world):
+    fork = world.fork()
+    fork.run_iteration(create_image=False)
+    rebuilt = EnhancedGameState.from_dict(json.loads(dump(fork)))
+    assert dump(rebuilt) == dump(fork)
+    assert sorted(r["key"] for r in fork.search_index.search("waste", k=100)) == \
+        sorted(r["key"] for r in rebuilt.search_index.search("waste", k=100))
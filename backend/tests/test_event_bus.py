@@ -0,0 +1,24 @@
+import asyncio
+
+from app import telemetry
+from app.event_bus import EventBus
+
+
+def viewers() -> float:
+    return telemetry.registry._gauges["blob_ws_subscribers"][()]
+
+
+def test_viewer_gauge_counts_every_bus():
+    async def connect():
+        first, second = EventBus(), EventBus()
+        base = viewers() if "blob_ws_subscribers" in telemetry.registry._gauges else 0
+        a, b, c = first.subscribe(), second.subscribe(), second.subscribe()
+        assert viewers() == base + 3
+        first.unsubscribe(a)
+        first.unsubscribe(a)  # Already gone: not counted twice
+        assert viewers() == base + 2
+        second.unsubscribe(b)
+        second.unsubscribe(c)
+        assert viewers() == base
+
+    asyncio.run(connect())
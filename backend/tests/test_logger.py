@@ -0,0 +1,24 @@
+import json
+import logging
+
+from app.logger import JsonFormatter, _QueueHandler
+
+
+def test_queued_records_keep_the_traceback_in_exc():
+    queued = []
+    handler = _QueueHandler(None)
+    handler.enqueue = queued.append
+    logger = logging.getLogger("blob.test_logger")
+    logger.addHandler(handler)
+    try:
+        try:
+            raise ValueError("bad event")
+        except ValueError:
+            logger.error("Turn %s failed", 3, exc_info=True, extra={"year": 3})
+    finally:
+        logger.removeHandler(handler)
+
+    payload = json.loads(JsonFormatter().format(queued[0]))
+    assert payload["msg"] == "Turn 3 failed"
+    assert payload["year"] == 3
+    assert "ValueError: bad event" in payload["exc"]
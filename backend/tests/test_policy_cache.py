@@ -0,0 +1,30 @@
+from app.policy_cache import PolicyCache, polarity
+
+
+def stored_cache() -> PolicyCache:
+    cache = PolicyCache(similarity=0.9)
+    cache.store("world", "Ban factory waste in the river", "response", {"headline": "Waste banned"})
+    return cache
+
+
+def test_polarity_words():
+    assert polarity("do not ban factory waste") == frozenset({"not"})
+    assert polarity("don't ban factory waste") == frozenset({"not"})
+    assert polarity("ban factory waste") == frozenset()
+
+
+def test_similar_policy_replays():
+    assert stored_cache().lookup("world", "ban factory waste in the river!").policy == "ban factory waste in the river"
+    assert stored_cache().lookup("world", "Ban the factory waste in river") is not None
+
+
+def test_negated_policy_does_not_replay():
+    cache = stored_cache()
+    assert cache.lookup("world", "Do not ban factory waste in the river") is None
+    assert cache.lookup("world", "Don't ban factory waste in the river") is None
+    assert cache.lookup("world", "Allow factory waste in the river") is None
+    assert cache.stats()["lookups"] == {"hit": 0, "similar": 0, "miss": 3}
+
+
+def test_other_world_does_not_replay():
+    assert stored_cache().lookup("other world", "Ban factory waste in the river") is None
@@ -0,0 +1,43 @@
+import asyncio
+import random
+
+from app import telemetry
+from app.blob_sim import Blob
+from app.policy_eval import PolicyEvaluator, distribution
+from app.session_store import MemorySessionStore, SessionManager
+
+
+def test_evaluation_forks_the_committed_snapshot_during_a_turn():
+    random.seed(0)
+    sessions = SessionManager(MemorySessionStore())
+    session = sessions.open("game", for_update=True)
+    session.state.initialize_with_personalities(num_blobs=5, num_societies=2)
+    sessions.commit(session)
+    committed = sessions.open("game").state
+    events, version = len(committed.world_events), committed.state_version
+
+    # A turn in progress on the live state (it has claimed the blob list it is changing)
+    live = sessions.open("game", for_update=True).state
+    blobs = live._writable("blobs")
+    result = asyncio.run(PolicyEvaluator(max_concurrency=2).evaluate(committed, "Ban factory waste", samples=2))
+    live._ownership.writable_item(blobs, 0, Blob.clone)
+    live.run_iteration(create_image=False)
+
+    assert result["state_version"] == version
+    assert result["completed"] == 2
+    assert len(committed.world_events) == events
+    assert committed.blobs is not live.blobs and committed.blobs[0] is not blobs[0]
+
+
+def test_percentiles_are_nearest_rank():
+    samples = [float(i) for i in range(1, 11)]
+    assert telemetry.nearest_rank(samples, 90) == 9.0
+    assert telemetry.nearest_rank(samples, 50) == 5.0
+    assert telemetry.nearest_rank(samples, 100) == 10.0
+    assert telemetry.nearest_rank([3.0], 10) == 3.0
+    summary = distribution(list(reversed(samples)))
+    assert (summary["p10"], summary["p90"]) == (1.0, 9.0)
+
+    stats = telemetry.TaskStats()
+    stats.recent_latencies.extend(samples)
+    assert stats.percentile(90) == 9.0
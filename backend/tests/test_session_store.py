@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from app.session_store import InMemoryRedis, MemorySessionStore, RedisSessionStore, SessionManager
+
+
+@pytest.fixture(params=["memory", "redis"])
+def sessions(request) -> SessionManager:
+    store = MemorySessionStore() if request.param == "memory" else RedisSessionStore(InMemoryRedis())
+    return SessionManager(store)
+
+
+def started(sessions: SessionManager, session_id: str = "game"):
+    random.seed(0)
+    session = sessions.open(session_id, for_update=True)
+    session.state.initialize_with_personalities(num_blobs=5, num_societies=2)
+    session.state.run_iteration(create_image=False)
+    sessions.commit(session)
+    return session
+
+
+def test_readers_do_not_see_a_turn_in_progress(sessions):
+    started(sessions)
+    reader = sessions.open("game").state
+    events, messages = len(reader.world_events), len(reader.message_history)
+    histories = [len(blob.history) for blob in reader.blobs]
+
+    live = sessions.open("game", for_update=True).state
+    live.run_iteration(create_image=False)
+    for snapshot in (reader, sessions.open("game").state):
+        assert len(snapshot.world_events) == events
+        assert len(snapshot.message_history) == messages
+        assert [len(blob.history) for blob in snapshot.blobs] == histories
+
+
+def test_commit_publishes_a_new_snapshot(sessions):
+    session = started(sessions)
+    before = sessions.open("game")
+    session.state.run_iteration(create_image=False)
+    sessions.commit(session)
+    after = sessions.open("game")
+    assert after.version == before.version + 1
+    assert len(after.state.world_events) == len(before.state.world_events) + 1
+    assert after.state is not session.state
+
+
+def test_failed_turn_is_dropped(sessions):
+    started(sessions)
+    committed = len(sessions.open("game").state.message_history)
+    live = sessions.open("game", for_update=True).state
+    live._writable("message_history").append({"role": "user", "content": "half a turn"})
+    sessions.invalidate("game")
+    assert len(sessions.open("game", for_update=True).state.message_history) == committed
+
+
+def test_status_report_on_a_snapshot_fork_changes_nothing(sessions):
+    started(sessions)
+    live = sessions.open("game", for_update=True).state
+    live._writable("message_history").append({"role": "user", "content": "turn in progress"})
+    snapshot = sessions.open("game")
+    messages = list(snapshot.state.message_history)
+    report = snapshot.state.fork().get_world_status_report()
+    assert report
+    assert sessions.open("game").version == snapshot.version
+    assert snapshot.state.message_history == messages
+    assert {"role": "user", "content": "turn in progress"} not in messages
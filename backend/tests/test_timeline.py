@@ -0,0 +1,82 @@
+import json
+import random
+
+import pytest
+
+from app.blob_sim import EnhancedGameState
+
+RESTORED = ("current_year", "blobs", "societies", "world_metrics", "message_history", "world_events", "timeline")
+QUERIES = ("waste", "factory workers", "river pollution", "trust government")
+
+
+def restored_parts(state: EnhancedGameState) -> dict:
+    data = json.loads(json.dumps(state.to_dict(), default=str))
+    for name in ("blobs", "societies", "world_events"):
+        for item in data[name]:
+            item.pop("version", None)  # Change counters for response caches; a rewind bumps them
+    return {name: data[name] for name in RESTORED}
+
+
+def search_results(state: EnhancedGameState) -> dict:
+    return {(query, mode): sorted((r["key"], round(r["score"], 9)) for r in state.search_index.search(query, k=200, mode=mode))
+            for query in QUERIES for mode in ("bm25", "tfidf")}
+
+
+@pytest.fixture
+def world():
+    """A world after two turns, what it looked like then, and after three more (one a policy)"""
+    random.seed(0)
+    state = EnhancedGameState()
+    state.initialize_with_personalities(num_blobs=6, num_societies=3)
+    for _ in range(2):
+        state.run_iteration(create_image=False)
+    year, parts, results = state.current_year, restored_parts(state), search_results(state)
+    state.run_iteration(create_image=False)
+    state.policy_proposition("Ban factory waste in the river", create_image=False)
+    state.run_iteration(create_image=False)
+    return state, year, parts, results
+
+
+def test_rewind_restores_the_world_exactly(world):
+    state, year, parts, results = world
+    assert state.rewind(year) == 3
+    assert restored_parts(state) == parts
+    assert search_results(state) == results
+
+
+def test_rewind_on_a_branch_leaves_the_original(world):
+    state, year, parts, results = world
+    original, original_results = restored_parts(state), search_results(state)
+    branch = state.fork()
+    assert branch.rewind(year) == 3
+    assert restored_parts(branch) == parts
+    assert search_results(branch) == results
+    assert restored_parts(state) == original
+    assert search_results(state) == original_results
+
+    # Both sides play on independently
+    branch.run_iteration(create_image=False)
+    assert restored_parts(state) == original
+
+
+def test_rewind_to_the_initialization_year(world):
+    state, _, _, _ = world
+    start = state.timeline.start_year
+    assert state.rewind(start) == 5
+    assert state.world_events == [] and state.timeline.turns == []
+    assert state.current_year == start
+    assert all(not blob.history for blob in state.blobs)
+
+
+def test_rewind_to_the_current_year_changes_nothing(world):
+    state, _, _, _ = world
+    game_id, version, parts = state.game_id, state.state_version, restored_parts(state)
+    assert state.rewind(state.current_year) == 0
+    assert (state.game_id, state.state_version) == (game_id, version)
+    assert restored_parts(state) == parts
+
+
+def test_rewind_to_an_unknown_year(world):
+    state, _, _, _ = world
+    with pytest.raises(ValueError):
+        state.rewind(state.current_year + 100)